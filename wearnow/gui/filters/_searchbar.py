@@ -35,6 +35,7 @@ _ = glocale.translation.gettext
 
 _RETURN = Gdk.keyval_from_name("Return")
 _KP_ENTER = Gdk.keyval_from_name("KP_Enter")
+_COMPLETION_LIMIT = 20
 
 #-------------------------------------------------------------------------
 #
@@ -58,6 +59,9 @@ class SearchBar(object):
         self.filter_model = Gtk.ListStore(GObject.TYPE_STRING, 
                                           GObject.TYPE_INT, 
                                           GObject.TYPE_BOOLEAN)
+        self.completion = Gtk.EntryCompletion()
+        self.completion_model = Gtk.ListStore(GObject.TYPE_STRING)
+        self.complete_func = None
 
     def destroy(self):
         """Unset all things that can block garbage collection.
@@ -66,6 +70,7 @@ class SearchBar(object):
         self.apply_done_callback = None
         self.dbstate = None
         self.uistate =  None
+        self.complete_func = None
 
     def build( self):
         self.filterbar.set_spacing(4)
@@ -73,6 +78,9 @@ class SearchBar(object):
 
         self.filter_text.connect('key-press-event', self.key_press)
         self.filter_text.connect('changed', self.text_changed)
+        self.completion.set_model(self.completion_model)
+        self.completion.set_text_column(0)
+        self.filter_text.set_completion(self.completion)
 
         self.filter_button.connect( 'clicked', self.apply_filter_clicked)
         self.filter_button.set_sensitive(False)
@@ -136,6 +144,30 @@ class SearchBar(object):
         else:
             self.filter_button.set_sensitive(True)
             self.clear_button.set_sensitive(True)
+        self.update_completion(text)
+
+    def set_complete_func(self, func):
+        """
+        Set the function offering completions while typing. It is called
+        with the model column of the active search and the word being
+        typed, and returns the list of words completing it.
+        """
+        self.complete_func = func
+
+    def update_completion(self, text):
+        """
+        Offer the completions of the last word of the text.
+        """
+        self.completion_model.clear()
+        node = self.filter_list.get_active_iter()
+        if self.complete_func is None or node is None:
+            return
+        (head, sep, word) = text.rpartition(' ')
+        if not word:
+            return
+        index = self.filter_model.get_value(node, 1)
+        for completion in self.complete_func(index, word, _COMPLETION_LIMIT):
+            self.completion_model.append(row=[head + sep + completion])
 
     def key_press(self, obj, event):
         if not (event.get_state() & Gdk.ModifierType.CONTROL_MASK):
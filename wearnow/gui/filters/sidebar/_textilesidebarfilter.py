@@ -45,7 +45,7 @@ from . import SidebarFilter
 from wearnow.tex.filters import GenericFilter, rules
 from wearnow.tex.filters.rules.textile import (RegExpName, RegExpIdOf,
                                                HasTag, HasNoteRegexp, 
-                                               MatchesFilter)
+                                               HasText, MatchesFilter)
 
 def extract_text(entry_widget):
     """
@@ -71,6 +71,7 @@ class TextileSidebarFilter(SidebarFilter):
         self.filter_id = widgets.BasicEntry()
         
         self.filter_note = widgets.BasicEntry()
+        self.filter_text = widgets.BasicEntry()
             
         self.filter_regex = Gtk.CheckButton(label=_('Use regular expressions'))
 
@@ -96,6 +97,8 @@ class TextileSidebarFilter(SidebarFilter):
         self.add_text_entry(_('Description'), self.filter_name)
         self.add_text_entry(_('ID'), self.filter_id)
         self.add_text_entry(_('Note'), self.filter_note)
+        self.add_text_entry(_('Text'), self.filter_text,
+                            _('Text anywhere in the garment'))
         self.add_entry(_('Tag'), self.tag)
         self.add_filter_entry(_('Custom filter'), self.generic)
         self.add_regex_entry(self.filter_regex)
@@ -104,6 +107,7 @@ class TextileSidebarFilter(SidebarFilter):
         self.filter_name.set_text('')
         self.filter_id.set_text('')
         self.filter_note.set_text('')
+        self.filter_text.set_text('')
         self.tag.set_active(0)
         self.generic.set_active(0)
 
@@ -117,6 +121,7 @@ class TextileSidebarFilter(SidebarFilter):
         name = extract_text(self.filter_name)
         gid = extract_text(self.filter_id)
         note = extract_text(self.filter_note)
+        text = extract_text(self.filter_text)
 
         # extract remaining data from the menus
         regex = self.filter_regex.get_active()
@@ -126,7 +131,7 @@ class TextileSidebarFilter(SidebarFilter):
         # check to see if the filter is empty. If it is empty, then
         # we don't build a filter
 
-        empty = not (name or gid or note or regex or tag or generic)
+        empty = not (name or gid or note or text or regex or tag or generic)
         if empty:
             generic_filter = None
         else:
@@ -150,6 +155,11 @@ class TextileSidebarFilter(SidebarFilter):
                 rule = HasNoteRegexp([note], use_regex=regex)
                 generic_filter.add_rule(rule)
 
+            # Build text filter if needed
+            if text:
+                rule = HasText([text], use_regex=regex)
+                generic_filter.add_rule(rule)
+
             # check the Tag
             if tag:
                 model = self.tag.get_model()
@@ -146,6 +146,7 @@ class ListView(NavigationView):
 
         self.search_bar = SearchBar(self.dbstate, self.uistate,
                                     self.search_build_tree)
+        self.search_bar.set_complete_func(self.complete_search_text)
         filter_box = self.search_bar.build()
 
         self.list = Gtk.TreeView()
@@ -356,6 +357,19 @@ class ListView(NavigationView):
     def search_build_tree(self):
         self.build_tree()
 
+    def complete_search_text(self, column, prefix, limit):
+        """
+        Return the words of the full-text index starting with prefix, for
+        a search on a model column showing an indexed text.
+        """
+        obj_key = self.make_model.text_index_columns.get(column)
+        if obj_key is None:
+            return []
+        try:
+            return self.dbstate.db.complete_text(obj_key, prefix, limit)
+        except NotImplementedError:
+            return []
+
     def exact_search(self):
         """
         Returns a tuple indicating columns requiring an exact search
@@ -0,0 +1,77 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import shutil
+import tempfile
+import unittest
+
+try:
+    import gi
+    gi.require_version('Gtk', '3.0')
+    from ..treemodels import (MediaModel, NoteModel, TextileListModel,
+                              EnsembleModel)
+    HAVE_GTK = True
+except (ImportError, ValueError):
+    HAVE_GTK = False
+from ....tex.lib import Textile, Ensemble, MediaObject, Note
+from ....tex.db.txn import DbTxn
+from ....plugins.database.dictionarydb import DictionaryDb
+
+@unittest.skipUnless(HAVE_GTK, "GTK+ is not installed")
+class SortKeysTest(unittest.TestCase):
+    """
+    Test that the sort keys read from a cursor projected on the sort field
+    are the ones computed from the full records.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DictionaryDb()
+        self.db.load(self.directory)
+        with DbTxn("Add objects", self.db) as trans:
+            for (index, text) in enumerate(("b", "A", "a", "", "é")):
+                textile = Textile()
+                textile.set_description(text)
+                self.db.add_textile(textile, trans)
+                self.db.add_ensemble(Ensemble(), trans)
+                media = MediaObject()
+                media.set_description(text)
+                self.db.add_object(media, trans)
+                self.db.add_note(Note(text), trans)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def test_sort_keys(self):
+        for model_class in (TextileListModel, EnsembleModel, MediaModel,
+                            NoteModel):
+            for col in sorted(model_class.sort_fields):
+                model = model_class(self.db, scol=col)
+                projected = model.sort_keys()
+                model.sort_field = None
+                self.assertEqual(projected, model.sort_keys())
+                self.assertEqual(len(projected), 5)
+
+def testSuite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(SortKeysTest, 'test'))
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
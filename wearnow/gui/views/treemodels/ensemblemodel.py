@@ -51,6 +51,8 @@ from wearnow.tex.const import WEARNOW_LOCALE as glocale
 #-------------------------------------------------------------------------
 class EnsembleModel(FlatBaseModel):
 
+    sort_fields = {0: "wearnow_id"}
+
     def __init__(self, db, scol=0, order=Gtk.SortType.ASCENDING, search=None, 
                  skip=set(), sort_map=None):
         self.gen_cursor = db.get_ensemble_cursor
@@ -449,10 +449,17 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
             so as to have localized sort
     """
 
+    # model columns whose sort key is the str of one serialized field,
+    # column -> field name; these are sorted from a projected cursor
+    sort_fields = {}
+    # model columns showing a text of the full-text index of the database,
+    # column -> object key; the search bar looks these up in the index
+    text_index_columns = {}
+
     def __init__(self, db, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(),
                  sort_map=None):
-        cput = time.clock()
+        cput = time.perf_counter()
         super(FlatBaseModel, self).__init__()
         #inheriting classes must set self.map to obtain the data
         self.prev_handle = None
@@ -473,6 +480,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
             col = scol
         # get the function that maps data to sort_keys
         self.sort_func = lambda x: glocale.sort_key(self.smap[col](x))
+        self.sort_field = self.sort_fields.get(col)
         self.sort_col = scol
         self.skip = skip
         self._in_build = False
@@ -484,7 +492,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
 
         self.rebuild_data()
         _LOG.debug(self.__class__.__name__ + ' __init__ ' +
-                    str(time.clock() - cput) + ' sec')
+                    str(time.perf_counter() - cput) + ' sec')
 
     def destroy(self):
         """
@@ -522,7 +530,8 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
                     if search[2]:
                         self.search = ExactSearchFilter(func, text, inv)
                     else:
-                        self.search = SearchFilter(func, text, inv)
+                        self.search = SearchFilter(func, text, inv,
+                                                   self._text_finder(col))
                 else:
                     self.search = None
                 self.rebuild_data = self._rebuild_search
@@ -530,6 +539,23 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
             self.search = None
             self.rebuild_data = self._rebuild_search
 
+    def _text_finder(self, col):
+        """
+        Return a function giving the handles whose column col may contain a
+        text, using the full-text index of the database, or None if the
+        column is not indexed.
+        """
+        obj_key = self.text_index_columns.get(col)
+        if obj_key is None:
+            return None
+        db = self.db
+        def find(text):
+            try:
+                return db.find_handles_containing_text(obj_key, text)
+            except NotImplementedError:
+                return None
+        return find
+
     def total(self):
         """
         Total number of items that maximally can be shown
@@ -570,6 +596,13 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
         be shown.
         This list is sorted ascending, via localized string sort.
         """
+        if self.sort_field is not None:
+            # only read the sort field, handles come as str
+            with self.gen_cursor(fields=(self.sort_field,)) as cursor:
+                srt_keys = [(glocale.sort_key(str(data[0])), key)
+                            for key, data in cursor]
+                srt_keys.sort()
+                return srt_keys
         # use cursor as a context manager
         with self.gen_cursor() as cursor:
             #loop over database and store the sort field, and the handle
@@ -589,9 +622,11 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
             if not allkeys:
                 allkeys = self.sort_keys()
             if self.search and self.search.text:
+                self.search.prepare()
                 dlist = [h for h in allkeys
                              if self.search.match(h[1], self.db) and
                              h[1] not in self.skip and h[1] != ignore]
+                self.search.reset()
                 ident = False
             elif ignore is None and not self.skip:
                 #nothing to remove from the keys present
@@ -52,6 +52,8 @@ from .flatbasemodel import FlatBaseModel
 #-------------------------------------------------------------------------
 class MediaModel(FlatBaseModel):
 
+    sort_fields = {0: "desc", 1: "wearnow_id"}
+
     def __init__(self, db, scol=0, order=Gtk.SortType.ASCENDING, search=None,
                  skip=set(), sort_map=None):
         self.gen_cursor = db.get_media_cursor
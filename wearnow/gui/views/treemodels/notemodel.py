@@ -41,6 +41,7 @@ from gi.repository import Gtk
 #-------------------------------------------------------------------------
 from wearnow.tex.datehandler import format_time
 from wearnow.tex.const import WEARNOW_LOCALE as glocale
+from wearnow.tex.db.dbconst import NOTE_KEY
 from .flatbasemodel import FlatBaseModel
 from wearnow.tex.lib import (Note, NoteType, StyledText)
 
@@ -52,6 +53,9 @@ from wearnow.tex.lib import (Note, NoteType, StyledText)
 class NoteModel(FlatBaseModel):
     """
     """
+    sort_fields = {1: "wearnow_id"}
+    text_index_columns = {0: NOTE_KEY}
+
     def __init__(self, db, scol=0, order=Gtk.SortType.ASCENDING, search=None,
                  skip=set(), sort_map=None):
         """Setup initial values for instance variables."""
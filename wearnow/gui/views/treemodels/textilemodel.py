@@ -43,6 +43,7 @@ from gi.repository import Gtk
 #-------------------------------------------------------------------------
 from wearnow.tex.datehandler import format_time
 from wearnow.tex.constfunc import conv_to_unicode
+from wearnow.tex.db.dbconst import TEXTILE_KEY
 from .flatbasemodel import FlatBaseModel
 
 #-------------------------------------------------------------------------
@@ -52,6 +53,9 @@ from .flatbasemodel import FlatBaseModel
 #-------------------------------------------------------------------------
 class TextileBaseModel(object):
 
+    sort_fields = {0: "description", 1: "wearnow_id"}
+    text_index_columns = {0: TEXTILE_KEY}
+
     def __init__(self, db):
         self.db = db
         self.gen_cursor = db.get_textile_cursor
@@ -28,6 +28,10 @@ import pickle
 import re
 import os
 import logging
+import threading
+import time
+import weakref
+from functools import partial
 
 #------------------------------------------------------------------------
 #
@@ -36,10 +40,21 @@ import logging
 #------------------------------------------------------------------------
 from wearnow.tex.const import WEARNOW_LOCALE as glocale
 _ = glocale.translation.gettext
-from wearnow.tex.db.base import DbReadBase, DbWriteBase
+from wearnow.tex.db.base import DbReadBase, DbWriteBase, field_getter
 from wearnow.tex.db.txn import DbTxn
 from wearnow.tex.db.dbconst import KEY_TO_NAME_MAP, KEY_TO_CLASS_MAP
-from wearnow.tex.db.undoredo import DbUndo
+from wearnow.tex.db.undoredo import DbUndoList
+from wearnow.tex.db.journal import DbJournal, replay_journal
+from wearnow.tex.db.refmap import ReferenceMap
+from wearnow.tex.db.idalloc import IdAllocator
+from wearnow.tex.db.sortedkeys import SortedKeys
+from wearnow.tex.db.attrindex import (AttributeIndexes, SortedAttributeIndex,
+                                     attribute_type_key)
+from wearnow.tex.db.textindex import TextIndex
+from wearnow.tex.db.objcache import ObjectCache
+from wearnow.tex.db.tombstones import Tombstones
+from wearnow.tex.db.snapshot import (SnapshotReader, write_snapshot,
+                                     dumps as snapshot_dumps)
 from wearnow.tex.db.dbconst import *
 from wearnow.tex.utils.callback import Callback
 from wearnow.tex.updatecallback import UpdateCallback
@@ -56,9 +71,26 @@ from wearnow.tex.lib.textile import Textile
 from wearnow.tex.lib.ensemble import Ensemble
 from wearnow.tex.lib.note import Note
 from wearnow.tex.lib.tag import Tag
+from wearnow.tex.lib.attrtype import AttributeType
 
 _LOG = logging.getLogger(DBLOGNAME)
 
+SNAPSHOT = "data.snapshot"        # last full snapshot of the database
+SNAPSHOT_XML = "data.wearnow"     # snapshot of databases of older versions
+JOURNAL = "data.journal"          # changes made since the last snapshot
+JOURNAL_OLD = "data.journal.old"  # changes being folded into a new snapshot
+JOURNAL_COMPACT = 10000           # number of records that triggers compaction
+OBJECT_CACHE = 1000               # number of objects kept by the object cache
+TEXTILE_DESCRIPTION = 2           # description in a serialized Textile
+TEXTILE_ATTRIBUTES = 4            # attribute list in a serialized Textile
+NOTE_TEXT = 2                     # styled text in a serialized Note
+
+KEY_TO_CLASS = {TEXTILE_KEY: Textile,
+                ENSEMBLE_KEY: Ensemble,
+                MEDIA_KEY: MediaObject,
+                NOTE_KEY: Note,
+                TAG_KEY: Tag}
+
 def touch(fname, mode=0o666, dir_fd=None, **kwargs):
     ## After http://stackoverflow.com/questions/1158076/implement-touch-using-python
     flags = os.O_CREAT | os.O_APPEND
@@ -102,6 +134,183 @@ class Map(dict):
         super().__init__(*args, **kwargs)
         self.db = tbl
 
+    def peek(self, key):
+        """
+        Return the value of key, or None, without changing the map.
+        """
+        return dict.get(self, key)
+
+class LazyMap(Map):
+    """
+    A Map whose values are only fetched when they are first asked for.
+
+    pending maps keys that were not fetched yet to a token, and
+    loader(token) returns the value. Once fetched, the value is kept as
+    in a normal Map.
+    """
+    def __init__(self, tbl, pending, loader, raw_loader=None):
+        super().__init__(tbl)
+        self._pending = pending
+        self._loader = loader
+        self._raw_loader = raw_loader
+
+    def __getitem__(self, key):
+        try:
+            return dict.__getitem__(self, key)
+        except KeyError:
+            pass
+        try:
+            token = self._pending[key]
+        except KeyError:
+            # fetched by another reader in the meantime
+            return dict.__getitem__(self, key)
+        value = self._loader(token)
+        # the key stays visible while it moves out of pending
+        dict.__setitem__(self, key, value)
+        self._pending.pop(key, None)
+        return value
+
+    def peek(self, key):
+        """
+        Return the value of key, or None, without keeping a fetched value.
+        """
+        value = dict.get(self, key)
+        if value is not None:
+            return value
+        token = self._pending.get(key)
+        if token is None:
+            return dict.get(self, key)
+        return self._loader(token)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self._pending:
+            del self._pending[key]
+            dict.pop(self, key, None)
+        else:
+            dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        if key in self._pending:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._pending
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._pending)
+
+    def __iter__(self):
+        # fetching a value moves its key, so iterate over a copy
+        return iter(list(dict.keys(self)) + list(self._pending))
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._pending.clear()
+        dict.clear(self)
+
+    def copy(self):
+        """
+        Return a LazyMap with the same content, without fetching values.
+        """
+        lazy = LazyMap(self.db, dict(self._pending), self._loader,
+                       self._raw_loader)
+        dict.update(lazy, dict.items(self))
+        return lazy
+
+    def fetched_items(self):
+        """
+        Return the (key, value) pairs of the values fetched so far.
+        """
+        return list(dict.items(self))
+
+    def pending_items(self):
+        """
+        Return the (key, token) pairs of the values not fetched yet.
+        """
+        return list(self._pending.items())
+
+    def raw_items(self):
+        """
+        Iterate over (handle, record) pairs; records that were not fetched
+        are passed on undecoded.
+        """
+        for handle, data in self.fetched_items():
+            yield (handle, snapshot_dumps(data))
+        for handle, token in self.pending_items():
+            if self._raw_loader:
+                yield (handle, self._raw_loader(token))
+            else:
+                yield (handle, snapshot_dumps(self._loader(token)))
+
+def _raw_items(data_map):
+    """
+    Iterate over the (handle, record) pairs of a table for a snapshot.
+    """
+    if isinstance(data_map, LazyMap):
+        return data_map.raw_items()
+    return ((handle, snapshot_dumps(data))
+            for handle, data in data_map.items())
+
+def _snapshot_records(data_map, data_id_map):
+    """
+    Iterate over the (handle, wearnow_id, record) tuples of a table.
+    """
+    handle_ids = {} if data_id_map is None else _handle_ids(data_id_map)
+    for (handle, record) in _raw_items(data_map):
+        yield (handle, handle_ids.get(handle), record)
+
+def _id_handle(data_id_map, wearnow_id):
+    """
+    Return the handle of the object with the WearNow ID, without decoding
+    a record that was not fetched yet.
+    """
+    if isinstance(data_id_map, LazyMap) and wearnow_id in data_id_map._pending:
+        return data_id_map._pending[wearnow_id]
+    return data_id_map[wearnow_id][0]
+
+def _handle_ids(data_id_map):
+    """
+    Return a dict mapping handle to WearNow ID, given an id map.
+    """
+    if isinstance(data_id_map, LazyMap):
+        handle_ids = dict((handle, wearnow_id) for wearnow_id, handle
+                          in data_id_map.pending_items())
+        items = data_id_map.fetched_items()
+    else:
+        handle_ids = {}
+        items = data_id_map.items()
+    for wearnow_id, data in items:
+        handle_ids[data[0]] = wearnow_id
+    return handle_ids
+
 class MetaCursor(object):
     def __init__(self):
         pass
@@ -127,12 +336,22 @@ class MetaCursor(object):
         pass
 
 class Cursor(object):
-    def __init__(self, map):
+    """
+    Cursor over a table. If a getter is given, it is applied to the data of
+    each record and the handles are yielded as str.
+    """
+    def __init__(self, map, getter=None):
         self.map = map
+        self.getter = getter
         self._iter = self.__iter__()
     def __enter__(self):
         return self
     def __iter__(self):
+        if self.getter is not None:
+            getter = self.getter
+            for item in self.map.keys():
+                yield (item, getter(self.map[item]))
+            return
         for item in self.map.keys():
             yield (bytes(item, "utf-8"), self.map[item])
     def __next__(self):
@@ -167,6 +386,385 @@ class Bookmarks(object):
     def append(self, handle):
         self.handles.append(handle)
 
+#-------------------------------------------------------------------------
+#
+# DictionarySnapshot
+#
+#-------------------------------------------------------------------------
+class DictionarySnapshot(DbReadBase):
+    """
+    A read-only view of a DictionaryDb as it was when it was taken.
+
+    Nothing is copied when the snapshot is taken. Before the database
+    changes a record, it hands the old version to its open snapshots,
+    which keep it. Reads look at the kept versions first and then at the
+    tables of the database, under the lock of the database, so a snapshot
+    can be read in another thread while the database is being edited.
+
+    A snapshot can not be read after the database was closed.
+    """
+
+    def __init__(self, db, maps, lock):
+        DbReadBase.__init__(self)
+        self.basedb = self
+        self.__db = db
+        self.__open = True
+        self.__maps = maps
+        self.__lock = lock
+        # key -> {handle: data when taken, None if it did not exist}
+        self.__kept = dict((key, {}) for key in maps)
+        # key -> {wearnow_id: handle when taken, or None}
+        self.__kept_ids = dict((key, {}) for key in maps)
+        self.owner = Researcher()
+        self.owner.unserialize(db.get_owner().serialize())
+        for name in ("bookmarks", "ensemble_bookmarks", "media_bookmarks",
+                     "note_bookmarks"):
+            bookmarks = Bookmarks()
+            bookmarks.handles = list(getattr(db, name).handles)
+            setattr(self, name, bookmarks)
+        self.__default_handle = db.get_default_handle()
+        self.__mediapath = db.get_mediapath()
+        self.__tombstones = db.tombstones.copy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def close(self):
+        """
+        Release the snapshot; the database no longer keeps data for it.
+        """
+        if self.__open:
+            self.__db.release_snapshot(self)
+            self.__open = False
+        self.__kept = dict((key, {}) for key in self.__maps)
+
+    def is_open(self):
+        return self.__open
+
+    def keep(self, key, handle, data, handles_by_id):
+        """
+        Keep the version of a record as it was when the snapshot was taken.
+        Called by the database, with its lock held, before it changes the
+        record.
+
+        :param data: the current data of the record, None if it does not
+                     exist
+        :param handles_by_id: the current handle, or None, of the WearNow
+                              IDs the change touches
+        :type handles_by_id: dict
+        """
+        kept = self.__kept[key]
+        if handle not in kept:
+            kept[handle] = data
+        kept_ids = self.__kept_ids[key]
+        for (wearnow_id, id_handle) in handles_by_id.items():
+            if wearnow_id not in kept_ids:
+                kept_ids[wearnow_id] = id_handle
+
+    def __get_raw(self, key, handle):
+        if isinstance(handle, bytes):
+            handle = str(handle, "utf-8")
+        with self.__lock:
+            kept = self.__kept[key]
+            if handle in kept:
+                return kept[handle]
+            return self.__maps[key][0].peek(handle)
+
+    def __get_handles(self, key):
+        data_map = self.__maps[key][0]
+        with self.__lock:
+            handles = list(data_map.keys())
+            kept = dict(self.__kept[key])
+        if not kept:
+            return handles
+        live = set(handles)
+        # drop the objects added later, restore the ones removed later
+        return ([handle for handle in handles
+                 if kept.get(handle, True) is not None] +
+                [handle for (handle, data) in kept.items()
+                 if data is not None and handle not in live])
+
+    def __count(self, key):
+        data_map = self.__maps[key][0]
+        with self.__lock:
+            count = len(data_map)
+            for (handle, data) in self.__kept[key].items():
+                if data is None:
+                    if handle in data_map:
+                        count -= 1
+                elif handle not in data_map:
+                    count += 1
+        return count
+
+    def __id_handle(self, key, wearnow_id):
+        data_id_map = self.__maps[key][1]
+        with self.__lock:
+            kept_ids = self.__kept_ids[key]
+            if wearnow_id in kept_ids:
+                return kept_ids[wearnow_id]
+            if wearnow_id in data_id_map:
+                return _id_handle(data_id_map, wearnow_id)
+        return None
+
+    def __get_from_wearnow_id(self, key, wearnow_id):
+        handle = self.__id_handle(key, wearnow_id)
+        if handle is None:
+            return None
+        return self.__create(key, self.__get_raw(key, handle))
+
+    @staticmethod
+    def __create(key, data, view=False):
+        if data is None:
+            return None
+        if view:
+            return KEY_TO_CLASS[key].view(data)
+        return KEY_TO_CLASS[key].create(data)
+
+    def get_dbname(self):
+        return self.__db.get_dbname()
+
+    def get_owner(self):
+        return self.owner
+
+    def get_mediapath(self):
+        return self.__mediapath
+
+    def get_default_handle(self):
+        return self.__default_handle
+
+    def get_default_textile(self):
+        if self.__default_handle:
+            return self.get_textile_from_handle(self.__default_handle)
+        return None
+
+    def get_bookmarks(self):
+        return self.bookmarks
+
+    def get_ensemble_bookmarks(self):
+        return self.ensemble_bookmarks
+
+    def get_media_bookmarks(self):
+        return self.media_bookmarks
+
+    def get_note_bookmarks(self):
+        return self.note_bookmarks
+
+    def get_raw_textile_data(self, handle):
+        return self.__get_raw(TEXTILE_KEY, handle)
+
+    def get_raw_ensemble_data(self, handle):
+        return self.__get_raw(ENSEMBLE_KEY, handle)
+
+    def get_raw_note_data(self, handle):
+        return self.__get_raw(NOTE_KEY, handle)
+
+    def get_raw_object_data(self, handle):
+        return self.__get_raw(MEDIA_KEY, handle)
+
+    def get_raw_tag_data(self, handle):
+        return self.__get_raw(TAG_KEY, handle)
+
+    def get_textile_from_handle(self, handle, view=False):
+        return self.__create(TEXTILE_KEY, self.__get_raw(TEXTILE_KEY, handle),
+                             view)
+
+    def get_ensemble_from_handle(self, handle, view=False):
+        return self.__create(ENSEMBLE_KEY,
+                             self.__get_raw(ENSEMBLE_KEY, handle), view)
+
+    def get_note_from_handle(self, handle, view=False):
+        return self.__create(NOTE_KEY, self.__get_raw(NOTE_KEY, handle),
+                             view)
+
+    def get_object_from_handle(self, handle, view=False):
+        return self.__create(MEDIA_KEY, self.__get_raw(MEDIA_KEY, handle),
+                             view)
+
+    def get_tag_from_handle(self, handle):
+        return self.__create(TAG_KEY, self.__get_raw(TAG_KEY, handle))
+
+    def get_textile_from_wearnow_id(self, wearnow_id):
+        return self.__get_from_wearnow_id(TEXTILE_KEY, wearnow_id)
+
+    def get_ensemble_from_wearnow_id(self, wearnow_id):
+        return self.__get_from_wearnow_id(ENSEMBLE_KEY, wearnow_id)
+
+    def get_object_from_wearnow_id(self, wearnow_id):
+        return self.__get_from_wearnow_id(MEDIA_KEY, wearnow_id)
+
+    def get_note_from_wearnow_id(self, wearnow_id):
+        return self.__get_from_wearnow_id(NOTE_KEY, wearnow_id)
+
+    def get_tag_from_name(self, name):
+        for handle in self.__get_handles(TAG_KEY):
+            data = self.__get_raw(TAG_KEY, handle)
+            if data is not None and data[1] == name:
+                return Tag.create(data)
+        return None
+
+    def has_wearnow_id(self, obj_key, wearnow_id):
+        return self.__id_handle(obj_key, wearnow_id) is not None
+
+    def has_textile_handle(self, handle):
+        return self.__get_raw(TEXTILE_KEY, handle) is not None
+
+    def has_ensemble_handle(self, handle):
+        return self.__get_raw(ENSEMBLE_KEY, handle) is not None
+
+    def has_note_handle(self, handle):
+        return self.__get_raw(NOTE_KEY, handle) is not None
+
+    def has_object_handle(self, handle):
+        return self.__get_raw(MEDIA_KEY, handle) is not None
+
+    def has_tag_handle(self, handle):
+        return self.__get_raw(TAG_KEY, handle) is not None
+
+    def __sorted_handles(self, key, sort_handles):
+        handles = self.__get_handles(key)
+        if sort_handles:
+            # by WearNow ID, or by name for tags, then by handle; objects
+            # without WearNow ID come first
+            handles.sort(key=lambda handle: (self.__get_raw(key, handle)[1],
+                                             handle))
+        return handles
+
+    def get_textile_handles(self, sort_handles=False):
+        return self.__sorted_handles(TEXTILE_KEY, sort_handles)
+
+    def get_ensemble_handles(self, sort_handles=False):
+        return self.__sorted_handles(ENSEMBLE_KEY, sort_handles)
+
+    def get_media_object_handles(self, sort_handles=False):
+        return self.__sorted_handles(MEDIA_KEY, sort_handles)
+
+    def get_note_handles(self, sort_handles=False):
+        return self.__sorted_handles(NOTE_KEY, sort_handles)
+
+    def get_tag_handles(self, sort_handles=False):
+        return self.__sorted_handles(TAG_KEY, sort_handles)
+
+    def get_removed_handles(self, obj_key, since):
+        return self.__tombstones.removed_since(obj_key, since)
+
+    def get_restored_handles(self, obj_key, since):
+        return self.__tombstones.restored_since(obj_key, since)
+
+    def iter_sorted_handles(self, obj_key, by_wearnow_id=False, low=None,
+                            high=None, prefix=None):
+        if by_wearnow_id:
+            pairs = [(data[1], handle) for (handle, data)
+                     in ((handle, self.__get_raw(obj_key, handle))
+                         for handle in self.__get_handles(obj_key))
+                     if data is not None and data[1]]
+        else:
+            pairs = [(handle, handle)
+                     for handle in self.__get_handles(obj_key)]
+        pairs.sort()
+        return (handle for (sort_key, handle) in pairs
+                if (low is None or sort_key >= low) and
+                   (high is None or sort_key < high) and
+                   (prefix is None or sort_key.startswith(prefix)))
+
+    def __iter_objects(self, key):
+        for handle in self.__get_handles(key):
+            obj = self.__create(key, self.__get_raw(key, handle))
+            if obj is not None:
+                yield obj
+
+    def iter_textile_handles(self):
+        return iter(self.__get_handles(TEXTILE_KEY))
+
+    def iter_ensemble_handles(self):
+        return iter(self.__get_handles(ENSEMBLE_KEY))
+
+    def iter_media_object_handles(self):
+        return iter(self.__get_handles(MEDIA_KEY))
+
+    def iter_note_handles(self):
+        return iter(self.__get_handles(NOTE_KEY))
+
+    def iter_tag_handles(self):
+        return iter(self.__get_handles(TAG_KEY))
+
+    def iter_textiles(self):
+        return self.__iter_objects(TEXTILE_KEY)
+
+    def iter_ensembles(self):
+        return self.__iter_objects(ENSEMBLE_KEY)
+
+    def iter_media_objects(self):
+        return self.__iter_objects(MEDIA_KEY)
+
+    def iter_notes(self):
+        return self.__iter_objects(NOTE_KEY)
+
+    def iter_tags(self):
+        return self.__iter_objects(TAG_KEY)
+
+    def get_number_of_textiles(self):
+        return self.__count(TEXTILE_KEY)
+
+    def get_number_of_ensembles(self):
+        return self.__count(ENSEMBLE_KEY)
+
+    def get_number_of_media_objects(self):
+        return self.__count(MEDIA_KEY)
+
+    def get_number_of_notes(self):
+        return self.__count(NOTE_KEY)
+
+    def get_number_of_tags(self):
+        return self.__count(TAG_KEY)
+
+    def __get_cursor(self, key, fields):
+        getter = None if fields is None else field_getter(key, fields)
+        return Cursor(SnapshotMap(self, key), getter)
+
+    def get_textile_cursor(self, fields=None):
+        return self.__get_cursor(TEXTILE_KEY, fields)
+
+    def get_ensemble_cursor(self, fields=None):
+        return self.__get_cursor(ENSEMBLE_KEY, fields)
+
+    def get_note_cursor(self, fields=None):
+        return self.__get_cursor(NOTE_KEY, fields)
+
+    def get_tag_cursor(self, fields=None):
+        return self.__get_cursor(TAG_KEY, fields)
+
+    def get_media_cursor(self, fields=None):
+        return self.__get_cursor(MEDIA_KEY, fields)
+
+    def get_handles(self, key):
+        """
+        Return the list of handles of a table, as seen by the snapshot.
+        """
+        return self.__get_handles(key)
+
+    def get_raw(self, key, handle):
+        """
+        Return the serialized data of a record, as seen by the snapshot.
+        """
+        return self.__get_raw(key, handle)
+
+class SnapshotMap(object):
+    """
+    Read-only map API over a table of a snapshot, for a Cursor.
+    """
+    def __init__(self, snapshot, key):
+        self.snapshot = snapshot
+        self.key = key
+
+    def keys(self):
+        return self.snapshot.get_handles(self.key)
+
+    def __getitem__(self, handle):
+        return self.snapshot.get_raw(self.key, handle)
+
 class DictionaryTxn(DbTxn):
     def __init__(self, message, db, batch=False):
         DbTxn.__init__(self, message, db, batch)
@@ -285,15 +883,11 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.set_ensemble_id_prefix('F%04d')
         self.set_note_id_prefix('N%04d')
         # ----------------------------------
-        self.id_trans  = DictionaryTxn("ID Transaction", self)
-        self.fid_trans = DictionaryTxn("FID Transaction", self)
-        self.pid_trans = DictionaryTxn("PID Transaction", self)
-        self.oid_trans = DictionaryTxn("OID Transaction", self)
-        self.nid_trans = DictionaryTxn("NID Transaction", self)
-        self.pmap_index = 0
-        self.fmap_index = 0
-        self.omap_index = 0
-        self.nmap_index = 0
+        self.__id_allocators = {}
+        self.__sorted_keys = {}
+        # taken by writers while changing the tables, and by snapshots
+        self.__lock = threading.RLock()
+        self.__snapshots = weakref.WeakSet()
         self.env = Environment(self)
         self.textile_map = Map(Table(self._tables["Textile"]))
         self.textile_id_map = {}
@@ -309,16 +903,35 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.redo_callback = None
         self.undo_history_callback = None
         self.modified   = 0
+        self.undodb = DbUndoList(self)
         self.txn = DictionaryTxn("DbDictionary Transaction", self)
         self.transaction = None
-        self.undodb = DbUndo(self)
-        self.abort_possible = False
+        self.abort_possible = True
         self._bm_changes = 0
         self._directory = directory
         self.full_name = None
         self.path = None
         self.brief_name = None
         self.owner = Researcher()
+        self.reference_map = ReferenceMap()
+        self.attribute_indexes = AttributeIndexes()
+        self.attribute_indexes.declare(AttributeType.RFID_ID)
+        self.attribute_indexes.declare(AttributeType.THERM_INS, sorted=True)
+        self.attribute_indexes.declare(AttributeType.MOIST_VAP_RESIST,
+                                       sorted=True)
+        # object key -> full-text index
+        self.text_indexes = {TEXTILE_KEY: TextIndex(), NOTE_KEY: TextIndex()}
+        # read-only views handed out by the get_*_from_handle methods
+        self.object_cache = ObjectCache(OBJECT_CACHE)
+        # handles of the removed objects, for the changes since a time
+        self.tombstones = Tombstones()
+        self._journal = None
+        self._reader = None
+        self._compactor = None
+        # what the snapshot file holds of the data the journal does not
+        # keep, None if the file has to be written again on close
+        self.__saved_metadata = None
+        self.journal_compact_limit = JOURNAL_COMPACT
         if directory:
             self.load(directory)
 
@@ -337,16 +950,75 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         return None
 
     def transaction_commit(self, txn):
-        ## FIXME
-        pass
+        """
+        Make the changes of the transaction final and add it to the undo
+        history. Batch transactions are not added.
+        """
+        if self._journal is not None and not txn.batch:
+            self._journal.sync()
+        self.__emit_signals(txn)
+        if not txn.batch and len(txn):
+            self.undodb.commit(txn, txn.get_description())
+            if self.undo_callback:
+                self.undo_callback(_("_Undo %s") % txn.get_description())
+            if self.redo_callback:
+                self.redo_callback(None)
+            if self.undo_history_callback:
+                self.undo_history_callback()
+        self.transaction = None
+        txn.clear()
+
+    def __emit_signals(self, txn):
+        """
+        Emit the signals for the objects changed in a transaction: one
+        signal per object type and kind of change, with all handles.
+
+        An object added and then removed in the same transaction is not
+        reported at all, an object added and then updated only as added.
+        """
+        for key in sorted(set(obj_type for (obj_type, trans_type) in txn)):
+            added = dict.fromkeys(handle for (handle, data)
+                                  in txn.get((key, TXNADD), []))
+            updated = dict.fromkeys(handle for (handle, data)
+                                    in txn.get((key, TXNUPD), []))
+            deleted = dict.fromkeys(handle for (handle, data)
+                                    in txn.get((key, TXNDEL), []))
+            for (signal, handles) in (
+                    ("-add", [handle for handle in added
+                              if handle not in deleted]),
+                    ("-update", [handle for handle in updated
+                                 if handle not in added and
+                                 handle not in deleted]),
+                    ("-delete", [handle for handle in deleted
+                                 if handle not in added])):
+                if handles:
+                    self.emit(KEY_TO_NAME_MAP[key] + signal, (handles,))
 
     def get_undodb(self):
-        ## FIXME
-        return None
+        """
+        Return the undo/redo manager, which stores the records of the
+        transactions.
+        """
+        return self.undodb
 
     def transaction_abort(self, txn):
-        ## FIXME
-        pass
+        """
+        Revert the changes made so far during the transaction.
+
+        The changes of a batch transaction are not recorded, so they can
+        not be reverted.
+        """
+        if txn.batch:
+            _LOG.warning("Changes of batch transaction '%s' can not be "
+                         "reverted", txn.get_description())
+        else:
+            self.undodb.rollback(txn)
+            if self._journal is not None:
+                self._journal.sync()
+        self.transaction = None
+        txn.clear()
+        txn.first = None
+        txn.last = None
 
     @staticmethod
     def _validated_id_prefix(val, default):
@@ -438,115 +1110,222 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.note_prefix = self._validated_id_prefix(val, "N")
         self.nid2user_format = self.__id2user_format(self.note_prefix)
 
-    def __find_next_wearnow_id(self, prefix, map_index, trans):
+    def __find_next_wearnow_id(self, key, prefix):
         """
         Helper function for find_next_<object>_wearnow_id methods
         """
-        index = prefix % map_index
-        while trans.get(str(index)) is not None:
-            map_index += 1
-            index = prefix % map_index
-        map_index += 1
-        return (map_index, index)
+        allocator = self.__id_allocators.get(key)
+        if allocator is None or allocator.pattern != prefix:
+            allocator = IdAllocator(prefix, self.__get_maps()[key][1].keys())
+            self.__id_allocators[key] = allocator
+        return allocator.allocate()
+
+    def __update_keys(self, key, handle, old_data, new_data):
+        """
+        Keep the ID allocator and the ordered indexes of the object type up
+        to date with a changed record; None stands for no record.
+        """
+        old_id = None if old_data is None else old_data[1]
+        new_id = None if new_data is None else new_data[1]
+        allocator = self.__id_allocators.get(key)
+        if allocator is not None and old_id != new_id:
+            allocator.remove(old_id)
+            allocator.add(new_id)
+        index = self.__sorted_keys.get((key, False))
+        if index is not None:
+            if new_data is None:
+                index.remove(handle)
+            elif old_data is None:
+                index.add(handle)
+        index = self.__sorted_keys.get((key, True))
+        if index is not None and old_id != new_id:
+            # objects without WearNow ID are not in the index
+            if old_id:
+                index.remove(old_id)
+            if new_id:
+                index.add(new_id)
+
+    def __get_sorted_keys(self, key, by_wearnow_id):
+        """
+        Return the ordered index of the handles or WearNow IDs of a table,
+        building it on first use.
+        """
+        index = self.__sorted_keys.get((key, by_wearnow_id))
+        if index is None:
+            (data_map, data_id_map) = self.__get_maps()[key]
+            if by_wearnow_id:
+                if data_id_map is None:
+                    raise ValueError("table %s has no WearNow IDs"
+                                     % KEY_TO_CLASS_MAP[key])
+                index = SortedKeys(wearnow_id for wearnow_id
+                                   in data_id_map.keys() if wearnow_id)
+            else:
+                index = SortedKeys(data_map.keys())
+            self.__sorted_keys[(key, by_wearnow_id)] = index
+        return index
+
+    def iter_sorted_handles(self, obj_key, by_wearnow_id=False, low=None,
+                            high=None, prefix=None):
+        """
+        Iterate over the handles of a table in order, without sorting the
+        whole table.
+
+        :param obj_key: the xxx_KEY constant of the table
+        :type obj_key: int
+        :param by_wearnow_id: if True, order by WearNow ID, else by handle.
+                              Objects without WearNow ID are left out.
+        :type by_wearnow_id: bool
+        :param low: only include keys from low on
+        :type low: str
+        :param high: only include keys before high
+        :type high: str
+        :param prefix: only include keys starting with prefix
+        :type prefix: str
+        """
+        index = self.__get_sorted_keys(obj_key, by_wearnow_id)
+        if prefix is not None:
+            keys = index.prefix(prefix)
+            if low is not None or high is not None:
+                keys = [key for key in keys
+                        if (low is None or key >= low) and
+                           (high is None or key < high)]
+        else:
+            keys = index.range(low, high)
+        if not by_wearnow_id:
+            return iter(keys)
+        data_id_map = self.__get_maps()[obj_key][1]
+        return (_id_handle(data_id_map, wearnow_id) for wearnow_id in keys)
+
+    def __rebuild_id_allocators(self):
+        """
+        Build the ID allocators of all object types from the ID maps.
+        """
+        self.__id_allocators = {}
+        for key, prefix in ((TEXTILE_KEY, self.textile_prefix),
+                            (ENSEMBLE_KEY, self.ensemble_prefix),
+                            (MEDIA_KEY, self.mediaobject_prefix),
+                            (NOTE_KEY, self.note_prefix)):
+            self.__id_allocators[key] = IdAllocator(
+                prefix, self.__get_maps()[key][1].keys())
 
     def find_next_textile_wearnow_id(self):
         """
         Return the next available GRAMPS' ID for a textile object based off the
         textile ID prefix.
         """
-        if self.pmap_index == 0:
-            #determine a good start value
-            self.pmap_index = len(self.textile_id_map.keys())
-        self.pmap_index, gid = self.__find_next_wearnow_id(self.textile_prefix,
-                                          self.pmap_index, self.textile_id_map)
-        return gid
+        return self.__find_next_wearnow_id(TEXTILE_KEY, self.textile_prefix)
 
     def find_next_object_wearnow_id(self):
         """
         Return the next available GRAMPS' ID for a MediaObject object based
         off the media object ID prefix.
         """
-        if self.omap_index == 0:
-            #determine a good start value
-            self.omap_index = len(self.media_id_map.keys())
-        self.omap_index, gid = self.__find_next_wearnow_id(self.mediaobject_prefix,
-                                          self.omap_index, self.media_id_map)
-        return gid
+        return self.__find_next_wearnow_id(MEDIA_KEY, self.mediaobject_prefix)
 
     def find_next_ensemble_wearnow_id(self):
         """
         Return the next available GRAMPS' ID for a ensemble object based off the
         ensemble ID prefix.
         """
-        if self.fmap_index == 0:
-            #determine a good start value
-            self.fmap_index = len(self.ensemble_id_map.keys())
-        self.fmap_index, gid = self.__find_next_wearnow_id(self.ensemble_prefix,
-                                          self.fmap_index, self.ensemble_id_map)
-        return gid
+        return self.__find_next_wearnow_id(ENSEMBLE_KEY, self.ensemble_prefix)
 
     def find_next_note_wearnow_id(self):
         """
         Return the next available GRAMPS' ID for a Note object based off the
         note ID prefix.
         """
-        if self.nmap_index == 0:
-            #determine a good start value
-            self.nmap_index = len(self.note_id_map.keys())
-        self.nmap_index, gid = self.__find_next_wearnow_id(self.note_prefix,
-                                          self.nmap_index, self.note_id_map)
-        return gid
+        return self.__find_next_wearnow_id(NOTE_KEY, self.note_prefix)
 
     def get_mediapath(self):
         return None
 
     def get_textile_handles(self, sort_handles=False):
-        ## Fixme: implement sort
+        if sort_handles:
+            return self.__handles_by_wearnow_id(TEXTILE_KEY)
         return self.textile_map.keys()
 
     def get_ensemble_handles(self, sort_handles=False):
-        ## Fixme: implement sort
+        if sort_handles:
+            return self.__handles_by_wearnow_id(ENSEMBLE_KEY)
         return self.ensemble_map.keys()
 
     def get_media_object_handles(self, sort_handles=False):
-        ## Fixme: implement sort
+        if sort_handles:
+            return self.__handles_by_wearnow_id(MEDIA_KEY)
         return self.media_map.keys()
 
     def get_note_handles(self, sort_handles=False):
-        ## Fixme: implement sort
+        if sort_handles:
+            return self.__handles_by_wearnow_id(NOTE_KEY)
         return self.note_map.keys()
 
     def get_tag_handles(self, sort_handles=False):
-        # FIXME: implement sort
+        if sort_handles:
+            return [data[0] for data in sorted(self.tag_map.values(),
+                                               key=lambda data: (data[1],
+                                                                 data[0]))]
         return self.tag_map.keys()
 
-    def get_ensemble_from_handle(self, handle):
+    def __handles_by_wearnow_id(self, key):
+        """
+        Return the list of handles of a table ordered by WearNow ID.
+        Objects without WearNow ID, which the ordered index leaves out,
+        come first, ordered by handle.
+        """
+        handles = list(self.iter_sorted_handles(key, by_wearnow_id=True))
+        data_map = self.__get_maps()[key][0]
+        if len(handles) < len(data_map):
+            with_id = set(handles)
+            handles[:0] = sorted(handle for handle in data_map.keys()
+                                 if handle not in with_id)
+        return handles
+
+    def __get_view(self, key, cls, data_map, handle):
+        """
+        Return the read-only view of an object, from the object cache if it
+        is there.
+        """
+        obj = self.object_cache.get(key, handle)
+        if obj is None and handle in data_map:
+            obj = cls.view(data_map[handle])
+            self.object_cache.add(key, handle, obj)
+        return obj
+
+    def get_ensemble_from_handle(self, handle, view=False):
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
+        if view:
+            return self.__get_view(ENSEMBLE_KEY, Ensemble, self.ensemble_map, handle)
         ensemble = None
         if handle in self.ensemble_map:
             ensemble = Ensemble.create(self.ensemble_map[handle])
         return ensemble
 
-    def get_textile_from_handle(self, handle):
+    def get_textile_from_handle(self, handle, view=False):
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
+        if view:
+            return self.__get_view(TEXTILE_KEY, Textile, self.textile_map, handle)
         textile = None
         if handle in self.textile_map:
             textile = Textile.create(self.textile_map[handle])
         return textile
 
-    def get_note_from_handle(self, handle):
+    def get_note_from_handle(self, handle, view=False):
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
+        if view:
+            return self.__get_view(NOTE_KEY, Note, self.note_map, handle)
         note = None
         if handle in self.note_map:
             note = Note.create(self.note_map[handle])
         return note
 
-    def get_object_from_handle(self, handle):
+    def get_object_from_handle(self, handle, view=False):
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
+        if view:
+            return self.__get_view(MEDIA_KEY, MediaObject, self.media_map, handle)
         media = None
         if handle in self.media_map:
             media = MediaObject.create(self.media_map[handle])
@@ -622,20 +1401,29 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def get_number_of_media_objects(self):
         return len(self.media_map)
 
-    def get_textile_cursor(self):
-        return Cursor(self.textile_map)
+    def __get_cursor(self, key, fields):
+        """
+        Return a cursor over the table of key, projected on fields if given.
+        """
+        (data_map, data_id_map) = self.__get_maps()[key]
+        if fields is None:
+            return Cursor(data_map)
+        return Cursor(data_map, field_getter(key, fields))
 
-    def get_ensemble_cursor(self):
-        return Cursor(self.ensemble_map)
+    def get_textile_cursor(self, fields=None):
+        return self.__get_cursor(TEXTILE_KEY, fields)
 
-    def get_note_cursor(self):
-        return Cursor(self.note_map)
+    def get_ensemble_cursor(self, fields=None):
+        return self.__get_cursor(ENSEMBLE_KEY, fields)
 
-    def get_tag_cursor(self):
-        return Cursor(self.tag_map)
+    def get_note_cursor(self, fields=None):
+        return self.__get_cursor(NOTE_KEY, fields)
 
-    def get_media_cursor(self):
-        return Cursor(self.media_map)
+    def get_tag_cursor(self, fields=None):
+        return self.__get_cursor(TAG_KEY, fields)
+
+    def get_media_cursor(self, fields=None):
+        return self.__get_cursor(MEDIA_KEY, fields)
 
     def has_wearnow_id(self, obj_key, wearnow_id):
         key2table = {
@@ -739,88 +1527,69 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         return obj.handle
 
     def commit_textile(self, textile, trans, change_time=None):
-        emit = None
-        oldid = False
-        if textile.handle in self.textile_map:
-            oldid = self.textile_map[textile.handle][1]
-            if not trans.batch:
-                emit = "textile-update"
-        else:
-            if not trans.batch:
-                emit = "textile-add"
-        self.textile_map[textile.handle] = textile.serialize()
-        if not (oldid is False) and oldid in self.textile_id_map:
-            del self.textile_id_map[oldid]
-        self.textile_id_map[textile.wearnow_id] = self.textile_map[textile.handle]
-        # Emit after added:
-        if emit:
-            self.emit(emit, ([textile.handle],))
+        self.__do_commit(textile, trans, self.textile_map,
+                         self.textile_id_map, TEXTILE_KEY, change_time)
 
     def commit_ensemble(self, ensemble, trans, change_time=None):
-        emit = None
-        oldid = False
-        if ensemble.handle in self.ensemble_map:
-            oldid = self.ensemble_map[ensemble.handle][1]
-            if not trans.batch:
-                emit = "ensemble-update"
-        else:
-            if not trans.batch:
-                    emit = "ensemble-add"
-        self.ensemble_map[ensemble.handle] = ensemble.serialize()
-        if not (oldid is False) and oldid in self.ensemble_id_map:
-            del self.ensemble_id_map[oldid]
-        self.ensemble_id_map[ensemble.wearnow_id] = self.ensemble_map[ensemble.handle]
-        # Emit after added:
-        if emit:
-            self.emit(emit, ([ensemble.handle],))
+        self.__do_commit(ensemble, trans, self.ensemble_map,
+                         self.ensemble_id_map, ENSEMBLE_KEY, change_time)
 
     def commit_note(self, note, trans, change_time=None):
-        emit = None
-        oldid = False
-        if note.handle in self.note_map:
-            oldid = self.note_map[note.handle][1]
-            if not trans.batch:
-                emit = "note-update"
-        else:
-            if not trans.batch:
-                emit = "note-add"
-        self.note_map[note.handle] = note.serialize()
-        if not (oldid is False) and oldid in self.note_id_map:
-            del self.note_id_map[oldid]
-        self.note_id_map[note.wearnow_id] = self.note_map[note.handle]
-        # Emit after added:
-        if emit:
-            self.emit(emit, ([note.handle],))
+        self.__do_commit(note, trans, self.note_map,
+                         self.note_id_map, NOTE_KEY, change_time)
 
     def commit_tag(self, tag, trans, change_time=None):
-        emit = None
-        if not trans.batch:
-            if tag.handle in self.tag_map:
-                emit = "tag-update"
-            else:
-                emit = "tag-add"
-        self.tag_map[tag.handle] = tag.serialize()
-        # Emit after added:
-        if emit:
-            self.emit(emit, ([tag.handle],))
+        self.__do_commit(tag, trans, self.tag_map,
+                         None, TAG_KEY, change_time)
 
     def commit_media_object(self, media, trans, change_time=None):
-        emit = None
+        self.__do_commit(media, trans, self.media_map,
+                         self.media_id_map, MEDIA_KEY, change_time)
+
+    def __do_commit(self, obj, trans, data_map, data_id_map, key,
+                    change_time=None):
         oldid = False
-        if media.handle in self.media_map:
-            oldid = self.media_map[media.handle][1]
-            if not trans.batch:
-                emit = "media-update"
-        else:
-            if not trans.batch:
-                emit = "media-add"
-        self.media_map[media.handle] = media.serialize()
-        if not (oldid is False) and oldid in self.media_id_map:
-            del self.media_id_map[oldid]
-        self.media_id_map[media.wearnow_id] = self.media_map[media.handle]
-        # Emit after added:
-        if emit:
-            self.emit(emit, ([media.handle],))
+        old_data = None
+        if obj.handle in data_map:
+            old_data = data_map[obj.handle]
+            oldid = old_data[1]
+        self.__set_change(obj, key, old_data, change_time)
+        data = obj.serialize()
+        if not trans.batch:
+            trans.add(key, TXNADD if old_data is None else TXNUPD,
+                      obj.handle, old_data, data)
+        with self.__lock:
+            self.__keep(key, obj.handle, old_data, data)
+            data_map[obj.handle] = data
+            self.object_cache.discard(key, obj.handle)
+            self.tombstones.restore(key, obj.handle, int(time.time()))
+            if data_id_map is not None:
+                if not (oldid is False) and oldid in data_id_map:
+                    del data_id_map[oldid]
+                data_id_map[obj.wearnow_id] = data
+        self.__update_keys(key, obj.handle, old_data, data)
+        self.update_reference_map(obj, trans)
+        self.__update_attribute_indexes(key, obj.handle, data)
+        self.__update_text_indexes(key, obj.handle, data)
+        self.__log_change(key, obj.handle, data)
+
+    @staticmethod
+    def __set_change(obj, key, old_data, change_time):
+        """
+        Set the change time of a committed object: the given time, else the
+        current time. The time of an edit is made later than the time of the
+        previous version, so that a change time identifies a version even
+        for edits made within a second.
+        """
+        if change_time is not None:
+            obj.change = int(change_time)
+            return
+        change = int(time.time())
+        if old_data is not None:
+            old_change = old_data[KEY_TO_FIELDS_MAP[key].index("change")]
+            if change <= old_change:
+                change = old_change + 1
+        obj.change = change
 
     def get_wearnow_ids(self, obj_key):
         key2table = {
@@ -832,8 +1601,14 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         return list(key2table[obj_key].keys())
 
     def transaction_begin(self, transaction):
-        ## FIXME
-        return
+        """
+        Start a transaction. A batch transaction can not be undone, so it
+        clears the undo history.
+        """
+        if transaction.batch:
+            self.undodb.clear()
+            self.abort_possible = False
+        self.transaction = transaction
 
     def set_owner(self, owner):
         self.owner.set_from(owner)
@@ -901,13 +1676,8 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         preserving the change in the passed transaction.
         """
 
-        if self.readonly or not handle:
-            return
-        if handle in self.textile_map:
-            textile = Textile.create(self.textile_map[handle])
-            del self.textile_map[handle]
-            del self.textile_id_map[textile.wearnow_id]
-            self.emit("textile-delete", ([handle],))
+        self.__do_remove(handle, transaction, self.textile_map,
+                         self.textile_id_map, TEXTILE_KEY)
 
     def remove_object(self, handle, transaction):
         """
@@ -954,69 +1724,45 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         if self.readonly or not handle:
             return
         if handle in data_map:
-            obj = self._tables[KEY_TO_CLASS_MAP[key]]["class_func"].create(data_map[handle])
-            del data_map[handle]
-            if data_id_map:
-                del data_id_map[obj.wearnow_id]
-            self.emit(KEY_TO_NAME_MAP[key] + "-delete", ([handle],))
+            old_data = data_map[handle]
+            obj = self._tables[KEY_TO_CLASS_MAP[key]]["class_func"].create(old_data)
+            if transaction is None:
+                pass
+            elif transaction.batch:
+                # not undoable, only kept for the signal on commit
+                transaction[(key, TXNDEL)].append((handle, None))
+            else:
+                transaction.add(key, TXNDEL, handle, old_data, None)
+            with self.__lock:
+                self.__keep(key, handle, old_data, None)
+                del data_map[handle]
+                self.object_cache.discard(key, handle)
+                self.tombstones.remove(key, handle, int(time.time()))
+                # objects without WearNow ID share one entry, which an
+                # earlier removal may have taken
+                if data_id_map and obj.wearnow_id in data_id_map:
+                    del data_id_map[obj.wearnow_id]
+            self.__update_keys(key, handle, old_data, None)
+            self.delete_primary_from_reference_map(handle, transaction)
+            self.attribute_indexes.remove(handle)
+            if key in self.text_indexes:
+                self.text_indexes[key].remove(handle)
+            self.__log_change(key, handle, None)
+            if transaction is None:
+                self.emit(KEY_TO_NAME_MAP[key] + "-delete", ([handle],))
+
+    def update_reference_map(self, obj, transaction, txn=None):
+        """
+        Set the references of the primary object in the reference_map.
+        """
+        self.reference_map.update(obj.__class__.__name__, obj.handle,
+                                  obj.get_referenced_handles_recursively())
 
     def delete_primary_from_reference_map(self, handle, transaction, txn=None):
         """
         Remove all references to the primary object from the reference_map.
-        handle should be utf-8
         """
-        primary_cur = self.get_reference_map_primary_cursor()
-
-        try:
-            ret = primary_cur.set(handle)
-        except:
-            ret = None
-
-        remove_list = set()
-        while (ret is not None):
-            (key, data) = ret
-
-            # data values are of the form:
-            #   ((primary_object_class_name, primary_object_handle),
-            #    (referenced_object_class_name, referenced_object_handle))
-
-            # so we need the second tuple give us a reference that we can
-            # combine with the primary_handle to get the main key.
-            main_key = (handle.decode('utf-8'), pickle.loads(data)[1][1])
-
-            # The trick is not to remove while inside the cursor,
-            # but collect them all and remove after the cursor is closed
-            remove_list.add(main_key)
-
-            ret = primary_cur.next_dup()
-
-        primary_cur.close()
-
-        # Now that the cursor is closed, we can remove things
-        for main_key in remove_list:
-            self.__remove_reference(main_key, transaction, txn)
-
-    def __remove_reference(self, key, transaction, txn):
-        """
-        Remove the reference specified by the key, preserving the change in
-        the passed transaction.
-        """
-        if isinstance(key, tuple):
-            #create a byte string key, first validity check in python 3!
-            for val in key:
-                if isinstance(val, bytes):
-                    raise DbError(_('An attempt is made to save a reference key '
-                        'which is partly bytecode, this is not allowed.\n'
-                        'Key is %s') % str(key))
-            key = str(key)
-        if isinstance(key, str):
-            key = key.encode('utf-8')
-        if not self.readonly:
-            if not transaction.batch:
-                old_data = self.reference_map.get(key, txn=txn)
-                transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
-                #transaction.reference_del.append(str(key))
-            self.reference_map.delete(key, txn=txn)
+        self.reference_map.remove(handle)
 
     ## Missing:
 
@@ -1026,17 +1772,258 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def close(self):
         if self._directory:
-            from wearnow.plugins.export.exportxml import XmlWriter
-            from wearnow.gui.user import User
-            writer = XmlWriter(self, User(), strip_photos=0, compress=1)
-            filename = os.path.join(self._directory, "data.wearnow")
-            writer.write(filename)
+            if self._compactor is not None:
+                self._compactor.join()
+                self._compactor = None
+            filename = os.path.join(self._directory, SNAPSHOT)
+            if (not self.__snapshot_is_current() and
+                    self.__write_snapshot(self.__copy_tables(), filename)):
+                if self._journal is not None:
+                    self._journal.truncate()
+                self.__remove_file(os.path.join(self._directory, JOURNAL_OLD))
             filename = os.path.join(self._directory, "meta_data.db")
             touch(filename)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self.object_cache.clear()
+        self.undodb.close()
+
+    def __snapshot_is_current(self):
+        """
+        Return True if the snapshot file holds the database as it is, so
+        it need not be written again: nothing was journaled since it was
+        written and the data the journal does not keep is unchanged.
+        """
+        return (self._journal is not None and self._journal.count == 0 and
+                not os.path.exists(os.path.join(self._directory,
+                                                JOURNAL_OLD)) and
+                os.path.isfile(os.path.join(self._directory, SNAPSHOT)) and
+                self.__saved_metadata == self.__unjournaled_metadata())
+
+    def __unjournaled_metadata(self):
+        """
+        Return the data of the snapshot that changes without a record being
+        journaled: the owner, the bookmarks and the number of tombstones,
+        which are only purged.
+        """
+        return (self.owner.serialize(),
+                [list(getattr(self, name).handles)
+                 for name in ("bookmarks", "ensemble_bookmarks",
+                              "media_bookmarks", "note_bookmarks")],
+                len(self.tombstones))
+
+    def compact(self, background=True):
+        """
+        Fold the journal into a new snapshot of the database.
+
+        The journal is moved aside and a copy of the tables is taken, so
+        commits can continue while the snapshot is written. Only when the
+        new snapshot is in place, the old journal is removed. If the
+        snapshot can not be written, the old journal is replayed at the
+        next load.
+        """
+        if self._journal is None:
+            return
+        if self._compactor is not None:
+            if background and self._compactor.is_alive():
+                return
+            self._compactor.join()
+            self._compactor = None
+        self._journal.rotate(os.path.join(self._directory, JOURNAL_OLD))
+        snapshot = self.__copy_tables()
+        if background:
+            self._compactor = threading.Thread(target=self.__compact,
+                                               args=(snapshot,),
+                                               name="DictionaryDb compaction")
+            self._compactor.daemon = True
+            self._compactor.start()
+        else:
+            self.__compact(snapshot)
+
+    def __compact(self, snapshot):
+        """
+        Write the snapshot and drop the journal it supersedes.
+        """
+        filename = os.path.join(self._directory, SNAPSHOT)
+        if self.__write_snapshot(snapshot, filename):
+            self.__remove_file(os.path.join(self._directory, JOURNAL_OLD))
+
+    def __copy_tables(self):
+        """
+        Return a copy of the tables and metadata to write in a snapshot.
+
+        Stored records are never modified in place, so a shallow copy of
+        the maps is enough to keep a consistent state. Records that were
+        never fetched from the current snapshot are not decoded.
+        """
+        tables = {}
+        for key, (data_map, data_id_map) in self.__get_maps().items():
+            tables[key] = (data_map.copy(),
+                           None if data_id_map is None
+                           else data_id_map.copy())
+        metadata = {
+            "owner": self.owner.serialize(),
+            "bookmarks": list(self.bookmarks.handles),
+            "ensemble_bookmarks": list(self.ensemble_bookmarks.handles),
+            "media_bookmarks": list(self.media_bookmarks.handles),
+            "note_bookmarks": list(self.note_bookmarks.handles),
+            "references": self.reference_map.serialize(),
+            "attribute_indexes": self.attribute_indexes.serialize(),
+            "text_indexes": dict((key, index.serialize()) for (key, index)
+                                 in self.text_indexes.items()),
+            "tombstones": self.tombstones.serialize(),
+            }
+        return (tables, metadata)
+
+    @staticmethod
+    def __write_snapshot(snapshot, filename):
+        """
+        Write a copy of the tables to filename, replacing it only once
+        complete.
+        """
+        (tables, metadata) = snapshot
+        records = dict((key, _snapshot_records(data_map, data_id_map))
+                       for key, (data_map, data_id_map) in tables.items())
+        tmpname = filename + ".new"
+        try:
+            write_snapshot(tmpname, records, metadata)
+        except (OSError, IOError) as msg:
+            _LOG.error("Could not write snapshot %s: %s", filename, msg)
+            return False
+        os.replace(tmpname, filename)
+        return True
+
+    @staticmethod
+    def __remove_file(filename):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+    def __log_change(self, key, handle, data):
+        """
+        Append a changed record to the journal, if there is one.
+        """
+        if self._journal is not None:
+            self._journal.append(key, handle, data)
+            if self._journal.count >= self.journal_compact_limit:
+                self.compact(background=True)
+
+    def __get_maps(self):
+        """
+        Return a dict mapping the object key to its (map, id_map) pair.
+        """
+        return {
+            TEXTILE_KEY: (self.textile_map, self.textile_id_map),
+            ENSEMBLE_KEY: (self.ensemble_map, self.ensemble_id_map),
+            MEDIA_KEY: (self.media_map, self.media_id_map),
+            NOTE_KEY: (self.note_map, self.note_id_map),
+            TAG_KEY: (self.tag_map, None),
+            }
+
+    def __apply_record(self, key, handle, data, when):
+        """
+        Store a journaled record directly in the tables; when is the time
+        of the change, for the tombstones.
+        """
+        data_map, data_id_map = self.__get_maps()[key]
+        self.object_cache.discard(key, handle)
+        if handle in data_map:
+            with self.__lock:
+                old_data = data_map[handle]
+                self.__keep(key, handle, old_data, data)
+                # a lazy id map reads the record, so it goes first
+                if data_id_map is not None:
+                    data_id_map.pop(old_data[1], None)
+                del data_map[handle]
+                if data is None:
+                    self.tombstones.remove(key, handle, when)
+            self.__update_keys(key, handle, old_data, None)
+            self.delete_primary_from_reference_map(handle, None)
+            self.attribute_indexes.remove(handle)
+            if key in self.text_indexes:
+                self.text_indexes[key].remove(handle)
+        if data is not None:
+            with self.__lock:
+                self.__keep(key, handle, None, data)
+                data_map[handle] = data
+                if data_id_map is not None:
+                    data_id_map[data[1]] = data
+                self.tombstones.restore(key, handle, when)
+            self.__update_keys(key, handle, None, data)
+            class_ = self._tables[KEY_TO_CLASS_MAP[key]]["class_func"]
+            self.update_reference_map(class_.create(data), None)
+            self.__update_attribute_indexes(key, handle, data)
+            self.__update_text_indexes(key, handle, data)
+
+    def __keep(self, key, handle, old_data, new_data):
+        """
+        Hand the current version of a record, and of the WearNow IDs it
+        changes, to the open snapshots. Called with the lock held, before
+        the tables are changed.
+        """
+        if not self.__snapshots:
+            return
+        handles_by_id = {}
+        data_id_map = self.__get_maps()[key][1]
+        if data_id_map is not None:
+            for data in (old_data, new_data):
+                if data is not None and data[1] not in handles_by_id:
+                    handles_by_id[data[1]] = (
+                        _id_handle(data_id_map, data[1])
+                        if data[1] in data_id_map else None)
+        for snapshot in list(self.__snapshots):
+            snapshot.keep(key, handle, old_data, handles_by_id)
+
+    def snapshot(self):
+        """
+        Return a read-only view of the database as it is now.
+
+        Taking a snapshot copies nothing: the database keeps the old
+        version of a record for its snapshots when it changes the record.
+        Long readers, like exports and reports, can read a snapshot in
+        another thread while the database is being edited. Close the
+        snapshot when done, so the database stops keeping data for it.
+        """
+        with self.__lock:
+            snapshot = DictionarySnapshot(self, self.__get_maps(),
+                                          self.__lock)
+            self.__snapshots.add(snapshot)
+        return snapshot
+
+    def release_snapshot(self, snapshot):
+        """
+        Stop keeping data for a snapshot.
+        """
+        with self.__lock:
+            self.__snapshots.discard(snapshot)
+
+    def restore_record(self, key, handle, data):
+        """
+        Store the serialized data of an object outside of a transaction, as
+        done by undo and redo. If data is None, the object is removed.
+        """
+        self.__apply_record(key, handle, data, int(time.time()))
+        self.__log_change(key, handle, data)
 
     def find_backlink_handles(self, handle, include_classes=None):
-        ## FIXME
-        return []
+        """
+        Find all objects that hold a reference to the object handle.
+
+        Returns an iterator over a list of (class_name, handle) tuples.
+
+        :param handle: handle of the object to search for.
+        :type handle: database handle
+        :param include_classes: list of class names to include in the results.
+            Default is None which includes all classes.
+        :type include_classes: list of class names
+        """
+        if isinstance(handle, bytes):
+            handle = str(handle, "utf-8")
+        return self.reference_map.find_backlink_handles(handle,
+                                                        include_classes)
 
     def find_initial_textile(self):
         items = self.textile_map.keys()
@@ -1104,6 +2091,9 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def is_open(self):
         return self._directory is not None
 
+    def iter_media_object_handles(self):
+        return (key for key in self.media_map.keys())
+
     def iter_media_objects(self):
         return (MediaObject.create(key) for key in self.media_map.values())
 
@@ -1124,27 +2114,104 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
              force_bsddb_upgrade=False,
              force_bsddb_downgrade=False,
              force_python_upgrade=False):
-        from wearnow.plugins.importer.importxml import importData
-        from wearnow.gui.user import User
         self._directory = directory
         self.full_name = os.path.abspath(self._directory)
         self.path = self.full_name
         self.brief_name = os.path.basename(self._directory)
-        filename = os.path.join(directory, "data.wearnow")
+        self.object_cache.clear()
+        self.tombstones.clear()
+        self.__saved_metadata = None
+        filename = os.path.join(directory, SNAPSHOT)
         if os.path.isfile(filename):
-            importData(self, filename, User())
+            self.__load_snapshot(filename)
+        elif os.path.isfile(os.path.join(directory, SNAPSHOT_XML)):
+            from wearnow.plugins.importer.importxml import importData
+            from wearnow.gui.user import User
+            importData(self, os.path.join(directory, SNAPSHOT_XML), User())
+        # changes made after the snapshot was written; the journal does not
+        # keep the time of a removal, so the time it was last written is
+        # used, which is not earlier
+        for name in (JOURNAL_OLD, JOURNAL):
+            filename = os.path.join(directory, name)
+            if not os.path.isfile(filename):
+                continue
+            when = int(os.path.getmtime(filename))
+            for (key, handle, data) in replay_journal(filename):
+                self.__apply_record(key, handle, data, when)
+        self.__rebuild_id_allocators()
+        self.__sorted_keys = {}
+        self._journal = DbJournal(os.path.join(directory, JOURNAL))
+        self._journal.open()
+        self.undodb.open(os.path.join(directory, DBUNDOFN))
+        self.abort_possible = True
+
+    def __load_snapshot(self, filename):
+        """
+        Open a binary snapshot; records are only decoded when first used.
+        """
+        self._reader = SnapshotReader(filename)
+        for (key, name, table) in ((TEXTILE_KEY, "textile", "Textile"),
+                                   (ENSEMBLE_KEY, "ensemble", "Ensemble"),
+                                   (MEDIA_KEY, "media", "Media"),
+                                   (NOTE_KEY, "note", "Note"),
+                                   (TAG_KEY, "tag", "Tag")):
+            handles, wearnow_ids = self._reader.get_keys(key)
+            data_map = LazyMap(Table(self._tables[table]),
+                               dict(zip(handles, range(len(handles)))),
+                               partial(self._reader.get_data, key),
+                               partial(self._reader.get_record, key))
+            setattr(self, name + "_map", data_map)
+            if key != TAG_KEY:
+                setattr(self, name + "_id_map",
+                        LazyMap(None, dict(zip(wearnow_ids, handles)),
+                                data_map.__getitem__))
+        metadata = self._reader.metadata or {}
+        # indexes missing from the file are rebuilt and written on close
+        complete = True
+        if "owner" in metadata:
+            self.owner.unserialize(metadata["owner"])
+        for name in ("bookmarks", "ensemble_bookmarks", "media_bookmarks",
+                     "note_bookmarks"):
+            getattr(self, name).handles = list(metadata.get(name, []))
+        if "references" in metadata:
+            self.reference_map.unserialize(metadata["references"])
+        else:
+            self.reindex_reference_map()
+            complete = False
+        if not self.attribute_indexes.unserialize(
+                metadata.get("attribute_indexes", {})):
+            self.reindex_attribute_indexes()
+            complete = False
+        text_indexes = metadata.get("text_indexes", {})
+        if all(key in text_indexes for key in self.text_indexes):
+            for (key, index) in self.text_indexes.items():
+                index.unserialize(text_indexes[key])
+        else:
+            self.reindex_text_indexes()
+            complete = False
+        if "tombstones" in metadata:
+            self.tombstones.unserialize(metadata["tombstones"])
+        if complete:
+            self.__saved_metadata = self.__unjournaled_metadata()
 
     def redo(self, update_history=True):
-        ## FIXME
-        pass
+        """
+        Redo the last undone transaction.
+        """
+        result = self.undodb.redo(update_history)
+        if result and self._journal is not None:
+            self._journal.sync()
+        return result
 
     def restore(self):
         ## FIXME
         pass
 
     def set_prefixes(self, textile, media, ensemble, note):
-        ## FIXME
-        pass
+        self.set_textile_id_prefix(textile)
+        self.set_object_id_prefix(media)
+        self.set_ensemble_id_prefix(ensemble)
+        self.set_note_id_prefix(note)
 
     def set_save_path(self, directory):
         self._directory = directory
@@ -1153,8 +2220,13 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.brief_name = os.path.basename(self._directory)
 
     def undo(self, update_history=True):
-        ## FIXME
-        pass
+        """
+        Undo the last committed transaction.
+        """
+        result = self.undodb.undo(update_history)
+        if result and self._journal is not None:
+            self._journal.sync()
+        return result
 
     def write_version(self, directory):
         """Write files for a newly created DB."""
@@ -1202,9 +2274,237 @@ class DictionaryDb(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             name = None
         return name
 
-    def reindex_reference_map(self):
-        ## FIXME
-        pass
+    def reindex_reference_map(self, callback=None):
+        """
+        Rebuild the reference_map from all primary records.
+        """
+        self.reference_map.clear()
+        total = sum(len(data_map) for (data_map, data_id_map)
+                    in self.__get_maps().values())
+        count = 0
+        for key, (data_map, data_id_map) in self.__get_maps().items():
+            class_ = self._tables[KEY_TO_CLASS_MAP[key]]["class_func"]
+            for data in data_map.values():
+                self.update_reference_map(class_.create(data), None)
+                count += 1
+                if callback:
+                    callback(100 * count // total)
+
+    def __update_attribute_indexes(self, key, handle, data):
+        """
+        Index the attribute values of a committed record.
+        """
+        if key == TEXTILE_KEY:
+            self.attribute_indexes.update(handle, data[TEXTILE_ATTRIBUTES])
+
+    def reindex_attribute_indexes(self, callback=None):
+        """
+        Rebuild the attribute indexes from all textile records.
+        """
+        self.attribute_indexes.clear()
+        total = len(self.textile_map)
+        def records():
+            for count, (handle, data) in enumerate(self.textile_map.items(),
+                                                   1):
+                yield (handle, data[TEXTILE_ATTRIBUTES])
+                if callback:
+                    callback(100 * count // total)
+        self.attribute_indexes.fill(records())
+
+    def declare_attribute_index(self, attr_type, sorted=False):
+        """
+        Maintain a secondary index on the values of a textile attribute.
+
+        A hash index finds textiles with an exact value, see
+        :meth:`find_textile_handles_by_attribute`. A sorted index also
+        allows to look up ranges of numeric values, see
+        :meth:`find_textile_handles_in_attribute_range`.
+
+        :param attr_type: the attribute type to index
+        :type attr_type: AttributeType, int or str
+        :param sorted: if True, index numeric values in order
+        :type sorted: bool
+        """
+        if attr_type in self.attribute_indexes:
+            return
+        self.attribute_indexes.declare(attr_type, sorted)
+        self.attribute_indexes.fill((handle, data[TEXTILE_ATTRIBUTES])
+                                    for (handle, data)
+                                    in self.textile_map.items())
+
+    def find_textile_handles_by_attribute(self, attr_type, value):
+        """
+        Return the list of handles of the textiles having an attribute of
+        the given type and value.
+
+        Without an index on attr_type, all textiles are scanned.
+        """
+        index = self.attribute_indexes.get(attr_type)
+        if index is not None:
+            return index.find(value)
+        key = attribute_type_key(attr_type)
+        return [handle for (handle, data) in self.textile_map.items()
+                if any(attribute_type_key(attr[2]) == key and
+                       attr[3] == value
+                       for attr in data[TEXTILE_ATTRIBUTES])]
+
+    def find_textile_handles_in_attribute_range(self, attr_type, low=None,
+                                                high=None):
+        """
+        Return the list of handles of the textiles having a numeric value
+        for the attribute type between low and high, bounds included, in
+        order of that value. A bound of None is not checked.
+
+        A textile can be returned more than once if it has several
+        attributes of the type. Without a sorted index on attr_type, all
+        textiles are scanned.
+        """
+        index = self.attribute_indexes.get(attr_type)
+        if isinstance(index, SortedAttributeIndex):
+            return [handle for (value, handle) in index.find_range(low, high)]
+        index = SortedAttributeIndex(attr_type)
+        key = index.attr_type
+        for (handle, data) in self.textile_map.items():
+            index.update(handle, [attr[3] for attr in data[TEXTILE_ATTRIBUTES]
+                                  if attribute_type_key(attr[2]) == key])
+        return [handle for (value, handle) in index.find_range(low, high)]
+
+    def get_textile_attribute_values(self, handle, attr_type):
+        """
+        Return the tuple of indexed values of the attribute type of the
+        textile handle, without loading the textile.
+
+        Values of sorted indexes are returned as float. Without an index
+        on attr_type, the textile record is read.
+        """
+        index = self.attribute_indexes.get(attr_type)
+        if index is not None:
+            return index.get_values(handle)
+        key = attribute_type_key(attr_type)
+        data = self.textile_map.get(handle)
+        if data is None:
+            return ()
+        return tuple(attr[3] for attr in data[TEXTILE_ATTRIBUTES]
+                     if attribute_type_key(attr[2]) == key)
+
+    @staticmethod
+    def __get_texts(key, data):
+        """
+        Return the texts of a serialized record that are indexed for full
+        text search: the description and attribute values of a textile, the
+        text of a note.
+        """
+        if key == TEXTILE_KEY:
+            return ([data[TEXTILE_DESCRIPTION]] +
+                    [attr[3] for attr in data[TEXTILE_ATTRIBUTES]])
+        return [data[NOTE_TEXT][0]]
+
+    def __update_text_indexes(self, key, handle, data):
+        """
+        Index the texts of a committed record.
+        """
+        index = self.text_indexes.get(key)
+        if index is not None:
+            index.update(handle, self.__get_texts(key, data))
+
+    def reindex_text_indexes(self, callback=None):
+        """
+        Rebuild the full-text indexes from all textile and note records.
+        """
+        maps = self.__get_maps()
+        total = sum(len(maps[key][0]) for key in self.text_indexes)
+        count = 0
+        for (key, index) in self.text_indexes.items():
+            index.clear()
+            for (handle, data) in maps[key][0].items():
+                index.update(handle, self.__get_texts(key, data))
+                count += 1
+                if callback:
+                    callback(100 * count // total)
+
+    def __get_text_index(self, obj_key):
+        try:
+            return self.text_indexes[obj_key]
+        except KeyError:
+            raise NotImplementedError("no full-text index on %s" %
+                                      KEY_TO_CLASS_MAP[obj_key])
+
+    def find_handles_by_text(self, obj_key, text, prefix=False):
+        """
+        Return the list of handles of the objects of type obj_key having
+        all words of the text, ignoring case.
+
+        Textiles are indexed on their description and attribute values,
+        notes on their text.
+
+        :param obj_key: TEXTILE_KEY or NOTE_KEY
+        :type obj_key: int
+        :param text: the words to look for
+        :type text: str
+        :param prefix: if True, the last word only needs to start a word of
+                       the object, for type-ahead search
+        :type prefix: bool
+        """
+        return self.__get_text_index(obj_key).find(text, prefix)
+
+    def find_handles_containing_text(self, obj_key, text):
+        """
+        Return the list of handles of the objects of type obj_key whose
+        indexed texts may contain the text, ignoring case. All objects that
+        contain it are returned, but some returned objects may not contain
+        it, so the objects must still be checked.
+
+        Return None if the text has no words, in which case the index can
+        not narrow the search.
+        """
+        return self.__get_text_index(obj_key).find_containing(text)
+
+    def complete_text(self, obj_key, prefix, limit=None):
+        """
+        Return the indexed words of the objects of type obj_key that start
+        with prefix, in order, at most limit of them if limit is not None.
+        """
+        return self.__get_text_index(obj_key).complete(prefix, limit)
+
+    def set_object_cache_size(self, size):
+        """
+        Set the number of read-only views kept by the object cache; 0 turns
+        the cache off.
+        """
+        self.object_cache.resize(size)
+
+    def get_object_cache_stats(self):
+        """
+        Return a dict with the number of objects in the object cache
+        ("count"), its size ("size"), and the numbers of "hits", "misses"
+        and "evictions".
+        """
+        return self.object_cache.get_stats()
+
+    def get_removed_handles(self, obj_key, since):
+        """
+        Return the sorted handles of the objects of type obj_key removed
+        at or after the time since, in seconds since the epoch.
+        """
+        with self.__lock:
+            return self.tombstones.removed_since(obj_key, since)
+
+    def get_restored_handles(self, obj_key, since):
+        """
+        Return the sorted handles of the objects of type obj_key that were
+        removed, and came back with their old change time at or after the
+        time since, as done by undo.
+        """
+        with self.__lock:
+            return self.tombstones.restored_since(obj_key, since)
+
+    def purge_tombstones(self, before):
+        """
+        Forget the objects removed before the time before. The changes
+        since an earlier time can no longer be listed completely.
+        """
+        with self.__lock:
+            self.tombstones.purge(before)
 
     def rebuild_secondary(self, update):
         ## FIXME
@@ -0,0 +1,364 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ....tex.lib import Textile, Attribute, Note, Ensemble, MediaObject
+from ....tex.proxy.proxybase import ProxyDbBase
+from ....tex.filters import TextMatcher, get_text_cache
+from ....tex.db.txn import DbTxn
+from ....tex.db.dbconst import (KEY_TO_FIELDS_MAP, TEXTILE_KEY, ENSEMBLE_KEY,
+                              MEDIA_KEY, NOTE_KEY)
+from ..dictionarydb import DictionaryDb
+
+def make_textile(index):
+    """Return a new garment with an attribute and a tag."""
+    textile = Textile()
+    textile.set_wearnow_id("I%04d" % index)
+    textile.set_description("Garment %d" % index)
+    attribute = Attribute()
+    attribute.set_type("Material")
+    attribute.set_value("wool")
+    textile.add_attribute(attribute)
+    textile.add_tag("TAG1")
+    return textile
+
+class DbTestCase(unittest.TestCase):
+    """A DictionaryDb with three garments in a temporary directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DictionaryDb()
+        self.db.load(self.directory)
+        with DbTxn("Add garments", self.db) as trans:
+            self.handles = [self.db.add_textile(make_textile(index), trans)
+                            for index in range(3)]
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def reload(self):
+        """Close the database and load it again from its directory."""
+        self.db.close()
+        self.db = DictionaryDb()
+        self.db.load(self.directory)
+
+class DictionaryDbTest(DbTestCase):
+    """Test a DictionaryDb in a temporary directory."""
+
+    def test_view_cache(self):
+        handle = self.handles[0]
+        view = self.db.get_textile_from_handle(handle, view=True)
+        self.assertIs(self.db.get_textile_from_handle(handle, view=True),
+                      view)
+        # the cached view is shared, so it can not be changed
+        self.assertRaises(AttributeError,
+                          view.get_attribute_list()[0].set_value, "99")
+        self.assertRaises(AttributeError, view.add_tag, "EVIL")
+        view = self.db.get_textile_from_handle(handle, view=True)
+        self.assertEqual(view.get_attribute_list()[0].get_value(), "wool")
+        self.assertEqual(view.get_tag_list(), ("TAG1",))
+        # a normal object is not cached
+        textile = self.db.get_textile_from_handle(handle)
+        textile.set_description("changed")
+        self.assertEqual(view.get_description(), "Garment 0")
+        with DbTxn("Change garment", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+        self.assertEqual(self.db.get_textile_from_handle(
+            handle, view=True).get_description(), "changed")
+
+    def test_sorted_handles(self):
+        with DbTxn("Add garments", self.db) as trans:
+            for (handle, wearnow_id) in (("H3", "A0001"), ("H1", ""),
+                                         ("H2", "Z0001"), ("H0", "")):
+                textile = Textile()
+                textile.set_handle(handle)
+                textile.set_wearnow_id(wearnow_id)
+                self.db.commit_textile(textile, trans)
+        # objects without WearNow ID first, by handle, then by WearNow ID
+        expected = ["H0", "H1", "H3"] + self.handles + ["H2"]
+        self.assertEqual(self.db.get_textile_handles(sort_handles=True),
+                         expected)
+        snapshot = self.db.snapshot()
+        self.assertEqual(snapshot.get_textile_handles(sort_handles=True),
+                         expected)
+        snapshot.close()
+        # the ordered index is kept up to date
+        textile = self.db.get_textile_from_handle("H1")
+        textile.set_wearnow_id("M0001")
+        with DbTxn("Set WearNow ID", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+            self.db.remove_textile("H0", trans)
+        self.assertEqual(self.db.get_textile_handles(sort_handles=True),
+                         ["H3"] + self.handles + ["H1", "H2"])
+
+    def test_signals(self):
+        emitted = []
+        for signal in ("textile-add", "textile-update", "textile-delete",
+                       "note-add"):
+            self.db.connect(signal, lambda handles, signal=signal:
+                            emitted.append((signal, handles)))
+        with DbTxn("Change garments", self.db) as trans:
+            added = self.db.add_textile(make_textile(3), trans)
+            removed = self.db.add_textile(make_textile(4), trans)
+            changed = self.db.add_textile(make_textile(5), trans)
+            for handle in (self.handles[0], changed, self.handles[0]):
+                textile = self.db.get_textile_from_handle(handle)
+                textile.set_description("changed")
+                self.db.commit_textile(textile, trans)
+            self.db.remove_textile(removed, trans)
+            self.db.remove_textile(self.handles[1], trans)
+            note = self.db.add_note(Note("text"), trans)
+            # nothing is emitted before the transaction is committed
+            self.assertEqual(emitted, [])
+        # one signal per object type and kind of change
+        self.assertEqual(sorted(emitted),
+                         [("note-add", [note]),
+                          ("textile-add", [added, changed]),
+                          ("textile-delete", [self.handles[1]]),
+                          ("textile-update", [self.handles[0]])])
+        # an object added and removed again is not reported
+        del emitted[:]
+        with DbTxn("Add and remove garment", self.db) as trans:
+            handle = self.db.add_textile(make_textile(6), trans)
+            self.db.remove_textile(handle, trans)
+        self.assertEqual(emitted, [])
+
+    def test_text_after_edit(self):
+        matcher = TextMatcher("garment 0", cache=get_text_cache(self.db))
+        self.assertEqual(matcher.find_handles(self.db, TEXTILE_KEY),
+                         self.handles[:1])
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        self.assertTrue(matcher.match(textile))
+        # edits made within a second still get a new change time, so the
+        # cached text of the old version is not used
+        for description in ("Coat", "Garment 0 again"):
+            change = textile.change
+            textile.set_description(description)
+            with DbTxn("Change garment", self.db) as trans:
+                self.db.commit_textile(textile, trans)
+            textile = self.db.get_textile_from_handle(self.handles[0])
+            self.assertGreater(textile.change, change)
+            self.assertEqual(matcher.match(textile),
+                             description != "Coat")
+            self.assertEqual(matcher.find_handles(self.db, TEXTILE_KEY),
+                             self.handles[:1] if description != "Coat"
+                             else [])
+
+    def test_close_keeps_snapshot(self):
+        filename = os.path.join(self.directory, "data.snapshot")
+
+        def stat():
+            result = os.stat(filename)
+            return (result.st_ino, result.st_mtime_ns)
+
+        self.reload()
+        written = stat()
+        # nothing changed, the snapshot is left alone
+        self.reload()
+        self.assertEqual(stat(), written)
+        self.db.get_textile_from_handle(self.handles[0])
+        self.reload()
+        self.assertEqual(stat(), written)
+        # a committed change is folded into it
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.set_description("changed")
+        with DbTxn("Change garment", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+        self.reload()
+        self.assertNotEqual(stat(), written)
+        written = stat()
+        self.assertEqual(self.db.get_textile_from_handle(
+            self.handles[0]).get_description(), "changed")
+        # so is a change that is not journaled
+        self.db.get_owner().set_name("Owner")
+        self.db.bookmarks.append(self.handles[1])
+        self.reload()
+        self.assertNotEqual(stat(), written)
+        self.assertEqual(self.db.get_owner().get_name(), "Owner")
+        self.assertEqual(self.db.bookmarks.get(), [self.handles[1]])
+
+class PublicProxyDb(ProxyDbBase):
+    """A proxy that hides the private garments."""
+
+    def include_textile(self, handle):
+        return not self.db.get_textile_from_handle(handle).get_privacy()
+
+class CursorTest(DbTestCase):
+    """Test cursors projected on some fields against full objects."""
+
+    # table, cursor, object getter and the fields the views sort on, with
+    # the method returning the field from the object
+    TABLES = ((TEXTILE_KEY, "get_textile_cursor", "get_textile_from_handle",
+               (("description", "get_description"),
+                ("wearnow_id", "get_wearnow_id"))),
+              (ENSEMBLE_KEY, "get_ensemble_cursor",
+               "get_ensemble_from_handle",
+               (("wearnow_id", "get_wearnow_id"),)),
+              (MEDIA_KEY, "get_media_cursor", "get_object_from_handle",
+               (("desc", "get_description"),
+                ("wearnow_id", "get_wearnow_id"))),
+              (NOTE_KEY, "get_note_cursor", "get_note_from_handle",
+               (("wearnow_id", "get_wearnow_id"),)))
+
+    def setUp(self):
+        DbTestCase.setUp(self)
+        with DbTxn("Add objects", self.db) as trans:
+            textile = self.db.get_textile_from_handle(self.handles[1])
+            textile.set_privacy(True)
+            self.db.commit_textile(textile, trans)
+            for index in range(2):
+                self.db.add_ensemble(Ensemble(), trans)
+                media = MediaObject()
+                media.set_description("Photo %d" % index)
+                self.db.add_object(media, trans)
+                self.db.add_note(Note("Text %d" % index), trans)
+
+    def check(self, db):
+        for (key, cursor, get_object, sort_fields) in self.TABLES:
+            with getattr(db, cursor)() as records:
+                full = dict((handle.decode("utf-8")
+                             if isinstance(handle, bytes) else handle, data)
+                            for (handle, data) in records)
+            self.assertTrue(full)
+            for (field, getter) in sort_fields:
+                with getattr(db, cursor)(fields=(field,)) as records:
+                    projected = dict(records)
+                self.assertEqual(projected, dict(
+                    (handle, (getattr(getattr(db, get_object)(handle),
+                                      getter)(),))
+                    for handle in full))
+            # all fields, in another order
+            names = KEY_TO_FIELDS_MAP[key]
+            fields = tuple(reversed(names))
+            with getattr(db, cursor)(fields=fields) as records:
+                projected = dict(records)
+            self.assertEqual(projected, dict(
+                (handle, tuple(data[names.index(field)] for field in fields))
+                for (handle, data) in full.items()))
+
+    def test_database(self):
+        self.check(self.db)
+
+    def test_snapshot_file(self):
+        self.reload()
+        self.check(self.db)
+
+    def test_snapshot(self):
+        snapshot = self.db.snapshot()
+        self.check(snapshot)
+        snapshot.close()
+
+    def test_proxy(self):
+        proxy = PublicProxyDb(self.db)
+        self.check(proxy)
+        with proxy.get_textile_cursor(fields=("wearnow_id",)) as records:
+            self.assertNotIn(self.handles[1], dict(records))
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, self.db.get_textile_cursor,
+                          fields=("desc",))
+
+class DictionarySnapshotTest(DbTestCase):
+    """Test reading a snapshot while the database changes."""
+
+    def change(self):
+        """Change, renumber, remove and add garments."""
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.set_description("changed")
+        textile.set_wearnow_id("I0009")
+        with DbTxn("Change garments", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+            self.db.remove_textile(self.handles[1], trans)
+            return self.db.add_textile(make_textile(1), trans)
+
+    def check(self, snapshot):
+        """Check that snapshot shows the garments as they were at first."""
+        self.assertEqual(snapshot.get_number_of_textiles(), 3)
+        self.assertEqual(sorted(snapshot.get_textile_handles()),
+                         sorted(self.handles))
+        self.assertEqual(dict((textile.handle, textile.get_description())
+                              for textile in snapshot.iter_textiles()),
+                         dict((handle, "Garment %d" % index)
+                              for (index, handle) in enumerate(self.handles)))
+        for index in range(3):
+            self.assertEqual(snapshot.get_textile_from_wearnow_id(
+                "I%04d" % index).handle, self.handles[index])
+        self.assertIsNone(snapshot.get_textile_from_wearnow_id("I0009"))
+        self.assertEqual(snapshot.get_textile_from_handle(
+            self.handles[0], view=True).get_description(), "Garment 0")
+
+    def test_isolation(self):
+        snapshot = self.db.snapshot()
+        new_handle = self.change()
+        self.check(snapshot)
+        self.assertFalse(snapshot.has_textile_handle(new_handle))
+        # the database shows the changes
+        self.assertEqual(self.db.get_textile_from_wearnow_id(
+            "I0001").handle, new_handle)
+        self.assertEqual(self.db.get_textile_from_handle(
+            self.handles[0]).get_description(), "changed")
+        # and so does a new snapshot
+        with self.db.snapshot() as later:
+            self.assertTrue(later.has_textile_handle(new_handle))
+            self.assertFalse(later.has_textile_handle(self.handles[1]))
+        # a record changed again keeps its first version
+        self.db.undo()
+        self.db.redo()
+        self.check(snapshot)
+        snapshot.close()
+        self.assertFalse(snapshot.is_open())
+
+    def test_lazy_tables(self):
+        self.reload()
+        snapshot = self.db.snapshot()
+        self.change()
+        self.check(snapshot)
+        snapshot.close()
+
+    def test_thread(self):
+        snapshot = self.db.snapshot()
+        errors = []
+        def read():
+            try:
+                for count in range(50):
+                    self.check(snapshot)
+            except Exception as error:
+                errors.append(error)
+        thread = threading.Thread(target=read)
+        thread.start()
+        for count in range(10):
+            self.change()
+            self.db.undo()
+        thread.join()
+        snapshot.close()
+        self.assertEqual(errors, [])
+
+def testSuite():
+    suite = unittest.TestSuite()
+    for test_case in (DictionaryDbTest, CursorTest, DictionarySnapshotTest):
+        suite.addTest(unittest.makeSuite(test_case, 'test'))
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,66 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ....tex.lib import Textile
+from ....tex.db.txn import DbTxn
+from .dictionarydb_test import DbTestCase
+
+class DatabaseIdTest(DbTestCase):
+    """Test the WearNow IDs given by a DictionaryDb."""
+
+    def add(self):
+        """Add a garment without WearNow ID and return its ID."""
+        with DbTxn("Add garment", self.db) as trans:
+            handle = self.db.add_textile(Textile(), trans)
+        return self.db.get_textile_from_handle(handle).get_wearnow_id()
+
+    def test_reuse(self):
+        self.assertEqual(self.add(), "I0003")
+        with DbTxn("Remove garment", self.db) as trans:
+            self.db.remove_textile(self.handles[1], trans)
+        self.assertEqual(self.add(), "I0001")
+        self.assertEqual(self.add(), "I0004")
+        # a changed ID frees the old one
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.set_wearnow_id("I0100")
+        with DbTxn("Change garment", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+        self.reload()
+        self.assertEqual(self.add(), "I0000")
+        self.assertEqual(self.add(), "I0005")
+
+    def test_undo(self):
+        with DbTxn("Remove garment", self.db) as trans:
+            self.db.remove_textile(self.handles[0], trans)
+        self.db.undo()
+        self.assertEqual(self.add(), "I0003")
+
+    def test_prefix(self):
+        self.db.set_textile_id_prefix("G%02d")
+        self.assertEqual(self.add(), "G00")
+        self.db.set_textile_id_prefix("I%04d")
+        self.assertEqual(self.add(), "I0003")
+
+def testSuite():
+    suite = unittest.makeSuite(DatabaseIdTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
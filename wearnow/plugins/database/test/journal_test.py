@@ -0,0 +1,68 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ....tex.db.txn import DbTxn
+from ..dictionarydb import DictionaryDb
+from .dictionarydb_test import make_textile
+
+class DatabaseRecoveryTest(unittest.TestCase):
+    """Test loading a database whose journal ends in a partial record."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_recovery(self):
+        os.mkdir(os.path.join(self.directory, "db"))
+        db = DictionaryDb()
+        db.load(os.path.join(self.directory, "db"))
+        with DbTxn("Add garments", db) as trans:
+            handles = [db.add_textile(make_textile(index), trans)
+                       for index in range(3)]
+        with DbTxn("Remove garment", db) as trans:
+            db.remove_textile(handles[1], trans)
+        # the files as left by a crash while writing the next change
+        copy = os.path.join(self.directory, "copy")
+        shutil.copytree(os.path.join(self.directory, "db"), copy)
+        db.close()
+        with open(os.path.join(copy, "data.journal"), "ab") as jfile:
+            jfile.write(b"\x00\x00\x01\x00\x80")
+        db = DictionaryDb()
+        db.load(copy)
+        try:
+            self.assertEqual(sorted(db.get_textile_handles()),
+                             sorted([handles[0], handles[2]]))
+            self.assertEqual(
+                db.get_textile_from_handle(handles[2]).get_description(),
+                "Garment 2")
+        finally:
+            db.close()
+
+def testSuite():
+    suite = unittest.makeSuite(DatabaseRecoveryTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
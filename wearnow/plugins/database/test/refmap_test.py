@@ -0,0 +1,68 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ....tex.lib import Note
+from ....tex.db.txn import DbTxn
+from .dictionarydb_test import DbTestCase
+
+class DatabaseBacklinkTest(DbTestCase):
+    """Test the backlinks kept by a DictionaryDb."""
+
+    def backlinks(self, handle):
+        return sorted(self.db.find_backlink_handles(handle))
+
+    def test_backlinks(self):
+        with DbTxn("Add note", self.db) as trans:
+            note_handle = self.db.add_note(Note("note"), trans)
+            for handle in self.handles[:2]:
+                textile = self.db.get_textile_from_handle(handle)
+                textile.add_note(note_handle)
+                self.db.commit_textile(textile, trans)
+        expected = sorted(("Textile", handle) for handle in self.handles[:2])
+        self.assertEqual(self.backlinks(note_handle), expected)
+        self.assertEqual(self.backlinks(note_handle.encode("utf-8")),
+                         expected)
+        self.assertEqual(self.backlinks("TAG1"),
+                         sorted(("Textile", handle)
+                                for handle in self.handles))
+        # the references are kept in the snapshot
+        self.reload()
+        self.assertEqual(self.backlinks(note_handle), expected)
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.remove_note(note_handle)
+        with DbTxn("Change garments", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+            self.db.remove_textile(self.handles[1], trans)
+        self.assertEqual(self.backlinks(note_handle), [])
+        self.assertEqual(self.backlinks("TAG1"),
+                         sorted([("Textile", self.handles[0]),
+                                 ("Textile", self.handles[2])]))
+        # and rebuilt from the records
+        self.db.reindex_reference_map()
+        self.assertEqual(self.backlinks("TAG1"),
+                         sorted([("Textile", self.handles[0]),
+                                 ("Textile", self.handles[2])]))
+
+def testSuite():
+    suite = unittest.makeSuite(DatabaseBacklinkTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
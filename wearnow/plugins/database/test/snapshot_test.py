@@ -0,0 +1,103 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ....tex.db.snapshot import dumps
+from ....tex.db.txn import DbTxn
+from ..dictionarydb import LazyMap
+from .dictionarydb_test import DbTestCase
+
+class LazyMapTest(unittest.TestCase):
+    """Test a map fetching its values when first asked for."""
+
+    def setUp(self):
+        self.loaded = []
+        self.map = LazyMap(None, {"T1": 1, "T2": 2}, self.load,
+                           lambda token: dumps(token * 10))
+        self.map["T3"] = 30
+
+    def load(self, token):
+        self.loaded.append(token)
+        return token * 10
+
+    def test_fetch(self):
+        self.assertEqual(len(self.map), 3)
+        self.assertIn("T1", self.map)
+        self.assertEqual(sorted(self.map), ["T1", "T2", "T3"])
+        self.assertEqual(self.map.peek("T1"), 10)
+        self.assertEqual(self.map.pending_items(), [("T1", 1), ("T2", 2)])
+        self.assertEqual(self.map["T1"], 10)
+        self.assertEqual(self.map.get("T1"), 10)
+        self.assertEqual(self.loaded, [1, 1])
+        self.assertEqual(self.map.pending_items(), [("T2", 2)])
+        self.assertIsNone(self.map.get("T9"))
+
+    def test_change(self):
+        copy = self.map.copy()
+        self.map["T1"] = 11
+        del self.map["T2"]
+        self.assertEqual(self.map.pop("T3"), 30)
+        self.assertEqual(self.map.items(), [("T1", 11)])
+        self.assertEqual(sorted(copy.items()),
+                         [("T1", 10), ("T2", 20), ("T3", 30)])
+        self.assertEqual(self.loaded, [1, 2])
+
+    def test_raw_items(self):
+        self.assertEqual(sorted(self.map.raw_items()),
+                         [("T1", dumps(10)), ("T2", dumps(20)),
+                          ("T3", dumps(30))])
+        self.assertEqual(self.loaded, [])
+
+class SnapshotDbTest(DbTestCase):
+    """Test a DictionaryDb loaded from its snapshot."""
+
+    def test_round_trip(self):
+        expected = [self.db.get_raw_textile_data(handle)
+                    for handle in self.handles]
+        self.reload()
+        self.assertIsInstance(self.db.textile_map, LazyMap)
+        self.assertEqual(len(self.db.textile_map.pending_items()), 3)
+        self.assertEqual(
+            self.db.get_textile_from_wearnow_id("I0001").handle,
+            self.handles[1])
+        # a snapshot holds the records fetched and those that were not
+        self.reload()
+        self.assertEqual([self.db.get_raw_textile_data(handle)
+                          for handle in self.handles], expected)
+        textile = self.db.get_textile_from_handle(self.handles[2])
+        textile.set_description("changed")
+        with DbTxn("Change garment", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+            self.db.remove_textile(self.handles[0], trans)
+        self.reload()
+        self.assertEqual(sorted(self.db.get_textile_handles()),
+                         sorted(self.handles[1:]))
+        self.assertEqual(self.db.get_textile_from_handle(
+            self.handles[2]).get_description(), "changed")
+        self.assertEqual(self.db.get_raw_textile_data(self.handles[1]),
+                         expected[1])
+
+def testSuite():
+    suite = unittest.TestSuite()
+    for test_case in (LazyMapTest, SnapshotDbTest):
+        suite.addTest(unittest.makeSuite(test_case, 'test'))
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,77 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ....tex.lib import Textile
+from ....tex.db.dbconst import TEXTILE_KEY, TAG_KEY
+from ....tex.db.txn import DbTxn
+from .dictionarydb_test import DbTestCase
+
+class DatabaseSortedKeysTest(DbTestCase):
+    """Test iterating over the handles of a DictionaryDb in order."""
+
+    def sorted_handles(self, by_wearnow_id=False, **kwargs):
+        return list(self.db.iter_sorted_handles(TEXTILE_KEY, by_wearnow_id,
+                                                **kwargs))
+
+    def add(self, handle, wearnow_id):
+        textile = Textile()
+        textile.set_handle(handle)
+        textile.set_wearnow_id(wearnow_id)
+        with DbTxn("Add garment", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+
+    def check(self):
+        self.assertEqual(self.sorted_handles(), sorted(self.handles))
+        self.assertEqual(self.sorted_handles(True), self.handles)
+        self.assertEqual(self.sorted_handles(True, low="I0001"),
+                         self.handles[1:])
+        self.assertEqual(self.sorted_handles(True, high="I0001"),
+                         self.handles[:1])
+        self.assertEqual(self.sorted_handles(True, prefix="I000",
+                                             low="I0002"),
+                         self.handles[2:])
+        self.assertEqual(self.sorted_handles(True, prefix="X"), [])
+
+    def test_iter_sorted_handles(self):
+        self.check()
+        # the snapshot leaves the WearNow IDs undecoded
+        self.reload()
+        self.check()
+        self.add("H1", "")
+        self.add("H2", "A0001")
+        self.assertEqual(self.sorted_handles(True),
+                         ["H2"] + self.handles)
+        self.assertEqual(self.sorted_handles(prefix="H"), ["H1", "H2"])
+        with DbTxn("Remove garment", self.db) as trans:
+            self.db.remove_textile("H2", trans)
+        for index in range(3):
+            self.db.undo()
+        self.check()
+
+    def test_no_wearnow_ids(self):
+        self.assertRaises(ValueError, self.db.iter_sorted_handles, TAG_KEY,
+                          True)
+
+def testSuite():
+    suite = unittest.makeSuite(DatabaseSortedKeysTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,132 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ....tex.db.txn import DbTxn
+from .dictionarydb_test import DbTestCase, make_textile
+
+class UndoRedoTest(DbTestCase):
+    """Test undo, redo and abort of DictionaryDb transactions."""
+
+    def setUp(self):
+        DbTestCase.setUp(self)
+        self.signals = []
+        for signal in ("textile-add", "textile-update", "textile-delete"):
+            self.db.connect(signal, self.__record(signal))
+
+    def __record(self, signal):
+        def callback(handles):
+            self.signals.append((signal, sorted(handles)))
+        return callback
+
+    def description(self, handle):
+        return self.db.get_textile_from_handle(handle).get_description()
+
+    def change(self):
+        """Change the first garment and remove the second one."""
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.set_description("changed")
+        with DbTxn("Change garments", self.db) as trans:
+            self.db.commit_textile(textile, trans)
+            self.db.remove_textile(self.handles[1], trans)
+        self.signals = []
+
+    def test_undo_redo(self):
+        self.change()
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.description(self.handles[0]), "Garment 0")
+        self.assertEqual(self.description(self.handles[1]), "Garment 1")
+        self.assertEqual(self.db.get_textile_from_wearnow_id(
+            "I0001").handle, self.handles[1])
+        self.assertEqual(sorted(self.signals),
+                         [("textile-add", [self.handles[1]]),
+                          ("textile-update", [self.handles[0]])])
+        self.signals = []
+        self.assertTrue(self.db.redo())
+        self.assertEqual(self.description(self.handles[0]), "changed")
+        self.assertFalse(self.db.has_textile_handle(self.handles[1]))
+        self.assertEqual(sorted(self.signals),
+                         [("textile-delete", [self.handles[1]]),
+                          ("textile-update", [self.handles[0]])])
+        self.assertFalse(self.db.redo())
+        # the adding of the garments is undone too
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.db.get_number_of_textiles(), 0)
+        self.assertFalse(self.db.undo())
+
+    def test_commit_drops_redo(self):
+        self.change()
+        self.db.undo()
+        with DbTxn("Add garment", self.db) as trans:
+            self.db.add_textile(make_textile(3), trans)
+        self.assertFalse(self.db.redo())
+        self.assertEqual(self.description(self.handles[1]), "Garment 1")
+
+    def test_undo_is_journaled(self):
+        self.change()
+        self.db.undo()
+        self.reload()
+        self.assertEqual(self.description(self.handles[0]), "Garment 0")
+        self.assertEqual(self.description(self.handles[1]), "Garment 1")
+
+    def test_abort(self):
+        textile = self.db.get_textile_from_handle(self.handles[0])
+        textile.set_description("changed")
+        try:
+            with DbTxn("Change garments", self.db) as trans:
+                self.db.commit_textile(textile, trans)
+                self.db.remove_textile(self.handles[1], trans)
+                self.db.add_textile(make_textile(3), trans)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        self.assertEqual(sorted(self.db.get_textile_handles()),
+                         sorted(self.handles))
+        self.assertEqual(self.description(self.handles[0]), "Garment 0")
+        self.assertIsNone(self.db.get_textile_from_wearnow_id("I0003"))
+        self.assertEqual(self.signals, [])
+        # the aborted transaction can not be undone, the one before can
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.db.get_number_of_textiles(), 0)
+        self.reload()
+        self.assertEqual(self.db.get_number_of_textiles(), 0)
+
+    def test_history_limit(self):
+        undodb = self.db.get_undodb()
+        undodb.max_history = 2
+        undodb.memory_limit = 0
+        for index in range(3):
+            textile = self.db.get_textile_from_handle(self.handles[0])
+            textile.set_description("change %d" % index)
+            with DbTxn("Change garment", self.db) as trans:
+                self.db.commit_textile(textile, trans)
+        # the records are read back from the undo file
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.undo())
+        self.assertEqual(self.description(self.handles[0]), "change 0")
+        self.assertFalse(self.db.abort_possible)
+
+def testSuite():
+    suite = unittest.makeSuite(UndoRedoTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
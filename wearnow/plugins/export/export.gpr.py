@@ -64,3 +64,27 @@ plg.export_function = 'export_data'
 plg.export_options = 'WriterOptionBox'
 plg.export_options_title = _('ComfiSense XML export options')
 plg.extension = "gramps"
+
+#------------------------------------------------------------------------
+#
+# JSON lines
+#
+#------------------------------------------------------------------------
+
+plg = newplugin()
+plg.id    = 'ex_jsonl'
+plg.name  = _('ComfiSense JSON lines (collection)')
+plg.name_accell  = _('ComfiSense _JSON lines (collection)')
+plg.description =  _('Export the collection as JSON lines, one record per '
+                     'line, to exchange it with other services or to '
+                     'compare two versions with diff. Can write only the '
+                     'changes since an earlier export.')
+plg.version = '0.0'
+plg.wearnow_target_version = MODULE_VERSION
+plg.status = STABLE
+plg.fname = 'exportjsonl.py'
+plg.ptype = EXPORT
+plg.export_function = 'export_data'
+plg.export_options = 'JsonlOptionBox'
+plg.export_options_title = _('ComfiSense JSON lines export options')
+plg.extension = "jsonl"
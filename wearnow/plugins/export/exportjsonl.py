@@ -0,0 +1,130 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Export of a database as JSON lines, one record struct per line.
+"""
+
+#------------------------------------------------------------------------
+#
+# Set up logging
+#
+#------------------------------------------------------------------------
+import logging
+LOG = logging.getLogger(".WriteJSONL")
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from wearnow.tex.const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+from wearnow.tex.errors import WearNowImportError
+from wearnow.gui.plug.export import WriterOptionBox
+from wearnow.plugins.lib.libjsonl import JsonlWriter, read_next_since
+
+#-------------------------------------------------------------------------
+#
+# JsonlOptionBox
+#
+#-------------------------------------------------------------------------
+class JsonlOptionBox(WriterOptionBox):
+    """
+    The export options, and an earlier export to write only the changes
+    since.
+    """
+
+    def __init__(self, textile, dbstate, uistate):
+        WriterOptionBox.__init__(self, textile, dbstate, uistate)
+        self.since_chooser = None
+        self.since_file = None
+
+    def get_option_box(self):
+        from gi.repository import Gtk
+        widget = WriterOptionBox.get_option_box(self)
+        row = Gtk.Box()
+        label = Gtk.Label(label=_("Only the changes since the export:"))
+        row.pack_start(label, False, True, 0)
+        self.since_chooser = Gtk.FileChooserButton(
+            title=_("Select an earlier JSON lines export"))
+        self.since_chooser.set_tooltip_text(
+            _("Write the records changed and removed since the selected "
+              "file was written. The whole collection is looked at; the "
+              "filters above are not used."))
+        row.pack_start(self.since_chooser, True, True, 0)
+        widget.pack_start(row, False, True, 0)
+        return widget
+
+    def parse_options(self):
+        WriterOptionBox.parse_options(self)
+        if self.since_chooser:
+            self.since_file = self.since_chooser.get_filename()
+
+#-------------------------------------------------------------------------
+#
+# export_data
+#
+#-------------------------------------------------------------------------
+def export_data(database, filename, user, option_box=None):
+    """
+    Call the JSON lines writer with the syntax expected by the export
+    plugin. If an earlier export is selected in the options, only the
+    changes since are written, see :func:`export_delta`.
+    """
+    if option_box:
+        option_box.parse_options()
+        if option_box.since_file:
+            # removals can not be filtered, so a delta covers everything
+            try:
+                since = read_next_since(option_box.since_file)
+            except WearNowImportError as err:
+                user.notify_error(*err.messages())
+                return 0
+            except (IOError, OSError) as msg:
+                user.notify_error(
+                    _("Error reading %s") % option_box.since_file, str(msg))
+                return 0
+            return export_delta(database, filename, user, since)
+        database = option_box.get_filtered_database(database)
+
+    try:
+        JsonlWriter(database, user.callback).write(filename)
+    except (IOError, OSError) as msg:
+        LOG.warning(str(msg))
+        user.notify_error(_('Failure writing %s') % filename, str(msg))
+        return 0
+    return 1
+
+def export_delta(database, filename, user, since):
+    """
+    Write the records of the database changed at or after the time since,
+    in seconds since the epoch, and the objects removed at or after it, as
+    a JSON lines delta file. Reading it with the JSON lines import brings a
+    copy of the database as it was at that time up to date.
+
+    The since of the delta file that follows an export is read from it by
+    :func:`.read_next_since`.
+    """
+    try:
+        JsonlWriter(database, user.callback, since).write(filename)
+    except (IOError, OSError) as msg:
+        LOG.warning(str(msg))
+        user.notify_error(_('Failure writing %s') % filename, str(msg))
+        return 0
+    return 1
@@ -59,3 +59,23 @@ plg.fname = 'importxml.py'
 plg.ptype = IMPORT
 plg.import_function = 'importData'
 plg.extension = "wnow"
+
+#------------------------------------------------------------------------
+#
+# JSON lines
+#
+#------------------------------------------------------------------------
+
+plg = newplugin()
+plg.id    = 'im_jsonl'
+plg.name  = _('ComfiSense JSON lines Collection')
+plg.description =  _('Import JSON lines written by the ComfiSense JSON lines '
+                     'export. Records replace the records with the same '
+                     'handle.')
+plg.version = '0.0'
+plg.wearnow_target_version = MODULE_VERSION
+plg.status = STABLE
+plg.fname = 'importjsonl.py'
+plg.ptype = IMPORT
+plg.import_function = 'importData'
+plg.extension = "jsonl"
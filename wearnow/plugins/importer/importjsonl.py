@@ -0,0 +1,59 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Import of JSON lines written by the JSON lines export.
+"""
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from wearnow.tex.const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+from wearnow.tex.errors import WearNowImportError
+from wearnow.plugins.lib.libjsonl import JsonlReader
+
+#-------------------------------------------------------------------------
+#
+# Importing data into the currently open database.
+#
+#-------------------------------------------------------------------------
+def importData(database, filename, user):
+    """
+    Read a JSON lines file into the database. Records replace the records
+    with the same handle; the Deleted lines of a delta file remove objects.
+    """
+    database.prepare_import()
+    read_only = database.readonly
+    database.readonly = False
+    database.disable_signals()
+    try:
+        JsonlReader(database, user.callback).read(filename)
+    except WearNowImportError as err:
+        user.notify_error(*err.messages())
+        return
+    except (IOError, OSError) as msg:
+        user.notify_error(_("Error reading %s") % filename, str(msg))
+        return
+    finally:
+        database.enable_signals()
+        database.readonly = read_only
+    database.commit_import()
+    database.request_rebuild()
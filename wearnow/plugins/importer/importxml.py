@@ -31,6 +31,8 @@
 import os
 import sys
 import time
+import queue
+import threading
 from xml.parsers.expat import ExpatError, ParserCreate
 from xml.sax.saxutils import escape
 from wearnow.tex.const import URL_HOMEPAGE
@@ -51,7 +53,7 @@ from wearnow.tex.lib import (Attribute, AttributeType, ChildRef, Ensemble,
                             MediaObject, MediaRef, Note, NoteType, Textile,
                             Researcher, StyledText,
                             StyledTextTag, StyledTextTagType, Tag,
-                            TextileType, Url)
+                            TextileType, Url, UrlType)
 from wearnow.tex.db.txn import DbTxn
 #from wearnow.tex.db.write import CLASS_TO_KEY_MAP
 from wearnow.tex.errors import WearNowImportError
@@ -78,7 +80,12 @@ try:
 except:
     GZIP_OK = False
 
-TEXTILE_RE = re.compile(r"\s*\<textile\s(.*)$")
+# first bytes of a gzip file
+GZIP_MAGIC = b"\x1f\x8b"
+
+CHUNK_SIZE = 1 << 16    # bytes read and parsed at a time
+QUEUE_CHUNKS = 8        # chunks read ahead of the parser at most
+IMPORT_BATCH = 1000     # objects committed per transaction
 
 HANDLE = 0
 INSTANTIATED = 1
@@ -95,11 +102,10 @@ def importData(database, filename, user):
     database.smap = {}
     database.pmap = {}
     database.fmap = {}
-    line_cnt = 0
-    textile_cnt = 0
 
     database.prepare_import()
-    with ImportOpenFileContextManager(filename, user) as xml_file:
+    file_manager = ImportOpenFileContextManager(filename, user)
+    with file_manager as xml_file:
         if xml_file is None:
             return
 
@@ -114,20 +120,17 @@ def importData(database, filename, user):
                                   (config.get('preferences.tag-on-import-format') if
                                    config.get('preferences.tag-on-import') else None))
 
-        if filename != '-':
-            linecounter = LineParser(filename)
-            line_cnt = linecounter.get_count()
-            textile_cnt = linecounter.get_textile_count()
-
         read_only = database.readonly
         database.readonly = False
 
         try:
-            info = parser.parse(xml_file, line_cnt, textile_cnt)
+            info = parser.parse(xml_file, rawfile=file_manager.rawfile,
+                                chunk_size=CHUNK_SIZE,
+                                batch_size=IMPORT_BATCH)
         except WearNowImportError as err: # version error
             user.notify_error(*err.messages())
             return
-        except IOError as msg:
+        except (IOError, EOFError) as msg:
             user.notify_error(_("Error reading %s") % filename, str(msg))
             import traceback
             traceback.print_exc()
@@ -305,59 +308,6 @@ class ImportInfo(object):
 
         return txt
 
-class LineParser(object):
-    def __init__(self, filename):
-
-        self.count = 0
-        self.textile_count = 0
-
-        if GZIP_OK:
-            use_gzip = 1
-            try:
-                f = gzip.open(filename, "r")
-                f.read(1)
-                f.close()
-            except IOError as msg:
-                use_gzip = 0
-            except ValueError as msg:
-                use_gzip = 1
-        else:
-            use_gzip = 0
-
-        try:
-            if use_gzip:
-                import io
-                # Bug 6255. TextIOWrapper is required for python3 to
-                #           present file contents as text, otherwise they
-                #           are read as binary. However due to a missing
-                #           method (read1) in early python3 versions this
-                #           try block will fail.
-                #           WearNow will still import XML files using python
-                #           versions < 3.3.0 but the file progress meter
-                #           will not work properly, going immediately to
-                #           100%.
-                #           It should work correctly from version 3.3.
-                ofile = io.TextIOWrapper(gzip.open(filename, "rb"))
-            else:
-                ofile = open(filename, "r")
-
-            for line in ofile:
-                self.count += 1
-                if TEXTILE_RE.match(line):
-                    self.textile_count += 1
-        except:
-            self.count = 0
-            self.textile_count = 0
-        finally:
-            # Ensure the file handle is always closed
-            ofile.close()
-
-    def get_count(self):
-        return self.count
-
-    def get_textile_count(self):
-        return self.textile_count
-
 #-------------------------------------------------------------------------
 #
 # ImportOpenFileContextManager
@@ -366,10 +316,15 @@ class LineParser(object):
 class ImportOpenFileContextManager:
     """
     Context manager to open a file or stdin for reading.
+
+    A gzip compressed file is decompressed while it is read. The file on
+    disk is kept in rawfile, so the progress can follow how much of it is
+    read.
     """
     def __init__(self, filename, user):
         self.filename = filename
         self.filehandle = None
+        self.rawfile = None
         self.user = user
 
     def __enter__(self):
@@ -383,6 +338,9 @@ class ImportOpenFileContextManager:
         if self.filename != '-':
             if self.filehandle:
                 self.filehandle.close()
+            # a GzipFile does not close the file it reads
+            if self.rawfile:
+                self.rawfile.close()
         return False
 
     def open_file(self, filename):
@@ -391,24 +349,14 @@ class ImportOpenFileContextManager:
         Return a valid file handle if the file opened sucessfully.
         Return None if the file was not able to be opened.
         """
-        if GZIP_OK:
-            use_gzip = True
-            try:
-                ofile = gzip.open(filename, "r")
-                ofile.read(1)
-                ofile.close()
-            except IOError as msg:
-                use_gzip = False
-            except ValueError as msg:
-                use_gzip = True
-        else:
-            use_gzip = False
-
         try:
+            self.rawfile = open(filename, "rb")
+            use_gzip = GZIP_OK and self.rawfile.read(2) == GZIP_MAGIC
+            self.rawfile.seek(0)
             if use_gzip:
-                xml_file = gzip.open(filename, "rb")
+                xml_file = gzip.GzipFile(mode="rb", fileobj=self.rawfile)
             else:
-                xml_file = open(filename, "rb")
+                xml_file = self.rawfile
         except IOError as msg:
             self.user.notify_error(_("%s could not be opened") % filename, str(msg))
             xml_file = None
@@ -418,6 +366,68 @@ class ImportOpenFileContextManager:
 
         return xml_file
 
+#-------------------------------------------------------------------------
+#
+# ChunkReader
+#
+#-------------------------------------------------------------------------
+class ChunkReader(threading.Thread):
+    """
+    Read a file in chunks in a thread of its own, so that decompressing the
+    file overlaps with parsing it.
+
+    The chunks are handed over in a queue of at most QUEUE_CHUNKS chunks, so
+    no more than that is held in memory when the parser is slower. Iterating
+    over the reader gives (chunk, position) pairs, position being the
+    position in rawfile after the chunk was read, or None without rawfile.
+    """
+
+    def __init__(self, ifile, chunk_size=CHUNK_SIZE, rawfile=None):
+        threading.Thread.__init__(self, name="XML import reader",
+                                  daemon=True)
+        self.ifile = ifile
+        self.chunk_size = chunk_size
+        self.rawfile = rawfile
+        self.queue = queue.Queue(QUEUE_CHUNKS)
+        self.__stopped = False
+
+    def run(self):
+        try:
+            while not self.__stopped:
+                chunk = self.ifile.read(self.chunk_size)
+                if self.rawfile is not None:
+                    position = self.rawfile.tell()
+                else:
+                    position = None
+                self.queue.put((chunk, position, None))
+                if not chunk:
+                    break
+        except Exception as err:
+            # raised again in the thread that iterates
+            self.queue.put((None, None, err))
+
+    def __iter__(self):
+        while True:
+            (chunk, position, error) = self.queue.get()
+            if error is not None:
+                raise error
+            if not chunk:
+                return
+            yield (chunk, position)
+
+    def stop(self):
+        """
+        Stop reading and wait for the thread to end. Needed when the chunks
+        are not all used, as after a parse error.
+        """
+        self.__stopped = True
+        while self.is_alive():
+            # make room for a chunk the thread is waiting to hand over
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
 #-------------------------------------------------------------------------
 #
 # WearNow database parsing class.  Derived from SAX XML parser
@@ -656,11 +666,23 @@ class WearNowParser(UpdateCallback):
                 wearnow_ids[id_] = wearnow_id
         return wearnow_ids[id_]
 
-    def parse(self, ifile, linecount=0, textilecount=0):
+    def parse(self, ifile, linecount=0, textilecount=0, rawfile=None,
+              chunk_size=0, batch_size=0):
         """
         Parse the xml file
         :param ifile: must be a file handle that is already open, with position
                       at the start of the file
+        :param linecount: the number of lines of the file, for the progress
+        :param rawfile: the binary file on disk that ifile reads, possibly
+                        decompressing it. If given, the progress follows the
+                        position in rawfile and linecount is not needed, so
+                        the file is only read once.
+        :param chunk_size: if not 0, ifile is read in chunks of this size by a
+                           :class:`ChunkReader` while the parser works, and
+                           the progress is updated per chunk
+        :param batch_size: if not 0 when reading in chunks, the transaction
+                           is committed after a chunk once this many objects
+                           were read since the last commit
         """
         if textilecount < 1000:
             no_magic = True
@@ -668,7 +690,18 @@ class WearNowParser(UpdateCallback):
             no_magic = False
         with DbTxn(_("ComfiSense XML import"), self.db, batch=True,
                    no_magic=no_magic) as self.trans:
-            self.set_total(linecount)
+            self.__objects = 0
+            self.__chunk_position = 0
+            if rawfile is not None:
+                self.set_total(os.fstat(rawfile.fileno()).st_size)
+                if chunk_size:
+                    # rawfile is read ahead by the reader thread
+                    self.__position = self.__chunk_end
+                else:
+                    self.__position = rawfile.tell
+            else:
+                self.set_total(linecount)
+                self.__position = self.__line_number
 
             self.db.disable_signals()
 
@@ -679,7 +712,10 @@ class WearNowParser(UpdateCallback):
             self.p.StartElementHandler = self.startElement
             self.p.EndElementHandler = self.endElement
             self.p.CharacterDataHandler = self.characters
-            self.p.ParseFile(ifile)
+            if chunk_size:
+                self.__parse_chunks(ifile, rawfile, chunk_size, batch_size)
+            else:
+                self.p.ParseFile(ifile)
 
             # If the database was originally empty we update the owner from
             # the XML (or initialised to no owner)
@@ -711,10 +747,46 @@ class WearNowParser(UpdateCallback):
             del self.func_list
             del self.p
             del self.update
+            del self.__position
         self.db.enable_signals()
         self.db.request_rebuild()
         return self.info
 
+    def __parse_chunks(self, ifile, rawfile, chunk_size, batch_size):
+        """
+        Feed the parser the chunks of a :class:`ChunkReader`, committing the
+        transaction every batch_size objects.
+        """
+        reader = ChunkReader(ifile, chunk_size, rawfile)
+        reader.start()
+        batch_start = 0
+        try:
+            for (chunk, position) in reader:
+                self.p.Parse(chunk, False)
+                if position is not None:
+                    self.__chunk_position = position
+                self.update(self.__position())
+                if batch_size and self.__objects - batch_start >= batch_size:
+                    self.db.transaction_commit(self.trans)
+                    self.db.transaction_begin(self.trans)
+                    batch_start = self.__objects
+            self.p.Parse(b"", True)
+        finally:
+            reader.stop()
+
+    def __line_number(self):
+        return self.p.CurrentLineNumber
+
+    def __chunk_end(self):
+        return self.__chunk_position
+
+    def __next_object(self):
+        """
+        Count a primary object being read, and update the progress.
+        """
+        self.__objects += 1
+        self.update(self.__position())
+
     def start_database(self, attrs):
         """
         Get the xml version of the file.
@@ -788,9 +860,9 @@ class WearNowParser(UpdateCallback):
     def start_attribute(self, attrs):
         self.attribute = Attribute()
         self.attribute.private = bool(attrs.get("priv"))
-        self.attribute.type = AttributeType()
+        self.attribute.type = AttributeType.get_shared()
         if 'type' in attrs:
-            self.attribute.type.set_from_xml_str(attrs["type"])
+            self.attribute.type = AttributeType.from_xml_str(attrs["type"])
         self.attribute.value = attrs.get("value", '')
         if self.textile:
             self.textile.add_attribute(self.attribute)
@@ -838,7 +910,7 @@ class WearNowParser(UpdateCallback):
         Add a textile to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.__next_object()
         self.textile = Textile()
 
         orig_handle = attrs['handle'].replace('_', '')
@@ -862,8 +934,8 @@ class WearNowParser(UpdateCallback):
         self.textile.change = int(attrs.get('change', self.change))
         self.info.add('new-object', TEXTILE_KEY, self.textile)
 
-        self.textile.type.set_from_xml_str(attrs.get('type',
-                                                  TextileType.UNKNOWN))
+        self.textile.type = TextileType.from_xml_str(
+            attrs.get('type', TextileType.UNKNOWN))
 
         if self.default_tag:
             self.textile.add_tag(self.default_tag.handle)
@@ -885,7 +957,6 @@ class WearNowParser(UpdateCallback):
         self.childref = ChildRef()
         handle = self.inaugurate(attrs['hlink'], "textile", Textile)
         self.childref.ref = handle
-        self.childref.private = bool(attrs.get('priv'))
 
         self.ensemble.add_child_ref(self.childref)
 
@@ -896,7 +967,7 @@ class WearNowParser(UpdateCallback):
         url.path = attrs["href"]
         url.set_description(attrs.get("description", ''))
         url.private = bool(attrs.get('priv'))
-        url.type.set_from_xml_str(attrs.get('type', ''))
+        url.type = UrlType.from_xml_str(attrs.get('type', ''))
         if self.textile:
             self.textile.add_url(url)
 
@@ -927,7 +998,7 @@ class WearNowParser(UpdateCallback):
         Add a ensemble object to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.__next_object()
         self.ensemble = Ensemble()
 
         orig_handle = attrs['handle'].replace('_', '')
@@ -1033,7 +1104,7 @@ class WearNowParser(UpdateCallback):
         self.in_note = 0
 
         # This is new note, with ID and handle already existing
-        self.update(self.p.CurrentLineNumber)
+        self.__next_object()
         self.note = Note()
 
         orig_handle = attrs['handle'].replace('_', '')
@@ -1053,8 +1124,8 @@ class WearNowParser(UpdateCallback):
         self.note.change = int(attrs.get('change', self.change))
         self.info.add('new-object', NOTE_KEY, self.note)
         self.note.format = int(attrs.get('format', Note.FLOWED))
-        self.note.type.set_from_xml_str(attrs.get('type',
-                                                  NoteType.UNKNOWN))
+        self.note.type = NoteType.from_xml_str(
+            attrs.get('type', NoteType.UNKNOWN))
 
         self.note_text = None
         self.note_tags = []
@@ -1107,6 +1178,7 @@ class WearNowParser(UpdateCallback):
         Add a media object to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
+        self.__next_object()
         self.object = MediaObject()
         orig_handle = attrs['handle'].replace('_', '')
         is_merge_candidate = (self.replace_import_handle and
@@ -1132,7 +1204,7 @@ class WearNowParser(UpdateCallback):
         pass
 
     def stop_database(self, *tag):
-        self.update(self.p.CurrentLineNumber)
+        self.update(self.__position())
 
     def stop_object(self, *tag):
         self.db.commit_media_object(self.object, self.trans,
@@ -0,0 +1,72 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import io
+import unittest
+
+from ..importxml import ChunkReader, QUEUE_CHUNKS
+
+class _FailingFile(io.BytesIO):
+    """A file that can not be read past its first chunk."""
+    def read(self, size=-1):
+        if self.tell():
+            raise OSError("read error")
+        return io.BytesIO.read(self, size)
+
+class ChunkReaderTest(unittest.TestCase):
+    """Test reading the file of an XML import in a thread."""
+
+    def test_chunks(self):
+        rawfile = io.BytesIO(b"0123456789")
+        reader = ChunkReader(rawfile, 4, rawfile)
+        reader.start()
+        self.assertEqual(list(reader),
+                         [(b"0123", 4), (b"4567", 8), (b"89", 10)])
+        reader.join()
+        reader = ChunkReader(io.BytesIO(b""), 4)
+        reader.start()
+        self.assertEqual(list(reader), [])
+        reader.stop()
+
+    def test_error(self):
+        reader = ChunkReader(_FailingFile(b"0123456789"), 4)
+        reader.start()
+        chunks = iter(reader)
+        self.assertEqual(next(chunks), (b"0123", None))
+        self.assertRaises(OSError, next, chunks)
+        reader.join()
+
+    def test_stop(self):
+        size = 4 * (QUEUE_CHUNKS + 10)
+        ifile = io.BytesIO(b"x" * size)
+        reader = ChunkReader(ifile, 4)
+        reader.start()
+        self.assertEqual(next(iter(reader)), (b"xxxx", None))
+        # the reader is waiting for room in the queue
+        reader.stop()
+        self.assertFalse(reader.is_alive())
+        self.assertLess(ifile.tell(), size)
+        # stopping a reader that is done does nothing
+        reader.stop()
+
+def testSuite():
+    suite = unittest.makeSuite(ChunkReaderTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,350 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Reading and writing a database as JSON lines.
+
+Every line of the file is a JSON object. The first line is a header, every
+other line is the struct of a record as returned by to_struct(), whose
+"_class" key names the class of the record. The records are written one
+table at a time, tags first and ensembles last, so that a record comes
+after the records it refers to. Within a table they are in handle order
+and the keys of a struct are sorted, so two exports of a database can be
+compared with diff.
+
+Records are read and written one line at a time, so a file of any size
+can be handled in constant memory.
+
+A delta file only holds the records changed at or after a time, the
+"since" of its header, and a "Deleted" line for every object removed at or
+after that time. Deleted lines come first, ensembles first, so an object is
+removed before the objects it refers to. Reading a delta file into a copy
+of the database as it was at that time brings the copy up to date.
+
+Every header has a "next_since", the time the database was read. It is the
+since of the next delta file, see :func:`read_next_since`. Change times
+are in whole seconds, so a change made in that second, before or after the
+database was read, is written again by the next delta file; reading a
+record or removal twice does no harm.
+"""
+
+#------------------------------------------------------------------------
+#
+# python modules
+#
+#------------------------------------------------------------------------
+import json
+import gzip
+import time
+
+#------------------------------------------------------------------------
+#
+# WEARNOW modules
+#
+#------------------------------------------------------------------------
+from wearnow.tex.const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+from wearnow.tex.lib import Ensemble, MediaObject, Note, Tag, Textile
+from wearnow.tex.db.dbconst import (TEXTILE_KEY, ENSEMBLE_KEY, MEDIA_KEY,
+                                    NOTE_KEY, TAG_KEY, KEY_TO_FIELDS_MAP)
+from wearnow.tex.db.txn import DbTxn
+from wearnow.tex.errors import WearNowImportError
+from wearnow.tex.updatecallback import UpdateCallback
+
+#------------------------------------------------------------------------
+#
+# Public Constants
+#
+#------------------------------------------------------------------------
+JSONL_FORMAT = "wearnow-jsonl"
+JSONL_VERSION = 2    # 2 adds delta files
+DELETED = "Deleted"
+
+# (object key, class, name of the raw data, handles, commit and remove
+# methods of the database), in the order the tables are written
+TABLES = (
+    (TAG_KEY, Tag, "get_raw_tag_data", "get_tag_handles", "commit_tag",
+     "remove_tag"),
+    (MEDIA_KEY, MediaObject, "get_raw_object_data",
+     "get_media_object_handles", "commit_media_object", "remove_object"),
+    (NOTE_KEY, Note, "get_raw_note_data", "get_note_handles", "commit_note",
+     "remove_note"),
+    (TEXTILE_KEY, Textile, "get_raw_textile_data", "get_textile_handles",
+     "commit_textile", "remove_textile"),
+    (ENSEMBLE_KEY, Ensemble, "get_raw_ensemble_data",
+     "get_ensemble_handles", "commit_ensemble", "remove_ensemble"),
+    )
+
+def open_jsonl(filename, mode="r"):
+    """
+    Open a JSON lines file as text, compressed with gzip if the name ends
+    with .gz.
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, mode + "t", encoding="utf-8")
+    return open(filename, mode, encoding="utf-8")
+
+def dumps(struct):
+    """
+    Return the line of a struct, without the newline.
+    """
+    return json.dumps(struct, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":"))
+
+def loads(number, line):
+    """
+    Return the struct of a line, raising WearNowImportError if the line
+    does not hold a JSON object.
+    """
+    try:
+        struct = json.loads(line)
+    except ValueError as msg:
+        raise WearNowImportError(_("Error reading line %d") % number,
+                                 str(msg))
+    if not isinstance(struct, dict):
+        raise WearNowImportError(_("Error reading line %d") % number,
+                                 _("A line must hold a JSON object."))
+    return struct
+
+def read_header(lines):
+    """
+    Read and check the header line from an iterator of (line number, line)
+    tuples, and return the header.
+    """
+    for (number, line) in lines:
+        header = loads(number, line)
+        if (header.get("_class") != "Header" or
+                header.get("format") != JSONL_FORMAT):
+            raise WearNowImportError(
+                _("Error reading line %d") % number,
+                _("The file is not a WearNow JSON lines file."))
+        if header.get("version", 0) > JSONL_VERSION:
+            raise WearNowImportError(
+                _("Error reading line %d") % number,
+                _("The file was written by a newer version, format "
+                  "version %(found)d, this version reads up to "
+                  "%(known)d.") % {"found": header["version"],
+                                   "known": JSONL_VERSION})
+        return header
+    raise WearNowImportError(_("Empty file"),
+                             _("The file holds no records."))
+
+def read_next_since(filename):
+    """
+    Return the since of the delta file that follows a JSON lines file: the
+    time its database was read, from its header.
+    """
+    with open_jsonl(filename) as source:
+        header = read_header(enumerate(source, 1))
+    if "next_since" not in header:
+        raise WearNowImportError(
+            _("Error reading %s") % filename,
+            _("The file does not tell when it was written."))
+    return header["next_since"]
+
+#------------------------------------------------------------------------
+#
+# JsonlWriter
+#
+#------------------------------------------------------------------------
+class JsonlWriter(UpdateCallback):
+    """
+    Write the records of a database as JSON lines, all of them or, for a
+    delta file, those changed after a time.
+    """
+
+    def __init__(self, db, callback=None, since=None):
+        """
+        :param db: the database to write
+        :param callback: called with the percentage done
+        :param since: if not None, write a delta file: only the records with
+                      a change time at or after since, in seconds since the
+                      epoch, and the objects removed at or after it. The
+                      database must support
+                      :meth:`.DbReadBase.get_removed_handles`.
+        :type since: int
+        """
+        UpdateCallback.__init__(self, callback)
+        self.db = db
+        self.since = since
+
+    def write(self, filename):
+        """
+        Write the database to a file and return the number of records.
+        """
+        with open_jsonl(filename, "w") as output:
+            return self.write_handle(output)
+
+    def write_handle(self, output):
+        """
+        Write the database to an open text file and return the number of
+        records. The records are taken from a snapshot of the database if it
+        can take one, so edits made while writing do not end up in the file.
+        """
+        # before the snapshot, so later changes have this time or a later one
+        next_since = int(time.time())
+        try:
+            db = self.db.snapshot()
+        except NotImplementedError:
+            return self.__write(self.db, output, next_since)
+        try:
+            return self.__write(db, output, next_since)
+        finally:
+            db.close()
+
+    def __write(self, db, output, next_since):
+        header = {"_class": "Header", "format": JSONL_FORMAT,
+                  "version": JSONL_VERSION, "next_since": next_since}
+        if self.since is None:
+            tables = [(cls, getattr(db, raw),
+                       self.__sorted_handles(db, key, handles))
+                      for (key, cls, raw, handles, commit, remove) in TABLES]
+            counts = dict((cls.__name__, len(getattr(db, handles)()))
+                          for (key, cls, raw, handles, commit, remove)
+                          in TABLES)
+            removed = []
+        else:
+            tables = [(cls, getattr(db, raw),
+                       self.__changed_handles(db, key, raw, handles))
+                      for (key, cls, raw, handles, commit, remove) in TABLES]
+            counts = dict((cls.__name__, len(handle_list))
+                          for (cls, get_raw, handle_list) in tables)
+            removed = [(cls.__name__, db.get_removed_handles(key, self.since))
+                       for (key, cls, raw, handles, commit, remove)
+                       in reversed(TABLES)]
+            counts[DELETED] = sum(len(handle_list)
+                                  for (name, handle_list) in removed)
+            header["since"] = self.since
+        header["counts"] = counts
+        self.set_total(sum(counts.values()))
+        output.write(dumps(header))
+        output.write("\n")
+        written = 0
+        for (name, handle_list) in removed:
+            for handle in handle_list:
+                output.write(dumps({"_class": DELETED, "type": name,
+                                    "handle": handle}))
+                output.write("\n")
+                written += 1
+                self.update()
+        for (cls, get_raw, handle_list) in tables:
+            for handle in handle_list:
+                output.write(dumps(cls.create(get_raw(handle)).to_struct()))
+                output.write("\n")
+                written += 1
+                self.update()
+        return written
+
+    def __changed_handles(self, db, key, raw, handles):
+        """
+        Return the sorted handles of the records with a change time at or
+        after since, and of those restored since then with an older one.
+        """
+        get_raw = getattr(db, raw)
+        pos = KEY_TO_FIELDS_MAP[key].index("change")
+        changed = set(handle for handle in getattr(db, handles)()
+                      if get_raw(handle)[pos] >= self.since)
+        changed.update(handle for handle
+                       in db.get_restored_handles(key, self.since)
+                       if get_raw(handle) is not None)
+        return sorted(changed)
+
+    @staticmethod
+    def __sorted_handles(db, key, handles):
+        try:
+            return db.iter_sorted_handles(key)
+        except NotImplementedError:
+            return sorted(getattr(db, handles)())
+
+#------------------------------------------------------------------------
+#
+# JsonlReader
+#
+#------------------------------------------------------------------------
+class JsonlReader(UpdateCallback):
+    """
+    Read JSON lines into a database.
+
+    A record replaces the record with the same handle in the database, if
+    there is one, so reading a file exported from the same database only
+    changes what was edited. A Deleted line of a delta file removes the
+    object, if the database has it.
+    """
+
+    def __init__(self, db, callback=None):
+        UpdateCallback.__init__(self, callback)
+        self.db = db
+        # class name -> (class, commit method)
+        self.__classes = dict(
+            (cls.__name__, (cls, getattr(db, commit)))
+            for (key, cls, raw, handles, commit, remove) in TABLES)
+        # class name -> remove method
+        self.__removers = dict(
+            (cls.__name__, getattr(db, remove))
+            for (key, cls, raw, handles, commit, remove) in TABLES)
+
+    def read(self, filename):
+        """
+        Read a file into the database. Return a dict mapping the class
+        names to the number of records read.
+        """
+        with open_jsonl(filename) as source:
+            return self.read_handle(source)
+
+    def read_handle(self, source):
+        """
+        Read an open text file into the database. Return a dict mapping the
+        class names to the number of records read, and "Deleted" to the
+        number of removals read.
+        """
+        counts = dict((name, 0) for name in self.__classes)
+        counts[DELETED] = 0
+        lines = enumerate(source, 1)
+        header = read_header(lines)
+        self.set_total(sum(header.get("counts", {}).values()))
+        with DbTxn(_("JSON lines import"), self.db, batch=True) as trans:
+            for (number, line) in lines:
+                if not line.strip():
+                    continue
+                struct = loads(number, line)
+                if struct.get("_class") == DELETED:
+                    self.__remove(number, struct, trans)
+                    counts[DELETED] += 1
+                    self.update()
+                    continue
+                try:
+                    (cls, commit) = self.__classes[struct.get("_class")]
+                except KeyError:
+                    raise WearNowImportError(
+                        _("Error reading line %d") % number,
+                        _("Unknown record class %s.") % struct.get("_class"))
+                obj = cls.create(cls.from_struct(struct))
+                # keep the change time of the record
+                commit(obj, trans, obj.change)
+                counts[cls.__name__] += 1
+                self.update()
+        return counts
+
+    def __remove(self, number, struct, trans):
+        try:
+            remove = self.__removers[struct.get("type")]
+        except KeyError:
+            raise WearNowImportError(
+                _("Error reading line %d") % number,
+                _("Unknown record class %s.") % struct.get("type"))
+        remove(struct.get("handle"), trans)
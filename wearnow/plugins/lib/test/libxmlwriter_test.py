@@ -0,0 +1,171 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import gzip
+import io
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from ....tex.db.txn import DbTxn
+from ....tex.lib import (Textile, Ensemble, MediaObject, Note, Tag,
+                         Attribute, AttributeType, ChildRef, MediaRef, Url,
+                         UrlType, Researcher, StyledText, StyledTextTag,
+                         StyledTextTagType)
+from ....tex.user import User
+from ...database.dictionarydb import DictionaryDb
+from ..libxmlwriter import WearNowXmlWriter
+
+# the XML of the collection made by make_collection, as written by the
+# writer before the export was buffered
+EXPECTED = os.path.join(os.path.dirname(__file__), "data", "collection.xml")
+CHANGE = 1400000000
+
+def commit(commit_func, obj, trans, change):
+    """Commit obj with the change time change."""
+    obj.change = change
+    commit_func(obj, trans, change)
+
+def make_collection(db):
+    """
+    Fill db with a small collection using every part of the XML format,
+    with fixed handles and change times.
+    """
+    owner = Researcher()
+    owner.set_name("Owner <&> \"Name\"")
+    owner.set_email("owner@example.org")
+    db.set_owner(owner)
+    db.set_mediapath("/media/wardrobe")
+    with DbTxn("Make collection", db) as trans:
+        for index in range(2):
+            tag = Tag()
+            tag.set_handle("TAG%d" % index)
+            tag.set_name("Tag %d & more" % index)
+            tag.set_color("#00000000ff%02d" % index)
+            tag.set_priority(index)
+            commit(db.commit_tag, tag, trans, CHANGE)
+        for index in range(3):
+            note = Note()
+            note.set_handle("NOTE%d" % index)
+            note.set_wearnow_id("N%04d" % index)
+            text = "Line <%d>\nwith \x01control & é€" % index
+            tags = [StyledTextTag(StyledTextTagType.BOLD, None,
+                                  [(0, 4), (6, 9)]),
+                    StyledTextTag(StyledTextTagType.FONTCOLOR, "#ff0000",
+                                  [(1, 2)])]
+            note.set_styledtext(StyledText(text, tags[:index]))
+            note.set_format(index % 2)
+            note.set_privacy(index == 2)
+            commit(db.commit_note, note, trans, CHANGE + index)
+        media = MediaObject()
+        media.set_handle("MEDIA0")
+        media.set_wearnow_id("O0000")
+        media.set_path("/media/wardrobe/coat \"1\".png")
+        media.set_mime_type("image/png")
+        media.set_description("Coat & <scarf>")
+        media.set_checksum("0123abcd")
+        media.add_tag("TAG0")
+        commit(db.commit_media_object, media, trans, CHANGE)
+        for index in range(4):
+            textile = Textile()
+            textile.set_handle("TEXTILE%d" % (3 - index))
+            textile.set_wearnow_id("I%04d" % index)
+            textile.set_description("Garment \"%d\" <&>" % index)
+            textile.set_type(index + 1)
+            textile.set_privacy(index == 1)
+            attribute = Attribute()
+            attribute.set_type(AttributeType.THERM_INS)
+            attribute.set_value("0.%d" % (index + 1))
+            attribute.add_note("NOTE1")
+            textile.add_attribute(attribute)
+            attribute = Attribute()
+            attribute.set_type("Custom & type")
+            attribute.set_value("\t%d\x02" % index)
+            attribute.set_privacy(True)
+            textile.add_attribute(attribute)
+            url = Url()
+            url.set_path("http://example.org/?a=%d&b=<c>" % index)
+            url.set_description("Site %d" % index)
+            url.set_type(UrlType.WEB_HOME if index % 2 else "Shop")
+            textile.add_url(url)
+            if index != 2:
+                ref = MediaRef()
+                ref.set_reference_handle("MEDIA0")
+                if index:
+                    ref.set_rectangle((10, 20, 30 + index, 40))
+                textile.add_media_reference(ref)
+            textile.add_note("NOTE%d" % index if index < 3 else "NOTE0")
+            textile.add_tag("TAG%d" % (index % 2))
+            commit(db.commit_textile, textile, trans, CHANGE + index)
+        for index in range(2):
+            ensemble = Ensemble()
+            ensemble.set_handle("ENSEMBLE%d" % index)
+            ensemble.set_wearnow_id("F%04d" % index)
+            for child in range(index, 4):
+                ref = ChildRef()
+                ref.set_reference_handle("TEXTILE%d" % child)
+                ensemble.add_child_ref(ref)
+            ensemble.add_note("NOTE2")
+            ensemble.add_tag("TAG1")
+            commit(db.commit_ensemble, ensemble, trans, CHANGE)
+        db.set_default_textile_handle("TEXTILE2")
+
+class _Output(io.BytesIO):
+    """A stream that keeps what was written after it is closed."""
+    def close(self):
+        pass
+
+class WearNowXmlWriterTest(unittest.TestCase):
+    """Test writing a database as XML."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = DictionaryDb()
+        self.db.load(self.directory)
+        make_collection(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def export(self, compress):
+        output = _Output()
+        writer = WearNowXmlWriter(self.db, compress=compress, user=User(),
+                                  version="0.0.1")
+        writer.write_handle(output)
+        data = output.getvalue()
+        if compress:
+            data = gzip.decompress(data)
+        # the file tells when it was written
+        return re.sub(b'<created date="[0-9-]*"',
+                      b'<created date="2014-05-13"', data, 1)
+
+    def test_same_as_before(self):
+        with open(EXPECTED, "rb") as expected:
+            expected = expected.read()
+        self.assertEqual(self.export(False), expected)
+        self.assertEqual(self.export(True), expected)
+
+def testSuite():
+    suite = unittest.makeSuite(WearNowXmlWriterTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -660,7 +660,18 @@ class WearNowView(NavigationView):
         return False
     
     def local_tag_react(self, textile):
-        textiledb = self.dbstate.db.get_textile_from_wearnow_id(textile.get_wearnow_id())
+        textiledb = None
+        for attr in textile.get_attribute_list():
+            if attr.get_type() == AttributeType.RFID_ID:
+                handles = self.dbstate.db.find_textile_handles_by_attribute(
+                                    AttributeType.RFID_ID, attr.get_value())
+                if handles:
+                    textiledb = self.dbstate.db.get_textile_from_handle(
+                                                                handles[0])
+                break
+        if textiledb is None:
+            textiledb = self.dbstate.db.get_textile_from_wearnow_id(
+                                                    textile.get_wearnow_id())
         if textiledb:
             #existing garment, add it to the list
             ref = ChildRef()
@@ -686,23 +697,21 @@ class WearNowView(NavigationView):
 
     def compute_comfort(self, obj):
         from wearnow.tex.logic.pmv import calc_comfort
-        garments = []
-        for ref in self.ensemble.get_child_ref_list(): 
-            garments.append(self.dbstate.db.get_textile_from_handle(ref.ref))
+        db = self.dbstate.db
         ins = []
         vapres = []
         ttype = []
-        for garm in garments:
-            ins.append(None)
-            vapres.append(None)
+        for ref in self.ensemble.get_child_ref_list(): 
+            garm = db.get_textile_from_handle(ref.ref, view=True)
             ttype.append(garm.get_type())
-            for attr in garm.get_attribute_list():
-                if attr.get_type() == AttributeType.THERM_INS:
-                    ins[-1] = float(attr.get_value())
-                if attr.get_type() == AttributeType.MOIST_VAP_RESIST:
-                    vapres[-1] = float(attr.get_value())
-                
-                    
+            # the last attribute of a type counts
+            values = db.get_textile_attribute_values(ref.ref,
+                                                     AttributeType.THERM_INS)
+            ins.append(float(values[-1]) if values else None)
+            values = db.get_textile_attribute_values(ref.ref,
+                                            AttributeType.MOIST_VAP_RESIST)
+            vapres.append(float(values[-1]) if values else None)
+
         appdata = {
             'climate': {
                 'ta' : self.scale_temp.get_value(),
@@ -0,0 +1,371 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Secondary indexes on the attribute values of primary objects.
+
+An index covers one attribute type. A hash index finds the objects with
+an exact value, a sorted index keeps numeric values in order so ranges
+can be looked up. The indexes work on the serialized attribute list, so
+no objects need to be created to maintain them.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from bisect import bisect_left, bisect_right, insort
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from ..lib.attrtype import AttributeType
+
+def attribute_type_key(attr_type):
+    """
+    Return the key an attribute type is indexed under: the integer value
+    for standard types, the string for custom types.
+
+    :param attr_type: the attribute type
+    :type attr_type: AttributeType, int, str or a serialized (int, str)
+                     tuple
+    """
+    if isinstance(attr_type, AttributeType):
+        attr_type = attr_type.serialize()
+    if isinstance(attr_type, tuple):
+        if attr_type[0] == AttributeType.CUSTOM:
+            return attr_type[1]
+        return attr_type[0]
+    return attr_type
+
+#-------------------------------------------------------------------------
+#
+# AttributeIndex
+#
+#-------------------------------------------------------------------------
+class AttributeIndex(object):
+    """
+    Hash index mapping the values of one attribute type to the handles of
+    the objects having that value.
+    """
+
+    def __init__(self, attr_type):
+        self.attr_type = attribute_type_key(attr_type)
+        # handle -> tuple of values
+        self._values = {}
+        # value -> set of handles
+        self.__handles = {}
+
+    def __len__(self):
+        """
+        Return the number of indexed objects.
+        """
+        return len(self._values)
+
+    def convert(self, value):
+        """
+        Return the value as it is stored in the index, or None if the
+        value can not be indexed.
+        """
+        return value
+
+    def clear(self):
+        """
+        Remove all entries from the index.
+        """
+        self._values.clear()
+        self.__handles.clear()
+
+    def update(self, handle, values):
+        """
+        Set the indexed values of an object, replacing the old ones.
+
+        :param handle: handle of the object
+        :type handle: str
+        :param values: the raw attribute values of the object
+        :type values: list
+        """
+        values = tuple(value for value in map(self.convert, values)
+                       if value is not None)
+        if self._values.get(handle, ()) == values:
+            return
+        self.remove(handle)
+        if values:
+            self._values[handle] = values
+            for value in values:
+                self._add(handle, value)
+
+    def fill(self, entries):
+        """
+        Index many objects, as :meth:`update` does for each of them.
+
+        :param entries: (handle, values) tuples
+        :type entries: iterable
+        """
+        for (handle, values) in entries:
+            self.update(handle, values)
+
+    def remove(self, handle):
+        """
+        Remove the object handle from the index.
+        """
+        for value in self._values.pop(handle, ()):
+            self._discard(handle, value)
+
+    def _add(self, handle, value):
+        self.__handles.setdefault(value, set()).add(handle)
+
+    def _discard(self, handle, value):
+        handles = self.__handles.get(value)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del self.__handles[value]
+
+    def find(self, value):
+        """
+        Return the list of handles of the objects with the given value.
+        """
+        value = self.convert(value)
+        return list(self.__handles.get(value, ()))
+
+    def get_values(self, handle):
+        """
+        Return the tuple of indexed values of the object handle.
+        """
+        return self._values.get(handle, ())
+
+    def serialize(self):
+        """
+        Convert the index to a list of (handle, values) tuples.
+        """
+        return list(self._values.items())
+
+    def unserialize(self, data):
+        """
+        Rebuild the index from a serialized list.
+        """
+        self.clear()
+        self.fill(data)
+        return self
+
+#-------------------------------------------------------------------------
+#
+# SortedAttributeIndex
+#
+#-------------------------------------------------------------------------
+class SortedAttributeIndex(AttributeIndex):
+    """
+    Index keeping the numeric values of one attribute type in order.
+
+    Values that can not be read as a number are not indexed.
+    """
+
+    def __init__(self, attr_type):
+        AttributeIndex.__init__(self, attr_type)
+        # sorted list of (value, handle) tuples
+        self.__keys = []
+        # True while fill() runs, which sorts the keys once at the end
+        self.__filling = False
+
+    def convert(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def clear(self):
+        AttributeIndex.clear(self)
+        self.__keys = []
+
+    def fill(self, entries):
+        self.__filling = True
+        try:
+            AttributeIndex.fill(self, entries)
+        finally:
+            self.__filling = False
+            self.__keys = sorted((value, handle)
+                                 for (handle, values) in self._values.items()
+                                 for value in values)
+
+    def _add(self, handle, value):
+        AttributeIndex._add(self, handle, value)
+        if not self.__filling:
+            insort(self.__keys, (value, handle))
+
+    def _discard(self, handle, value):
+        AttributeIndex._discard(self, handle, value)
+        if self.__filling:
+            return
+        index = bisect_left(self.__keys, (value, handle))
+        if (index < len(self.__keys) and
+                self.__keys[index] == (value, handle)):
+            del self.__keys[index]
+
+    def find_range(self, low=None, high=None):
+        """
+        Return the (value, handle) tuples with low <= value <= high, in
+        order of the value. A bound of None is not checked.
+        """
+        start = 0
+        stop = len(self.__keys)
+        if low is not None:
+            start = bisect_left(self.__keys, (float(low),))
+        if high is not None:
+            # handles are strings, none of them sorts after this one
+            stop = bisect_right(self.__keys, (float(high), chr(0x10ffff)))
+        return self.__keys[start:stop]
+
+#-------------------------------------------------------------------------
+#
+# AttributeIndexes
+#
+#-------------------------------------------------------------------------
+class AttributeIndexes(object):
+    """
+    The secondary attribute indexes of a table.
+    """
+
+    def __init__(self):
+        # attribute type key -> AttributeIndex
+        self.__indexes = {}
+
+    def __contains__(self, attr_type):
+        return attribute_type_key(attr_type) in self.__indexes
+
+    def declare(self, attr_type, sorted=False):
+        """
+        Add an index for an attribute type and return it.
+
+        An index that exists already is returned as is. A new index is
+        empty; it must be filled with :meth:`update`.
+
+        :param attr_type: the attribute type to index
+        :type attr_type: AttributeType, int or str
+        :param sorted: if True, index numeric values in order so ranges
+                       can be looked up, otherwise hash exact values
+        :type sorted: bool
+        """
+        key = attribute_type_key(attr_type)
+        if key not in self.__indexes:
+            class_ = SortedAttributeIndex if sorted else AttributeIndex
+            self.__indexes[key] = class_(key)
+        return self.__indexes[key]
+
+    def get(self, attr_type):
+        """
+        Return the index of an attribute type, or None if not declared.
+        """
+        return self.__indexes.get(attribute_type_key(attr_type))
+
+    def declared(self):
+        """
+        Return a dict mapping the indexed attribute types to True for a
+        sorted index and False for a hash index.
+        """
+        return dict((key, isinstance(index, SortedAttributeIndex))
+                    for key, index in self.__indexes.items())
+
+    def clear(self):
+        """
+        Remove all entries from all indexes.
+        """
+        for index in self.__indexes.values():
+            index.clear()
+
+    def update(self, handle, attribute_list):
+        """
+        Index the attributes of an object, replacing the old values.
+
+        :param handle: handle of the object
+        :type handle: str
+        :param attribute_list: the serialized attribute list of the object,
+                               a list of (private, note_list, type, value)
+                               tuples
+        :type attribute_list: list
+        """
+        if not self.__indexes:
+            return
+        values = self.__values(attribute_list)
+        for key, index in self.__indexes.items():
+            index.update(handle, values[key])
+
+    def fill(self, records):
+        """
+        Index the attributes of many objects, as :meth:`update` does for
+        each of them, but faster.
+
+        :param records: (handle, attribute_list) tuples
+        :type records: iterable
+        """
+        if not self.__indexes:
+            return
+        entries = dict((key, []) for key in self.__indexes)
+        for (handle, attribute_list) in records:
+            for (key, values) in self.__values(attribute_list).items():
+                entries[key].append((handle, values))
+        for key, index in self.__indexes.items():
+            index.fill(entries[key])
+
+    def __values(self, attribute_list):
+        """
+        Return a dict mapping the indexed attribute types to the list of
+        values of that type in a serialized attribute list.
+        """
+        values = dict((key, []) for key in self.__indexes)
+        for attr in attribute_list:
+            key = attribute_type_key(attr[2])
+            if key in values:
+                values[key].append(attr[3])
+        return values
+
+    def remove(self, handle):
+        """
+        Remove the object handle from all indexes.
+        """
+        for index in self.__indexes.values():
+            index.remove(handle)
+
+    def serialize(self):
+        """
+        Convert the indexes to a dict mapping the attribute type to a
+        (sorted, entries) tuple.
+        """
+        return dict((key, (isinstance(index, SortedAttributeIndex),
+                           index.serialize()))
+                    for key, index in self.__indexes.items())
+
+    def unserialize(self, data):
+        """
+        Fill the declared indexes from serialized data.
+
+        Return False if the data does not cover the declared indexes, in
+        which case they need to be rebuilt.
+        """
+        self.clear()
+        for key, index in self.__indexes.items():
+            if key not in data:
+                return False
+            (is_sorted, entries) = data[key]
+            if is_sorted != isinstance(index, SortedAttributeIndex):
+                return False
+            index.unserialize(entries)
+        return True
@@ -40,7 +40,37 @@ _ = glocale.translation.gettext
 #-------------------------------------------------------------------------
 from .txn import DbTxn
 from .exceptions import DbTransactionCancel
+from .dbconst import KEY_TO_FIELDS_MAP
 
+#-------------------------------------------------------------------------
+#
+# Field projection
+#
+#-------------------------------------------------------------------------
+def field_getter(obj_key, fields):
+    """
+    Return a function that takes the serialized data of an object of type
+    obj_key and returns the tuple of the values of the named fields.
+
+    :param obj_key: the xxx_KEY constant of the object type
+    :type obj_key: int
+    :param fields: field names, as in KEY_TO_FIELDS_MAP
+    :type fields: tuple of str
+    :raises ValueError: if a field name is not known
+    """
+    names = KEY_TO_FIELDS_MAP[obj_key]
+    positions = []
+    for field in fields:
+        if field not in names:
+            raise ValueError("unknown field %r" % field)
+        positions.append(names.index(field))
+    return lambda data: tuple([data[pos] for pos in positions])
+
+#-------------------------------------------------------------------------
+#
+# DbReadBase
+#
+#-------------------------------------------------------------------------
 class DbReadBase(object):
     """
     WearNow database object. This object is a base class for all
@@ -154,6 +184,59 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
+    def find_textile_handles_by_attribute(self, attr_type, value):
+        """
+        Return the list of handles of the textiles having an attribute of
+        the given type and value.
+        """
+        raise NotImplementedError
+
+    def find_textile_handles_in_attribute_range(self, attr_type, low=None,
+                                                high=None):
+        """
+        Return the list of handles of the textiles having a numeric value
+        for the attribute type between low and high, in order of that value.
+        """
+        raise NotImplementedError
+
+    def find_handles_by_text(self, obj_key, text, prefix=False):
+        """
+        Return the list of handles of the objects of type obj_key having
+        all words of the text, ignoring case. If prefix is True, the last
+        word only needs to start a word of the object.
+        """
+        raise NotImplementedError
+
+    def find_handles_containing_text(self, obj_key, text):
+        """
+        Return the list of handles of the objects of type obj_key that may
+        contain the text, ignoring case, or None if the index can not
+        narrow the search. The objects must still be checked.
+        """
+        raise NotImplementedError
+
+    def complete_text(self, obj_key, prefix, limit=None):
+        """
+        Return the indexed words of the objects of type obj_key that start
+        with prefix, in order.
+        """
+        raise NotImplementedError
+
+    def get_removed_handles(self, obj_key, since):
+        """
+        Return the sorted handles of the objects of type obj_key removed
+        at or after the time since, in seconds since the epoch.
+        """
+        raise NotImplementedError
+
+    def get_restored_handles(self, obj_key, since):
+        """
+        Return the sorted handles of the objects of type obj_key that were
+        removed, and came back with their old change time at or after the
+        time since, as done by undo.
+        """
+        raise NotImplementedError
+
     def get_bookmarks(self):
         """
         Return the list of Person handles in the bookmarks.
@@ -184,9 +267,13 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_ensemble_cursor(self):
+    def get_ensemble_cursor(self, fields=None):
         """
         Return a reference to a cursor over ensemble objects
+
+        The cursor yields (handle, data) pairs. If fields is given, a tuple
+        of field names as in KEY_TO_FIELDS_MAP, the handle is a str and data
+        is the tuple of the values of those fields only.
         """
         raise NotImplementedError
 
@@ -199,11 +286,14 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_ensemble_from_handle(self, handle):
+    def get_ensemble_from_handle(self, handle, view=False):
         """
         Find a ensemble in the database from the passed WearNow ID.
 
         If no such ensemble exists, None is returned.
+
+        If view is True, a read-only view of the object may be returned,
+        which decodes its data only when it is used.
         """
         raise NotImplementedError
 
@@ -233,9 +323,13 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_media_cursor(self):
+    def get_media_cursor(self, fields=None):
         """
         Return a reference to a cursor over Media objects
+
+        The cursor yields (handle, data) pairs. If fields is given, a tuple
+        of field names as in KEY_TO_FIELDS_MAP, the handle is a str and data
+        is the tuple of the values of those fields only.
         """
         raise NotImplementedError
 
@@ -260,9 +354,13 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_note_cursor(self):
+    def get_note_cursor(self, fields=None):
         """
         Return a reference to a cursor over Note objects
+
+        The cursor yields (handle, data) pairs. If fields is given, a tuple
+        of field names as in KEY_TO_FIELDS_MAP, the handle is a str and data
+        is the tuple of the values of those fields only.
         """
         raise NotImplementedError
 
@@ -275,11 +373,14 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_note_from_handle(self, handle):
+    def get_note_from_handle(self, handle, view=False):
         """
         Find a Note in the database from the passed WearNow ID.
 
         If no such Note exists, None is returned.
+
+        If view is True, a read-only view of the object may be returned,
+        which decodes its data only when it is used.
         """
         raise NotImplementedError
 
@@ -343,11 +444,14 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_object_from_handle(self, handle):
+    def get_object_from_handle(self, handle, view=False):
         """
         Find an Object in the database from the passed WearNow ID.
 
         If no such Object exists, None is returned.
+
+        If view is True, a read-only view of the object may be returned,
+        which decodes its data only when it is used.
         """
         raise NotImplementedError
 
@@ -358,9 +462,20 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_textile_cursor(self):
+    def get_textile_attribute_values(self, handle, attr_type):
+        """
+        Return the tuple of values of the attribute type of the textile
+        handle.
+        """
+        raise NotImplementedError
+
+    def get_textile_cursor(self, fields=None):
         """
         Return a reference to a cursor over textile objects
+
+        The cursor yields (handle, data) pairs. If fields is given, a tuple
+        of field names as in KEY_TO_FIELDS_MAP, the handle is a str and data
+        is the tuple of the values of those fields only.
         """
         raise NotImplementedError
 
@@ -373,11 +488,14 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_textile_from_handle(self, handle):
+    def get_textile_from_handle(self, handle, view=False):
         """
         Find a textile in the database from the passed WearNow ID.
 
         If no such textile exists, None is returned.
+
+        If view is True, a read-only view of the object may be returned,
+        which decodes its data only when it is used.
         """
         raise NotImplementedError
 
@@ -451,9 +569,13 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
-    def get_tag_cursor(self):
+    def get_tag_cursor(self, fields=None):
         """
         Return a reference to a cursor over Tag objects
+
+        The cursor yields (handle, data) pairs. If fields is given, a tuple
+        of field names as in KEY_TO_FIELDS_MAP, the handle is a str and data
+        is the tuple of the values of those fields only.
         """
         raise NotImplementedError
 
@@ -575,6 +697,17 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
+    def iter_sorted_handles(self, obj_key, by_wearnow_id=False, low=None,
+                            high=None, prefix=None):
+        """
+        Return an iterator over the handles of the objects of type obj_key,
+        in order of handle or, if by_wearnow_id is True, of WearNow ID.
+
+        The keys can be restricted to low <= key < high and to keys starting
+        with prefix.
+        """
+        raise NotImplementedError
+
     def iter_textile_handles(self):
         """
         Return an iterator over handles for textile in the database
@@ -707,6 +840,16 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
+    def snapshot(self):
+        """
+        Return a read-only database that keeps showing the data as it is
+        now, while this database goes on changing.
+
+        The snapshot can be read from another thread. Call its close()
+        method when done with it.
+        """
+        raise NotImplementedError
+
     def get_dbid(self):
         """
         A unique ID for this database on this computer.
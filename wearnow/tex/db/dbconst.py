@@ -29,12 +29,14 @@ Declare constants used by database modules
 #
 #-------------------------------------------------------------------------
 __all__ = ( 'DBPAGE', 'DBMODE', 'DBCACHE', 'DBLOCKS', 'DBOBJECTS', 'DBUNDO',
+            'DBUNDOMEM',
             'DBEXT', 'DBMODE_R', 'DBMODE_W', 'DBUNDOFN', 'DBLOCKFN',
             'DBRECOVFN','BDBVERSFN', 'DBLOGNAME', 'SCHVERSFN',
             'DBBACKEND',
             'TEXTILE_KEY', 'ENSEMBLE_KEY', 'MEDIA_KEY', 'NOTE_KEY', 'TAG_KEY',
             'TXNADD', 'TXNUPD', 'TXNDEL',
-            "CLASS_TO_KEY_MAP", "KEY_TO_CLASS_MAP", "KEY_TO_NAME_MAP"
+            "CLASS_TO_KEY_MAP", "KEY_TO_CLASS_MAP", "KEY_TO_NAME_MAP",
+            "KEY_TO_FIELDS_MAP"
         )
 
 DBEXT     = ".db"           # File extension to be used for database files
@@ -53,6 +55,7 @@ DBCACHE   = 0x4000000       # Size of the shared memory buffer pool
 DBLOCKS   = 100000          # Maximum number of locks supported
 DBOBJECTS = 100000          # Maximum number of simultaneously locked objects
 DBUNDO    = 1000            # Maximum size of undo buffer
+DBUNDOMEM = 0x1000000       # Bytes of undo records kept in memory
 
 TEXTILE_KEY     = 0
 ENSEMBLE_KEY    = 1
@@ -79,3 +82,17 @@ KEY_TO_NAME_MAP = {TEXTILE_KEY: 'textile',
                    MEDIA_KEY: 'media',
                    NOTE_KEY: 'note',
                    TAG_KEY: 'tag'}
+
+# names of the fields of the serialized objects, in serialized order
+KEY_TO_FIELDS_MAP = {
+    TEXTILE_KEY: ("handle", "wearnow_id", "description", "media_list",
+                  "attribute_list", "urls", "note_list", "change",
+                  "tag_list", "private", "type"),
+    ENSEMBLE_KEY: ("handle", "wearnow_id", "child_ref_list", "media_list",
+                   "note_list", "change", "tag_list", "private"),
+    MEDIA_KEY: ("handle", "wearnow_id", "path", "mime", "desc", "checksum",
+                "change", "tag_list", "private"),
+    NOTE_KEY: ("handle", "wearnow_id", "text", "format", "type", "change",
+               "tag_list", "private"),
+    TAG_KEY: ("handle", "name", "color", "priority", "change"),
+    }
@@ -0,0 +1,134 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Allocation of WearNow IDs following an ID pattern such as I%04d.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import re
+from heapq import heappush, heappop
+
+#-------------------------------------------------------------------------
+#
+# IdAllocator
+#
+#-------------------------------------------------------------------------
+class IdAllocator(object):
+    """
+    Hand out the lowest free number of an ID pattern.
+
+    The numbers in use are kept in a set together with the highest one.
+    Free numbers below the highest one are kept as (first, last) ranges
+    in a heap, so the next ID is found without probing the IDs in use.
+    Numbers used by IDs added after a range was made free are skipped
+    when they come up.
+    """
+
+    def __init__(self, pattern, wearnow_ids=()):
+        """
+        :param pattern: the ID pattern, a format string with one %d
+        :type pattern: str
+        :param wearnow_ids: the IDs in use
+        :type wearnow_ids: iterable of str
+        """
+        self.pattern = pattern
+        match = re.match(r"(.*)%[0 ]?\d*[diu](.*)$", pattern, re.S)
+        if match:
+            (before, after) = [text.replace("%%", "%")
+                               for text in match.groups()]
+            self.__match = re.compile(re.escape(before) + r"(\d+)" +
+                                      re.escape(after) + "$").match
+        else:
+            self.__match = None
+        self.rebuild(wearnow_ids)
+
+    def rebuild(self, wearnow_ids):
+        """
+        Reset the allocator to the given IDs in use, in one pass.
+        """
+        self.__used = set()
+        for wearnow_id in wearnow_ids:
+            number = self.__number(wearnow_id)
+            if number is not None:
+                self.__used.add(number)
+        self.__max = max(self.__used) if self.__used else -1
+        self.__gaps = []
+        first = 0
+        for number in sorted(self.__used):
+            if number > first:
+                self.__gaps.append((first, number - 1))
+            first = number + 1
+        # the ranges are created in order, which is a valid heap
+
+    def __number(self, wearnow_id):
+        """
+        Return the number of an ID that follows the pattern, else None.
+        """
+        if self.__match is None or not wearnow_id:
+            return None
+        match = self.__match(wearnow_id)
+        if match is None:
+            return None
+        number = int(match.group(1))
+        if self.pattern % number != wearnow_id:
+            # same number, other width: does not block the pattern ID
+            return None
+        return number
+
+    def add(self, wearnow_id):
+        """
+        Mark an ID as being in use.
+        """
+        number = self.__number(wearnow_id)
+        if number is None or number in self.__used:
+            return
+        self.__used.add(number)
+        if number > self.__max:
+            if number > self.__max + 1:
+                heappush(self.__gaps, (self.__max + 1, number - 1))
+            self.__max = number
+
+    def remove(self, wearnow_id):
+        """
+        Mark an ID as free.
+        """
+        number = self.__number(wearnow_id)
+        if number is None or number not in self.__used:
+            return
+        self.__used.discard(number)
+        heappush(self.__gaps, (number, number))
+
+    def allocate(self):
+        """
+        Return the lowest free ID and mark it as being in use.
+        """
+        while self.__gaps:
+            (first, last) = heappop(self.__gaps)
+            if first < last:
+                heappush(self.__gaps, (first + 1, last))
+            if first not in self.__used:
+                self.__used.add(first)
+                return self.pattern % first
+        self.__max += 1
+        self.__used.add(self.__max)
+        return self.pattern % self.__max
@@ -0,0 +1,202 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Append-only journal of committed database records.
+
+Every change made to a database is written as one record holding the
+object key, the handle and the serialized data of the object (None for a
+removal). Replaying the journal on top of the last snapshot of the
+database restores all changes made since that snapshot was written.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import pickle
+import shutil
+import struct
+import logging
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from .dbconst import DBLOGNAME
+
+_LOG = logging.getLogger(DBLOGNAME)
+
+# every record is prefixed with the length of the pickled payload
+_HEADER = struct.Struct(">I")
+
+#-------------------------------------------------------------------------
+#
+# DbJournal
+#
+#-------------------------------------------------------------------------
+class DbJournal(object):
+    """
+    Append-only log of (obj_key, handle, data) records stored in a file.
+
+    A record is only considered written when its full payload is on disk;
+    a partial record at the end of the file, as left behind by a crash,
+    is ignored on replay and cut off when the journal is reopened.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.__file = None
+        self.count = 0
+
+    def open(self):
+        """
+        Open the journal for appending, creating the file if needed.
+        """
+        if self.__file is not None:
+            return
+        valid, self.count = self.__scan(self.filename)
+        self.__file = open(self.filename, "ab")
+        if self.__file.tell() != valid:
+            _LOG.warning("Discarding incomplete record at end of %s",
+                         self.filename)
+            self.__file.truncate(valid)
+            self.__file.seek(valid)
+
+    def close(self):
+        """
+        Flush and close the journal file.
+        """
+        if self.__file is not None:
+            self.sync()
+            self.__file.close()
+            self.__file = None
+
+    def is_open(self):
+        """
+        Return True if the journal accepts new records.
+        """
+        return self.__file is not None
+
+    def append(self, obj_key, handle, data):
+        """
+        Append a record to the journal.
+
+        :param obj_key: the xxx_KEY constant of the object type
+        :type obj_key: int
+        :param handle: the handle of the object
+        :type handle: str
+        :param data: the serialized object, or None if it was removed
+        :type data: tuple
+        """
+        payload = pickle.dumps((obj_key, handle, data),
+                               pickle.HIGHEST_PROTOCOL)
+        self.__file.write(_HEADER.pack(len(payload)) + payload)
+        self.__file.flush()
+        self.count += 1
+
+    def sync(self):
+        """
+        Force the records written so far to disk.
+        """
+        if self.__file is not None:
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+
+    def truncate(self):
+        """
+        Remove all records from the journal.
+        """
+        if self.__file is not None:
+            self.__file.truncate(0)
+            self.__file.seek(0)
+        elif os.path.exists(self.filename):
+            open(self.filename, "wb").close()
+        self.count = 0
+
+    def rotate(self, filename):
+        """
+        Move the current records to filename and continue with an empty
+        journal.
+
+        If filename still holds records of an earlier rotation, the current
+        records are added after them, so the order of all records is kept.
+        """
+        reopen = self.__file is not None
+        self.close()
+        if os.path.exists(self.filename):
+            if os.path.exists(filename):
+                with open(filename, "ab") as target, \
+                     open(self.filename, "rb") as source:
+                    shutil.copyfileobj(source, target)
+                os.remove(self.filename)
+            else:
+                os.replace(self.filename, filename)
+        self.count = 0
+        if reopen:
+            self.open()
+
+    def replay(self):
+        """
+        Iterate over the complete records of the journal, in the order they
+        were written, as (obj_key, handle, data) tuples.
+        """
+        return replay_journal(self.filename)
+
+    @staticmethod
+    def __scan(filename):
+        """
+        Return the size of the valid part of a journal file and the number
+        of records in it.
+        """
+        valid = count = 0
+        if not os.path.exists(filename):
+            return valid, count
+        with open(filename, "rb") as jfile:
+            while True:
+                header = jfile.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                (size,) = _HEADER.unpack(header)
+                if len(jfile.read(size)) < size:
+                    break
+                valid += _HEADER.size + size
+                count += 1
+        return valid, count
+
+def replay_journal(filename):
+    """
+    Iterate over the complete records of the journal file filename.
+
+    A missing file is treated as an empty journal.
+    """
+    if not os.path.exists(filename):
+        return
+    with open(filename, "rb") as jfile:
+        while True:
+            header = jfile.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                break
+            (size,) = _HEADER.unpack(header)
+            payload = jfile.read(size)
+            if len(payload) < size:
+                break
+            yield pickle.loads(payload)
@@ -0,0 +1,131 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Bounded cache of the objects read from a database.
+
+The cache holds read-only views, see :meth:`.Textile.view`, so the same
+object can be handed to every reader: a view can not be changed, and it
+keeps the fields it decoded, so later readers do not decode them again.
+The database must discard an entry whenever it changes the record.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from collections import OrderedDict
+
+#-------------------------------------------------------------------------
+#
+# ObjectCache
+#
+#-------------------------------------------------------------------------
+class ObjectCache(object):
+    """
+    Cache of objects by (object key, handle), dropping the least recently
+    used object when full.
+    """
+
+    def __init__(self, size):
+        """
+        :param size: the maximum number of objects kept, 0 to keep none
+        :type size: int
+        """
+        self.size = max(size, 0)
+        # (object key, handle) -> object, least recently used first
+        self.__objects = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.__objects)
+
+    def __contains__(self, key):
+        return key in self.__objects
+
+    def get(self, obj_key, handle):
+        """
+        Return the cached object of a handle, or None if it is not cached.
+
+        :param obj_key: the xxx_KEY constant of the table
+        :type obj_key: int
+        :param handle: the handle of the object
+        :type handle: str
+        """
+        key = (obj_key, handle)
+        obj = self.__objects.get(key)
+        if obj is None:
+            self.misses += 1
+            return None
+        self.__objects.move_to_end(key)
+        self.hits += 1
+        return obj
+
+    def add(self, obj_key, handle, obj):
+        """
+        Cache the object of a handle, dropping the least recently used
+        object if the cache is full.
+        """
+        if not self.size:
+            return
+        objects = self.__objects
+        objects[(obj_key, handle)] = obj
+        if len(objects) > self.size:
+            objects.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, obj_key, handle):
+        """
+        Remove the object of a handle, if it is cached.
+        """
+        self.__objects.pop((obj_key, handle), None)
+
+    def clear(self):
+        """
+        Remove all objects. The statistics are kept.
+        """
+        self.__objects.clear()
+
+    def resize(self, size):
+        """
+        Change the maximum number of objects, dropping the least recently
+        used ones if there are too many.
+        """
+        self.size = max(size, 0)
+        while len(self.__objects) > self.size:
+            self.__objects.popitem(last=False)
+            self.evictions += 1
+
+    def get_stats(self):
+        """
+        Return a dict with the number of cached objects ("count"), the
+        maximum ("size"), and the numbers of "hits", "misses" and
+        "evictions" since the statistics were reset.
+        """
+        return {"count": len(self.__objects), "size": self.size,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    def reset_stats(self):
+        """
+        Set the hit, miss and eviction counts to zero.
+        """
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,143 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+In-memory reference map between primary objects.
+"""
+
+#-------------------------------------------------------------------------
+#
+# ReferenceMap
+#
+#-------------------------------------------------------------------------
+class ReferenceMap(object):
+    """
+    Keep track of which primary objects reference which other objects.
+
+    Two indexes are maintained: for every primary object the set of
+    (class_name, handle) tuples it references, and for every referenced
+    handle the referring handles grouped by their class name. Finding the
+    objects that refer to a handle therefore takes time proportional to
+    the number of referrers only.
+    """
+
+    def __init__(self):
+        # handle -> (class_name, set of (ref_class_name, ref_handle))
+        self.__primary = {}
+        # ref_handle -> {class_name: set of handles}
+        self.__referenced = {}
+
+    def __len__(self):
+        """
+        Return the number of primary objects with references.
+        """
+        return len(self.__primary)
+
+    def clear(self):
+        """
+        Remove all references.
+        """
+        self.__primary.clear()
+        self.__referenced.clear()
+
+    def update(self, class_name, handle, references):
+        """
+        Set the references of a primary object, replacing the old ones.
+
+        :param class_name: class name of the referring object
+        :type class_name: str
+        :param handle: handle of the referring object
+        :type handle: str
+        :param references: the (class_name, handle) tuples the object
+                           references, as returned by
+                           get_referenced_handles_recursively
+        :type references: list
+        """
+        new_refs = set(references)
+        old_refs = self.__primary.get(handle, (class_name, set()))[1]
+        for (ref_class, ref_handle) in old_refs - new_refs:
+            self.__unlink(class_name, handle, ref_handle)
+        for (ref_class, ref_handle) in new_refs - old_refs:
+            self.__referenced.setdefault(ref_handle, {}).setdefault(
+                class_name, set()).add(handle)
+        if new_refs:
+            self.__primary[handle] = (class_name, new_refs)
+        else:
+            self.__primary.pop(handle, None)
+
+    def remove(self, handle):
+        """
+        Remove all references made by the primary object handle.
+        """
+        if handle in self.__primary:
+            (class_name, old_refs) = self.__primary.pop(handle)
+            for (ref_class, ref_handle) in old_refs:
+                self.__unlink(class_name, handle, ref_handle)
+
+    def __unlink(self, class_name, handle, ref_handle):
+        referrers = self.__referenced.get(ref_handle)
+        if referrers is None:
+            return
+        handles = referrers.get(class_name)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del referrers[class_name]
+        if not referrers:
+            del self.__referenced[ref_handle]
+
+    def get_references(self, handle):
+        """
+        Return the set of (class_name, handle) tuples referenced by handle.
+        """
+        return set(self.__primary.get(handle, (None, ()))[1])
+
+    def find_backlink_handles(self, handle, include_classes=None):
+        """
+        Iterate over the (class_name, handle) tuples of the objects that
+        reference handle.
+
+        :param include_classes: list of class names to include in the
+            results. Default is None which includes all classes.
+        :type include_classes: list of class names
+        """
+        # the result is collected first, so the referrers can be committed
+        # while iterating
+        result = []
+        for class_name, handles in self.__referenced.get(handle, {}).items():
+            if include_classes is None or class_name in include_classes:
+                result.extend((class_name, ref_handle)
+                              for ref_handle in handles)
+        return iter(result)
+
+    def serialize(self):
+        """
+        Convert the reference map to a list of (handle, class_name,
+        references) tuples.
+        """
+        return [(handle, class_name, list(refs))
+                for handle, (class_name, refs) in self.__primary.items()]
+
+    def unserialize(self, data):
+        """
+        Rebuild the reference map from a serialized list.
+        """
+        self.clear()
+        for (handle, class_name, refs) in data:
+            self.update(class_name, handle, refs)
+        return self
@@ -0,0 +1,165 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Native binary snapshot of a database.
+
+The file starts with a fixed header, followed by the pickled serialized
+data of every record and, per table, a key block and an offset table::
+
+    header      magic, offset and size of the directory
+    records     pickled serialize() tuples, one after the other
+    per table   key block: pickled (handles, wearnow_ids) lists
+                offset table: one fixed (offset, size) entry per record
+    directory   pickled dict with the metadata and the location of the
+                key block and offset table of every table
+
+The entries of the offset table are in the order of the key block, so the
+record of the n-th handle can be found without decoding anything else.
+:class:`SnapshotReader` maps the file in memory and only unpickles a
+record when it is asked for.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import mmap
+import pickle
+import struct
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+MAGIC = b"WNSNAP01"
+_HEADER = struct.Struct(">8sQQ")
+_ENTRY = struct.Struct(">QI")
+
+def dumps(data):
+    """
+    Return the record bytes of a serialized object.
+    """
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+#-------------------------------------------------------------------------
+#
+# Writing
+#
+#-------------------------------------------------------------------------
+def write_snapshot(filename, tables, metadata=None):
+    """
+    Write a snapshot file.
+
+    :param filename: the file to write
+    :type filename: str
+    :param tables: maps an object key to an iterable of
+                   (handle, wearnow_id, record) tuples, where record is the
+                   data as returned by :func:`dumps`
+    :type tables: dict
+    :param metadata: any picklable data to store with the tables
+    """
+    with open(filename, "wb") as sfile:
+        sfile.write(_HEADER.pack(MAGIC, 0, 0))
+        table_dir = {}
+        for key, records in tables.items():
+            handles = []
+            wearnow_ids = []
+            entries = []
+            for (handle, wearnow_id, record) in records:
+                handles.append(handle)
+                wearnow_ids.append(wearnow_id)
+                entries.append(_ENTRY.pack(sfile.tell(), len(record)))
+                sfile.write(record)
+            keys_offset = sfile.tell()
+            sfile.write(dumps((handles, wearnow_ids)))
+            offsets_offset = sfile.tell()
+            sfile.write(b"".join(entries))
+            table_dir[key] = (keys_offset, offsets_offset - keys_offset,
+                              offsets_offset, len(handles))
+        dir_offset = sfile.tell()
+        directory = dumps({"metadata": metadata, "tables": table_dir})
+        sfile.write(directory)
+        sfile.seek(0)
+        sfile.write(_HEADER.pack(MAGIC, dir_offset, len(directory)))
+        sfile.flush()
+        os.fsync(sfile.fileno())
+
+#-------------------------------------------------------------------------
+#
+# SnapshotReader
+#
+#-------------------------------------------------------------------------
+class SnapshotReader(object):
+    """
+    Read access to a snapshot file through a read-only memory map.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as sfile:
+            if os.fstat(sfile.fileno()).st_size == 0:
+                raise ValueError("empty snapshot file %s" % filename)
+            self.__map = mmap.mmap(sfile.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, dir_offset, dir_size) = _HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("%s is not a WearNow snapshot" % filename)
+        directory = pickle.loads(self.__map[dir_offset:dir_offset + dir_size])
+        self.metadata = directory["metadata"]
+        self.__tables = directory["tables"]
+
+    def close(self):
+        """
+        Release the memory map.
+
+        Records that were not decoded before can no longer be read.
+        """
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def get_keys(self, key):
+        """
+        Return the (handles, wearnow_ids) lists of a table.
+
+        The position of a handle in the list is its index for
+        :meth:`get_data` and :meth:`get_record`.
+        """
+        if key not in self.__tables:
+            return ([], [])
+        (keys_offset, keys_size, _offsets, _count) = self.__tables[key]
+        return pickle.loads(self.__map[keys_offset:keys_offset + keys_size])
+
+    def get_record(self, key, index):
+        """
+        Return the undecoded record bytes of the index-th record of a table.
+        """
+        offsets_offset = self.__tables[key][2]
+        (offset, size) = _ENTRY.unpack_from(
+            self.__map, offsets_offset + index * _ENTRY.size)
+        return self.__map[offset:offset + size]
+
+    def get_data(self, key, index):
+        """
+        Return the serialized data of the index-th record of a table.
+        """
+        return pickle.loads(self.get_record(key, index))
@@ -0,0 +1,128 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Ordered index over the string keys of a table.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from bisect import bisect_left
+
+#-------------------------------------------------------------------------
+#
+# SortedKeys
+#
+#-------------------------------------------------------------------------
+class SortedKeys(object):
+    """
+    Keep a set of string keys in sorted order.
+
+    The keys are held in a sorted list. Keys added or removed after the
+    list was sorted are collected apart and merged in at the next lookup,
+    so a long run of changes, as made by an import, costs a single merge
+    instead of moving the list around for every key.
+    """
+
+    def __init__(self, keys=()):
+        self.__keys = sorted(keys)
+        # keys not in __keys yet
+        self.__added = set()
+        # keys in __keys that are no longer present
+        self.__removed = set()
+
+    def __len__(self):
+        return len(self.__keys) + len(self.__added) - len(self.__removed)
+
+    def __contains__(self, key):
+        if key in self.__added:
+            return True
+        return key not in self.__removed and self.__find(key)
+
+    def __find(self, key):
+        """
+        Return True if key is in the sorted list.
+        """
+        index = bisect_left(self.__keys, key)
+        return index < len(self.__keys) and self.__keys[index] == key
+
+    def add(self, key):
+        """
+        Add a key to the index.
+        """
+        if key in self.__removed:
+            self.__removed.discard(key)
+        elif not self.__find(key):
+            self.__added.add(key)
+
+    def remove(self, key):
+        """
+        Remove a key from the index.
+        """
+        if key in self.__added:
+            self.__added.discard(key)
+        elif self.__find(key):
+            self.__removed.add(key)
+
+    def __merge(self):
+        """
+        Merge the pending changes into the sorted list.
+        """
+        if self.__removed:
+            removed = self.__removed
+            self.__keys = [key for key in self.__keys if key not in removed]
+            self.__removed = set()
+        if self.__added:
+            # two sorted runs, merged in linear time
+            self.__keys.extend(sorted(self.__added))
+            self.__keys.sort()
+            self.__added = set()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """
+        Return a list of all keys, in order.
+        """
+        self.__merge()
+        return list(self.__keys)
+
+    def range(self, low=None, high=None):
+        """
+        Return the list of keys with low <= key < high, in order. A bound of
+        None is not checked.
+        """
+        self.__merge()
+        start = 0 if low is None else bisect_left(self.__keys, low)
+        stop = (len(self.__keys) if high is None
+                else bisect_left(self.__keys, high))
+        return self.__keys[start:stop]
+
+    def prefix(self, prefix):
+        """
+        Return the list of keys starting with prefix, in order.
+        """
+        if not prefix:
+            return self.keys()
+        # the first string after all strings starting with prefix
+        high = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self.range(prefix, high)
@@ -0,0 +1,84 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ...lib.attrtype import AttributeType
+from ..attrindex import AttributeIndexes
+
+def attribute(attr_type, value):
+    """Return a serialized attribute."""
+    return (False, [], AttributeType(attr_type).serialize(), value)
+
+class AttributeIndexesTest(unittest.TestCase):
+    """Test the attribute indexes."""
+
+    def setUp(self):
+        self.indexes = AttributeIndexes()
+        self.rfid = self.indexes.declare(AttributeType.RFID_ID)
+        self.clo = self.indexes.declare(AttributeType.THERM_INS, sorted=True)
+        self.records = [
+            ("T1", [attribute(AttributeType.THERM_INS, "0.30"),
+                    attribute(AttributeType.RFID_ID, "E1")]),
+            ("T2", [attribute(AttributeType.THERM_INS, "0.10")]),
+            ("T3", [attribute(AttributeType.THERM_INS, "n/a"),
+                    attribute(AttributeType.RFID_ID, "E1")]),
+            ("T4", [attribute(AttributeType.THERM_INS, "0.20"),
+                    attribute(AttributeType.THERM_INS, "0.30")]),
+            ]
+
+    def check(self):
+        self.assertEqual(self.clo.find_range(),
+                         [(0.1, "T2"), (0.2, "T4"), (0.3, "T1"),
+                          (0.3, "T4")])
+        self.assertEqual(self.clo.find_range(0.15, 0.3),
+                         [(0.2, "T4"), (0.3, "T1"), (0.3, "T4")])
+        self.assertEqual(sorted(self.rfid.find("E1")), ["T1", "T3"])
+
+    def test_update(self):
+        for (handle, attribute_list) in self.records:
+            self.indexes.update(handle, attribute_list)
+        self.check()
+        self.indexes.update("T4", [attribute(AttributeType.THERM_INS, "0.05")])
+        self.assertEqual(self.clo.find_range(None, 0.1),
+                         [(0.05, "T4"), (0.1, "T2")])
+        self.indexes.remove("T2")
+        self.assertEqual(self.clo.find_range(None, 0.1), [(0.05, "T4")])
+
+    def test_fill(self):
+        self.indexes.update("T2", [attribute(AttributeType.THERM_INS, "0.50")])
+        self.indexes.fill(self.records)
+        self.check()
+        # the index keeps working after a fill
+        self.indexes.update("T5", [attribute(AttributeType.THERM_INS, "0.25")])
+        self.assertEqual(self.clo.find_range(0.25, 0.25), [(0.25, "T5")])
+
+    def test_round_trip(self):
+        self.indexes.fill(self.records)
+        data = self.indexes.serialize()
+        self.indexes.clear()
+        self.assertEqual(self.clo.find_range(), [])
+        self.assertTrue(self.indexes.unserialize(data))
+        self.check()
+
+def testSuite():
+    suite = unittest.makeSuite(AttributeIndexesTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
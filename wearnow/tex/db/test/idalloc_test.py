@@ -0,0 +1,66 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..idalloc import IdAllocator
+
+class IdAllocatorTest(unittest.TestCase):
+    """Test the allocation of WearNow IDs."""
+
+    def allocate(self, allocator, count):
+        return [allocator.allocate() for index in range(count)]
+
+    def test_gaps(self):
+        allocator = IdAllocator("I%04d", ["I0001", "I0003", "X0000", "",
+                                          "I1", None])
+        self.assertEqual(self.allocate(allocator, 4),
+                         ["I0000", "I0002", "I0004", "I0005"])
+
+    def test_reuse(self):
+        allocator = IdAllocator("I%04d")
+        self.assertEqual(self.allocate(allocator, 3),
+                         ["I0000", "I0001", "I0002"])
+        allocator.remove("I0001")
+        allocator.remove("I0000")
+        allocator.remove("I0009")
+        self.assertEqual(self.allocate(allocator, 3),
+                         ["I0000", "I0001", "I0003"])
+
+    def test_add(self):
+        allocator = IdAllocator("I%04d", ["I0000"])
+        allocator.add("I0003")
+        # a free number taken after it was made free is skipped
+        allocator.add("I0001")
+        self.assertEqual(self.allocate(allocator, 2), ["I0002", "I0004"])
+        allocator.remove("I0003")
+        allocator.add("I0003")
+        self.assertEqual(allocator.allocate(), "I0005")
+
+    def test_other_patterns(self):
+        allocator = IdAllocator("T-%d-x", ["T-0-x", "T-2-x", "T-01-x"])
+        self.assertEqual(self.allocate(allocator, 2), ["T-1-x", "T-3-x"])
+        allocator = IdAllocator("T%%%d", ["T%0"])
+        self.assertEqual(allocator.allocate(), "T%1")
+
+def testSuite():
+    suite = unittest.makeSuite(IdAllocatorTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,95 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..journal import DbJournal
+
+RECORDS = [(0, "T1", ("T1", "I0001")), (1, "E1", ("E1", "E0001")),
+           (0, "T1", None)]
+
+class DbJournalTest(unittest.TestCase):
+    """Test the append-only journal."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.journal")
+        self.journal = DbJournal(self.filename)
+        self.journal.open()
+        for record in RECORDS:
+            self.journal.append(*record)
+        self.journal.close()
+        self.size = os.path.getsize(self.filename)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def cut(self, size):
+        """Cut the journal file to size bytes."""
+        with open(self.filename, "r+b") as jfile:
+            jfile.truncate(size)
+
+    def test_replay(self):
+        self.assertEqual(list(self.journal.replay()), RECORDS)
+        self.assertEqual(list(DbJournal(self.filename + ".none").replay()),
+                         [])
+
+    def test_partial_tail(self):
+        # a crash in the middle of the payload, and in the middle of the
+        # length in front of it
+        for tail in (b"\x00\x00\x00\x10pa", b"\x00\x00"):
+            with open(self.filename, "ab") as jfile:
+                jfile.write(tail)
+            self.assertEqual(list(self.journal.replay()), RECORDS)
+            self.journal.open()
+            self.assertEqual(self.journal.count, 3)
+            self.assertEqual(os.path.getsize(self.filename), self.size)
+            # new records follow the complete ones
+            self.journal.append(1, "E1", None)
+            self.journal.close()
+            self.assertEqual(list(self.journal.replay()),
+                             RECORDS + [(1, "E1", None)])
+            self.cut(self.size)
+
+    def test_partial_record_only(self):
+        self.cut(self.size - 1)
+        self.assertEqual(list(self.journal.replay()), RECORDS[:2])
+        self.journal.open()
+        self.assertEqual(self.journal.count, 2)
+
+    def test_rotate(self):
+        old = self.filename + ".old"
+        self.journal.open()
+        self.journal.rotate(old)
+        self.assertEqual(self.journal.count, 0)
+        self.journal.append(1, "E2", None)
+        self.journal.rotate(old)
+        self.assertEqual(list(DbJournal(old).replay()),
+                         RECORDS + [(1, "E2", None)])
+        self.assertEqual(list(self.journal.replay()), [])
+
+def testSuite():
+    suite = unittest.makeSuite(DbJournalTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,64 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..objcache import ObjectCache
+
+class ObjectCacheTest(unittest.TestCase):
+    """Test the object cache."""
+
+    def setUp(self):
+        self.cache = ObjectCache(2)
+        self.cache.add(0, "T1", "one")
+        self.cache.add(0, "T2", "two")
+
+    def test_get(self):
+        self.assertEqual(self.cache.get(0, "T1"), "one")
+        self.assertIsNone(self.cache.get(1, "T1"))
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_evict(self):
+        # T1 is used, so T2 is the least recently used object
+        self.cache.get(0, "T1")
+        self.cache.add(0, "T3", "three")
+        self.assertIn((0, "T1"), self.cache)
+        self.assertNotIn((0, "T2"), self.cache)
+        self.assertEqual(self.cache.get_stats()["evictions"], 1)
+        self.cache.resize(1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn((0, "T3"), self.cache)
+
+    def test_discard(self):
+        self.cache.discard(0, "T1")
+        self.cache.discard(0, "T9")
+        self.assertIsNone(self.cache.get(0, "T1"))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_disabled(self):
+        self.cache.resize(0)
+        self.cache.add(0, "T1", "one")
+        self.assertEqual(len(self.cache), 0)
+
+def testSuite():
+    suite = unittest.makeSuite(ObjectCacheTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,81 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..refmap import ReferenceMap
+
+class ReferenceMapTest(unittest.TestCase):
+    """Test the reference map."""
+
+    def setUp(self):
+        self.refmap = ReferenceMap()
+        self.refmap.update("Textile", "T1", [("Note", "N1"), ("Tag", "G1")])
+        self.refmap.update("Textile", "T2", [("Note", "N1")])
+        self.refmap.update("Ensemble", "E1", [("Textile", "T1"),
+                                              ("Note", "N1")])
+
+    def backlinks(self, handle, include_classes=None):
+        return sorted(self.refmap.find_backlink_handles(handle,
+                                                        include_classes))
+
+    def test_backlinks(self):
+        self.assertEqual(self.backlinks("N1"),
+                         [("Ensemble", "E1"), ("Textile", "T1"),
+                          ("Textile", "T2")])
+        self.assertEqual(self.backlinks("N1", ["Ensemble"]),
+                         [("Ensemble", "E1")])
+        self.assertEqual(self.backlinks("T1"), [("Ensemble", "E1")])
+        self.assertEqual(self.backlinks("X1"), [])
+        self.assertEqual(self.refmap.get_references("T2"), {("Note", "N1")})
+        self.assertEqual(len(self.refmap), 3)
+
+    def test_update(self):
+        self.refmap.update("Textile", "T1", [("Note", "N2")])
+        self.assertEqual(self.backlinks("N1"),
+                         [("Ensemble", "E1"), ("Textile", "T2")])
+        self.assertEqual(self.backlinks("G1"), [])
+        self.assertEqual(self.backlinks("N2"), [("Textile", "T1")])
+        self.refmap.update("Textile", "T2", [])
+        self.assertEqual(self.backlinks("N1"), [("Ensemble", "E1")])
+        self.assertEqual(len(self.refmap), 2)
+
+    def test_remove(self):
+        self.refmap.remove("E1")
+        self.refmap.remove("E9")
+        self.assertEqual(self.backlinks("T1"), [])
+        self.assertEqual(self.backlinks("N1"),
+                         [("Textile", "T1"), ("Textile", "T2")])
+        # the referrers can be changed while iterating
+        for (class_name, handle) in self.refmap.find_backlink_handles("N1"):
+            self.refmap.remove(handle)
+        self.assertEqual(len(self.refmap), 0)
+
+    def test_serialize(self):
+        copy = ReferenceMap().unserialize(self.refmap.serialize())
+        self.assertEqual(sorted(copy.find_backlink_handles("N1")),
+                         self.backlinks("N1"))
+        self.assertEqual(copy.get_references("T1"),
+                         self.refmap.get_references("T1"))
+
+def testSuite():
+    suite = unittest.makeSuite(ReferenceMapTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
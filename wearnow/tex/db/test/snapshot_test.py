@@ -0,0 +1,65 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..snapshot import SnapshotReader, write_snapshot, dumps
+
+TABLES = {0: [("T1", "I0001", dumps(("T1", "I0001", "coat"))),
+              ("T2", None, dumps(("T2", "", "scarf")))],
+          1: []}
+
+class SnapshotReaderTest(unittest.TestCase):
+    """Test writing and reading a snapshot file."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.snapshot")
+        write_snapshot(self.filename, TABLES, {"owner": "me"})
+        self.reader = SnapshotReader(self.filename)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.directory)
+
+    def test_read(self):
+        self.assertEqual(self.reader.metadata, {"owner": "me"})
+        self.assertEqual(self.reader.get_keys(0),
+                         (["T1", "T2"], ["I0001", None]))
+        self.assertEqual(self.reader.get_keys(1), ([], []))
+        self.assertEqual(self.reader.get_keys(2), ([], []))
+        self.assertEqual(self.reader.get_data(0, 1), ("T2", "", "scarf"))
+        self.assertEqual(self.reader.get_record(0, 0), TABLES[0][0][2])
+
+    def test_invalid(self):
+        filename = os.path.join(self.directory, "other")
+        open(filename, "wb").close()
+        self.assertRaises(ValueError, SnapshotReader, filename)
+        with open(filename, "wb") as sfile:
+            sfile.write(b"<?xml version='1.0'?>" + b" " * 20)
+        self.assertRaises(ValueError, SnapshotReader, filename)
+
+def testSuite():
+    suite = unittest.makeSuite(SnapshotReaderTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,62 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..sortedkeys import SortedKeys
+
+class SortedKeysTest(unittest.TestCase):
+    """Test the ordered index of keys."""
+
+    def setUp(self):
+        self.keys = SortedKeys(["b2", "a1", "c3", "b1"])
+
+    def test_lookup(self):
+        self.assertEqual(self.keys.keys(), ["a1", "b1", "b2", "c3"])
+        self.assertEqual(self.keys.range("b", "c3"), ["b1", "b2"])
+        self.assertEqual(self.keys.range(None, "b1"), ["a1"])
+        self.assertEqual(self.keys.range("b2"), ["b2", "c3"])
+        self.assertEqual(self.keys.prefix("b"), ["b1", "b2"])
+        self.assertEqual(self.keys.prefix("b1"), ["b1"])
+        self.assertEqual(self.keys.prefix(""), self.keys.keys())
+        self.assertEqual(self.keys.prefix("d"), [])
+
+    def test_changes(self):
+        self.keys.add("a2")
+        self.keys.add("a2")
+        self.keys.add("b1")
+        self.keys.remove("c3")
+        self.keys.remove("x9")
+        self.assertEqual(len(self.keys), 4)
+        self.assertIn("a2", self.keys)
+        self.assertNotIn("c3", self.keys)
+        self.assertEqual(list(self.keys), ["a1", "a2", "b1", "b2"])
+        # changes undone before they are merged
+        self.keys.remove("a1")
+        self.keys.add("a1")
+        self.keys.add("a0")
+        self.keys.remove("a0")
+        self.assertEqual(len(self.keys), 4)
+        self.assertEqual(self.keys.keys(), ["a1", "a2", "b1", "b2"])
+
+def testSuite():
+    suite = unittest.makeSuite(SortedKeysTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,79 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..textindex import TextIndex, tokenize
+
+class TextIndexTest(unittest.TestCase):
+    """Test the full-text index."""
+
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.update("T1", ["Wool pullover", "Merino"])
+        self.index.update("T2", ["Cotton shirt", None])
+        self.index.update("T3", ["WOOL socks", ""])
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Wash at 30°C, no-dryer"),
+                         ["wash", "at", "30", "c", "no", "dryer"])
+
+    def test_find(self):
+        self.assertEqual(sorted(self.index.find("wool")), ["T1", "T3"])
+        self.assertEqual(self.index.find("Wool MERINO"), ["T1"])
+        self.assertEqual(self.index.find("wool shirt"), [])
+        self.assertEqual(self.index.find("pull"), [])
+        self.assertEqual(self.index.find(" - "), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.find("wool pull", prefix=True), ["T1"])
+        self.assertEqual(sorted(self.index.find("s", prefix=True)),
+                         ["T2", "T3"])
+        self.assertEqual(self.index.complete("Wo"), ["wool"])
+        self.assertEqual(self.index.complete("s"), ["shirt", "socks"])
+        self.assertEqual(self.index.complete("s", limit=1), ["shirt"])
+
+    def test_containing(self):
+        self.assertEqual(sorted(self.index.find_containing("OOL")),
+                         ["T1", "T3"])
+        self.assertEqual(self.index.find_containing("ol pull"), ["T1"])
+        self.assertIsNone(self.index.find_containing("--"))
+
+    def test_update(self):
+        self.index.update("T1", ["Linen shirt"])
+        self.assertEqual(self.index.find("wool"), ["T3"])
+        self.assertEqual(sorted(self.index.find("shirt")), ["T1", "T2"])
+        self.assertEqual(self.index.complete("m"), [])
+        self.index.remove("T2")
+        self.index.remove("T4")
+        self.assertEqual(self.index.complete("c"), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_serialize(self):
+        index = TextIndex().unserialize(self.index.serialize())
+        self.assertEqual(index.get_words("T1"),
+                         ("merino", "pullover", "wool"))
+        self.assertEqual(sorted(index.find("wool")), ["T1", "T3"])
+        self.assertEqual(index.complete("s"), ["shirt", "socks"])
+
+def testSuite():
+    suite = unittest.makeSuite(TextIndexTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
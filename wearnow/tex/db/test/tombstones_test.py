@@ -0,0 +1,69 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from ..tombstones import Tombstones
+
+class TombstonesTest(unittest.TestCase):
+    """Test the record of removed objects."""
+
+    def setUp(self):
+        self.tombstones = Tombstones()
+        self.tombstones.remove(0, "T2", 100)
+        self.tombstones.remove(0, "T1", 200)
+        self.tombstones.remove(1, "E1", 300)
+
+    def test_removed_since(self):
+        self.assertEqual(self.tombstones.removed_since(0, 0), ["T1", "T2"])
+        self.assertEqual(self.tombstones.removed_since(0, 100), ["T1", "T2"])
+        self.assertEqual(self.tombstones.removed_since(0, 101), ["T1"])
+        self.assertEqual(self.tombstones.removed_since(2, 0), [])
+        self.assertEqual(len(self.tombstones), 3)
+
+    def test_restore(self):
+        self.tombstones.restore(0, "T1", 400)
+        self.tombstones.restore(0, "T9", 400)
+        self.assertFalse(self.tombstones.is_removed(0, "T1"))
+        self.assertEqual(self.tombstones.removed_since(0, 0), ["T2"])
+        self.assertEqual(self.tombstones.restored_since(0, 300), ["T1"])
+        self.assertEqual(self.tombstones.restored_since(0, 400), ["T1"])
+        self.assertEqual(self.tombstones.restored_since(0, 401), [])
+        # removed again
+        self.tombstones.remove(0, "T1", 500)
+        self.assertEqual(self.tombstones.restored_since(0, 0), [])
+
+    def test_purge(self):
+        self.tombstones.purge(200)
+        self.assertEqual(self.tombstones.removed_since(0, 0), ["T1"])
+        self.assertEqual(len(self.tombstones), 2)
+
+    def test_serialize(self):
+        self.tombstones.restore(1, "E1", 400)
+        copy = Tombstones().unserialize(self.tombstones.serialize())
+        self.assertEqual(copy.removed_since(0, 0), ["T1", "T2"])
+        self.assertEqual(copy.restored_since(1, 0), ["E1"])
+        copy.remove(0, "T3", 600)
+        self.assertFalse(self.tombstones.is_removed(0, "T3"))
+
+def testSuite():
+    suite = unittest.makeSuite(TombstonesTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
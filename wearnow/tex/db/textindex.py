@@ -0,0 +1,215 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Inverted full-text index on the texts of primary objects.
+
+Texts are split in words, the runs of letters, digits and underscores,
+which are case-folded. The index maps every word to the handles of the
+objects using it, so the objects having some words are found without
+reading any object. Words are also kept in order, to find the words
+starting with a prefix for type-ahead.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import re
+from bisect import bisect_left
+
+_WORD = re.compile(r"\w+")
+# sorts after all words starting with a given prefix
+_LAST = chr(0x10ffff)
+
+def tokenize(text):
+    """
+    Return the list of case-folded words of a text, in order.
+    """
+    return _WORD.findall(text.casefold())
+
+#-------------------------------------------------------------------------
+#
+# TextIndex
+#
+#-------------------------------------------------------------------------
+class TextIndex(object):
+    """
+    Index mapping the words of the texts of objects to their handles.
+    """
+
+    def __init__(self):
+        # handle -> tuple of distinct words
+        self.__words = {}
+        # word -> set of handles
+        self.__handles = {}
+        # all words in order, built when needed
+        self.__sorted = None
+
+    def __len__(self):
+        """
+        Return the number of indexed objects.
+        """
+        return len(self.__words)
+
+    def clear(self):
+        """
+        Remove all entries from the index.
+        """
+        self.__words.clear()
+        self.__handles.clear()
+        self.__sorted = None
+
+    def update(self, handle, texts):
+        """
+        Set the indexed texts of an object, replacing the old ones.
+
+        :param handle: handle of the object
+        :type handle: str
+        :param texts: the texts of the object
+        :type texts: list of str
+        """
+        words = set()
+        for text in texts:
+            if text:
+                words.update(tokenize(text))
+        self.__set_words(handle, tuple(sorted(words)))
+
+    def __set_words(self, handle, words):
+        old_words = self.__words.get(handle, ())
+        if old_words == words:
+            return
+        for word in set(old_words).difference(words):
+            handles = self.__handles[word]
+            handles.discard(handle)
+            if not handles:
+                del self.__handles[word]
+                self.__sorted = None
+        for word in set(words).difference(old_words):
+            handles = self.__handles.get(word)
+            if handles is None:
+                handles = self.__handles[word] = set()
+                self.__sorted = None
+            handles.add(handle)
+        if words:
+            self.__words[handle] = words
+        else:
+            self.__words.pop(handle, None)
+
+    def remove(self, handle):
+        """
+        Remove the object handle from the index.
+        """
+        self.__set_words(handle, ())
+
+    def get_words(self, handle):
+        """
+        Return the tuple of distinct words of the object handle, in order.
+        """
+        return self.__words.get(handle, ())
+
+    def __sorted_words(self):
+        if self.__sorted is None:
+            self.__sorted = sorted(self.__handles)
+        return self.__sorted
+
+    def complete(self, prefix, limit=None):
+        """
+        Return the indexed words starting with the case-folded prefix, in
+        order, at most limit of them if limit is not None.
+        """
+        prefix = prefix.casefold()
+        words = self.__sorted_words()
+        start = bisect_left(words, prefix)
+        stop = bisect_left(words, prefix + _LAST, start)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return words[start:stop]
+
+    def __with_prefix(self, prefix):
+        handles = set()
+        for word in self.complete(prefix):
+            handles.update(self.__handles[word])
+        return handles
+
+    def __containing(self, part):
+        handles = set()
+        for (word, word_handles) in self.__handles.items():
+            if part in word:
+                handles.update(word_handles)
+        return handles
+
+    def find(self, text, prefix=False):
+        """
+        Return the list of handles of the objects having all words of the
+        text. If prefix is True, the last word only needs to start a word
+        of the object, as it does while the user is typing.
+        """
+        words = tokenize(text)
+        if not words:
+            return []
+        sets = [self.__handles.get(word, set()) for word in words[:-1]]
+        if prefix:
+            sets.append(self.__with_prefix(words[-1]))
+        else:
+            sets.append(self.__handles.get(words[-1], set()))
+        return list(_intersection(sets))
+
+    def find_containing(self, text):
+        """
+        Return the list of handles of the objects that may contain the
+        text, ignoring case. Every word of the text must be part of a word
+        of the object. The list includes all objects that contain the text,
+        but the objects must still be checked.
+
+        Return None if the text has no words, in which case the index can
+        not narrow the search.
+        """
+        words = tokenize(text)
+        if not words:
+            return None
+        return list(_intersection([self.__containing(word)
+                                   for word in set(words)]))
+
+    def serialize(self):
+        """
+        Convert the index to a list of (handle, words) tuples.
+        """
+        return list(self.__words.items())
+
+    def unserialize(self, data):
+        """
+        Rebuild the index from a serialized list.
+        """
+        self.clear()
+        for (handle, words) in data:
+            self.__set_words(handle, tuple(words))
+        return self
+
+def _intersection(sets):
+    """
+    Return the intersection of a list of sets, starting with the smallest.
+    """
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for handles in sets[1:]:
+        if not result:
+            break
+        result.intersection_update(handles)
+    return result
@@ -0,0 +1,143 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Record of the objects removed from a database, with the time of removal.
+
+The change time of an object tells when it was last edited, but once an
+object is removed nothing is left to tell when. A tombstone keeps the
+handle, so the changes since some time can list the removals too.
+
+An object can also come back with its old change time, as when its removal
+is undone. Such objects are kept as restored, with the time they came back,
+so they count as changed then.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Tombstones
+#
+#-------------------------------------------------------------------------
+class Tombstones(object):
+    """
+    The handles of removed and restored objects, by object key, with the
+    time of the removal or restore.
+    """
+
+    def __init__(self):
+        # object key -> {handle: time removed}
+        self.__removed = {}
+        # object key -> {handle: time restored}
+        self.__restored = {}
+
+    def __len__(self):
+        """
+        Return the number of removed objects.
+        """
+        return sum(len(handles) for handles in self.__removed.values())
+
+    def clear(self):
+        """
+        Forget all removed and restored objects.
+        """
+        self.__removed.clear()
+        self.__restored.clear()
+
+    def remove(self, obj_key, handle, when):
+        """
+        Record the removal of an object.
+
+        :param obj_key: the xxx_KEY constant of the table
+        :type obj_key: int
+        :param handle: the handle of the object
+        :type handle: str
+        :param when: the time of the removal, in seconds since the epoch
+        :type when: int
+        """
+        self.__restored.get(obj_key, {}).pop(handle, None)
+        self.__removed.setdefault(obj_key, {})[handle] = when
+
+    def restore(self, obj_key, handle, when):
+        """
+        Record that an object exists again. Nothing is recorded if it was
+        not removed.
+        """
+        if self.__removed.get(obj_key, {}).pop(handle, None) is not None:
+            self.__restored.setdefault(obj_key, {})[handle] = when
+
+    def is_removed(self, obj_key, handle):
+        """
+        Return True if the object was removed and did not come back.
+        """
+        return handle in self.__removed.get(obj_key, {})
+
+    def removed_since(self, obj_key, since):
+        """
+        Return the sorted list of handles of the objects removed at or
+        after the time since. Times are in whole seconds, so a removal
+        made in the second of since counts as after it.
+        """
+        return sorted(handle for (handle, when)
+                      in self.__removed.get(obj_key, {}).items()
+                      if when >= since)
+
+    def restored_since(self, obj_key, since):
+        """
+        Return the sorted list of handles of the objects restored at or
+        after the time since.
+        """
+        return sorted(handle for (handle, when)
+                      in self.__restored.get(obj_key, {}).items()
+                      if when >= since)
+
+    def purge(self, before):
+        """
+        Forget the removals and restores made before the time before. A
+        list of changes since an earlier time is then incomplete.
+        """
+        for entries in (self.__removed, self.__restored):
+            for handles in entries.values():
+                for (handle, when) in list(handles.items()):
+                    if when < before:
+                        del handles[handle]
+
+    def copy(self):
+        """
+        Return an independent copy.
+        """
+        return Tombstones().unserialize(self.serialize())
+
+    def serialize(self):
+        """
+        Convert the tombstones to a tuple of (removed, restored) dicts.
+        """
+        return (dict((key, dict(handles))
+                     for (key, handles) in self.__removed.items()),
+                dict((key, dict(handles))
+                     for (key, handles) in self.__restored.items()))
+
+    def unserialize(self, data):
+        """
+        Set the tombstones from serialized data.
+        """
+        (removed, restored) = data
+        self.__removed = dict((key, dict(handles))
+                              for (key, handles) in removed.items())
+        self.__restored = dict((key, dict(handles))
+                               for (key, handles) in restored.items())
+        return self
@@ -3,9 +3,20 @@
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+import os
 import time
+import pickle
 from collections import deque
 
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from ..const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+from .dbconst import DBUNDO, DBUNDOMEM, KEY_TO_NAME_MAP
+
 class DbUndo(object):
     """
     Base class for the Gramps undo/redo manager.  Needs to be subclassed
@@ -99,13 +110,17 @@ class DbUndo(object):
         """         
         raise NotImplementedError
 
-    def __redo(self, update_history):
+    def _redo(self, update_history):
         """
+        Redo the last undone transaction.  Needs to be overridden in the
+        derived class.
         """
         raise NotImplementedError
 
-    def __undo(self, update_history):
+    def _undo(self, update_history):
         """
+        Undo the last committed transaction.  Needs to be overridden in the
+        derived class.
         """
         raise NotImplementedError
 
@@ -124,7 +139,7 @@ class DbUndo(object):
         """
         if self.db.readonly or self.undo_count == 0:
             return False
-        return self.__undo(update_history)
+        return self._undo(update_history)
 
     def redo(self, update_history=True):
         """
@@ -132,7 +147,7 @@ class DbUndo(object):
         """
         if self.db.readonly or self.redo_count == 0:
             return False
-        return self.__redo(update_history)
+        return self._redo(update_history)
 
     def undo_reference(self, data, handle, db_map):
         """
@@ -171,3 +186,214 @@ class DbUndo(object):
 
     undo_count = property(lambda self:len(self.undoq))
     redo_count = property(lambda self:len(self.redoq))
+
+#-------------------------------------------------------------------------
+#
+# DbUndoList
+#
+#-------------------------------------------------------------------------
+class DbUndoList(DbUndo):
+    """
+    Undo/redo manager keeping the undo records in memory.
+
+    Only the last max_history transactions can be undone; the records of
+    older transactions are dropped. When the storage is opened with a file
+    name, records are moved to that file as soon as the records in memory
+    take more than memory_limit bytes.
+
+    The database must provide a restore_record(key, handle, data) method
+    that stores the serialized data of an object, or removes the object if
+    data is None, without adding it to a transaction.
+    """
+
+    __slots__ = ('max_history', 'memory_limit', 'path', '_offsets',
+                 '_memsize', '_count', '_file')
+
+    def __init__(self, grampsdb, max_history=DBUNDO, memory_limit=DBUNDOMEM):
+        DbUndo.__init__(self, grampsdb)
+        self.max_history = max_history
+        self.memory_limit = memory_limit
+        self.path = None
+        # recno -> record, for the records in memory
+        self.undodb = {}
+        # recno -> (offset, size), for the records in the file
+        self._offsets = {}
+        self._memsize = 0
+        self._count = 0
+        self._file = None
+
+    def open(self, value=None):
+        """
+        Open the backing storage. If value is a file name, records are
+        spilled to that file.
+        """
+        self.close()
+        self.path = value
+        if value is not None:
+            self._file = open(value, "w+b")
+
+    def close(self):
+        """
+        Drop all records and remove the backing file.
+        """
+        self.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        self.path = None
+
+    def clear(self):
+        """
+        Clear the undo/redo list and drop the records of its transactions.
+        """
+        DbUndo.clear(self)
+        self.undodb.clear()
+        self._offsets.clear()
+        self._memsize = 0
+        if self._file is not None:
+            self._file.truncate(0)
+
+    def append(self, value):
+        """
+        Add a new record and return its number.
+        """
+        recno = self._count
+        self._count += 1
+        self.undodb[recno] = value
+        self._memsize += len(value)
+        if self._file is not None and self._memsize > self.memory_limit:
+            self.__spill()
+        return recno
+
+    def __spill(self):
+        """
+        Move all records in memory to the backing file.
+        """
+        self._file.seek(0, os.SEEK_END)
+        for recno, value in sorted(self.undodb.items()):
+            self._offsets[recno] = (self._file.tell(), len(value))
+            self._file.write(value)
+        self._file.flush()
+        self.undodb.clear()
+        self._memsize = 0
+
+    def __getitem__(self, index):
+        if index in self.undodb:
+            return self.undodb[index]
+        (offset, size) = self._offsets[index]
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def __setitem__(self, index, value):
+        self.__drop(index)
+        self.undodb[index] = value
+        self._memsize += len(value)
+
+    def __len__(self):
+        return self._count
+
+    def __drop(self, recno):
+        if recno in self.undodb:
+            self._memsize -= len(self.undodb.pop(recno))
+        else:
+            self._offsets.pop(recno, None)
+
+    def discard(self, txn):
+        """
+        Drop the records of a transaction.
+        """
+        for recno in txn.get_recnos():
+            self.__drop(recno)
+        if not self.undodb and not self._offsets and self._file is not None:
+            self._file.truncate(0)
+
+    def commit(self, txn, msg):
+        """
+        Commit the transaction to the undo list. Transactions that were
+        undone can no longer be redone, and the oldest transaction is
+        dropped if the history is full.
+        """
+        DbUndo.commit(self, txn, msg)
+        while self.redoq:
+            self.discard(self.redoq.pop())
+        while len(self.undoq) > self.max_history:
+            self.discard(self.undoq.popleft())
+            self.db.abort_possible = False
+
+    def rollback(self, txn):
+        """
+        Restore the state from before a transaction that is not committed
+        and drop its records.
+
+        The changes of the transaction were not signalled yet, so no
+        signals are emitted.
+        """
+        self.__replay(txn, undo=True, emit=False)
+        self.discard(txn)
+
+    def _undo(self, update_history):
+        txn = self.undoq.pop()
+        self.redoq.append(txn)
+        self.__replay(txn, undo=True)
+        self.__notify(update_history)
+        return True
+
+    def _redo(self, update_history):
+        txn = self.redoq.pop()
+        self.undoq.append(txn)
+        self.__replay(txn, undo=False)
+        self.__notify(update_history)
+        return True
+
+    def __replay(self, txn, undo, emit=True):
+        """
+        Write the before (undo) or after images of the records of a
+        transaction and emit one signal per kind of change and object type.
+        """
+        # handle -> [key, existed before, exists after]
+        changes = {}
+        for recno in txn.get_recnos(reverse=undo):
+            (key, trans_type, handle, old_data, new_data) = \
+                pickle.loads(self[recno])
+            (before, after) = ((new_data, old_data) if undo
+                               else (old_data, new_data))
+            if handle not in changes:
+                changes[handle] = [key, before is not None, None]
+            changes[handle][2] = after is not None
+            self.db.restore_record(key, handle, after)
+        if not emit:
+            return
+        signals = {}
+        for handle, (key, existed, exists) in changes.items():
+            if existed and exists:
+                signal = "-update"
+            elif exists:
+                signal = "-add"
+            elif existed:
+                signal = "-delete"
+            else:
+                continue
+            signals.setdefault(KEY_TO_NAME_MAP[key] + signal, []).append(handle)
+        for signal, handles in signals.items():
+            self.db.emit(signal, (handles,))
+
+    def __notify(self, update_history):
+        """
+        Tell the user interface about the new undo and redo state.
+        """
+        if self.db.undo_callback:
+            if self.undo_count > 0:
+                self.db.undo_callback(_("_Undo %s")
+                                      % self.undoq[-1].get_description())
+            else:
+                self.db.undo_callback(None)
+        if self.db.redo_callback:
+            if self.redo_count > 0:
+                self.db.redo_callback(_("_Redo %s")
+                                      % self.redoq[-1].get_description())
+            else:
+                self.db.redo_callback(None)
+        if update_history and self.db.undo_history_callback:
+            self.db.undo_history_callback()
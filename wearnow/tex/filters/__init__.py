@@ -30,6 +30,7 @@ from ._filterlist import FilterList
 from ._genericfilter import GenericFilter, GenericFilterFactory, DeferredFilter
 from ._paramfilter import ParamFilter
 from ._searchfilter import SearchFilter, ExactSearchFilter
+from ._textmatcher import TextMatcher, TextCache, get_text_cache
 
 #def reload_system_filters():
     #global SystemFilters
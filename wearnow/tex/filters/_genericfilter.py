@@ -122,16 +122,17 @@ class GenericFilter(object):
         return Textile()
 
     def find_from_handle(self, db, handle):
-        return db.get_textile_from_handle(handle)
+        return db.get_textile_from_handle(handle, view=True)
 
     def check_func(self, db, id_list, task, cb_progress=None, tupleind=None):
         final_list = []
         
         if id_list is None:
+            # rules only read the objects, so views will do
+            view = self.make_obj().view
             with self.get_cursor(db) as cursor:
                 for handle, data in cursor:
-                    textile = self.make_obj()
-                    textile.unserialize(data)
+                    textile = view(data)
                     if cb_progress:
                         cb_progress()
                     if task(db, textile) != self.invert:
@@ -154,10 +155,11 @@ class GenericFilter(object):
         flist = self.flist
 
         if id_list is None:
+            # rules only read the objects, so views will do
+            view = self.make_obj().view
             with self.get_cursor(db) as cursor:
                 for handle, data in cursor:
-                    textile = self.make_obj()
-                    textile.unserialize(data)
+                    textile = view(data)
                     if cb_progress:
                         cb_progress()
                     val = all(rule.apply(db, textile) for rule in flist)
@@ -256,7 +258,7 @@ class GenericEnsembleFilter(GenericFilter):
         return Ensemble()
 
     def find_from_handle(self, db, handle):
-        return db.get_family_from_handle(handle)
+        return db.get_ensemble_from_handle(handle, view=True)
 
 class GenericMediaFilter(GenericFilter):
 
@@ -270,7 +272,7 @@ class GenericMediaFilter(GenericFilter):
         return MediaObject()
 
     def find_from_handle(self, db, handle):
-        return db.get_object_from_handle(handle)
+        return db.get_object_from_handle(handle, view=True)
 
 class GenericNoteFilter(GenericFilter):
 
@@ -284,7 +286,7 @@ class GenericNoteFilter(GenericFilter):
         return Note()
 
     def find_from_handle(self, db, handle):
-        return db.get_note_from_handle(handle)
+        return db.get_note_from_handle(handle, view=True)
 
 
 def GenericFilterFactory(namespace):
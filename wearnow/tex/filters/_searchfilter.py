@@ -25,12 +25,39 @@ Package providing filtering framework for GRAMPS.
 from wearnow.tex.constfunc import win
 
 class SearchFilter(object):
-    def __init__(self, func, text, invert):
+    def __init__(self, func, text, invert, find=None):
+        """
+        :param func: returns the searched text of a handle
+        :param text: the text to search for
+        :param invert: if True, match the handles not containing text
+        :param find: optional function returning the handles that may
+                     contain a text, or None if it can not tell; it is used
+                     by :meth:`prepare` to skip the other handles
+        """
         self.func = func
         self.text = text.upper()
         self.invert = invert
+        self.find = find
+        self.handles = None
+
+    def prepare(self):
+        """
+        Look up the handles that may match, before matching many handles.
+        """
+        if self.find is not None:
+            handles = self.find(self.text)
+            self.handles = None if handles is None else set(handles)
+
+    def reset(self):
+        """
+        Forget the handles looked up by :meth:`prepare`, which get stale
+        when the database changes.
+        """
+        self.handles = None
 
     def match(self, handle, db):
+        if self.handles is not None and handle not in self.handles:
+            return self.invert
         if win():
             return self.invert ^ (self.func(handle).upper().find(str(self.text)) != -1)
         else:
@@ -0,0 +1,233 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Matching of a text or a regular expression against all text data of
+objects, as given by get_text_data_list() and get_text_data_child_list().
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+import re
+import weakref
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from ..lib.textile import Textile
+from ..lib.ensemble import Ensemble
+from ..lib.mediaobj import MediaObject
+from ..lib.note import Note
+from ..db.dbconst import TEXTILE_KEY, ENSEMBLE_KEY, MEDIA_KEY, NOTE_KEY
+
+# object key -> (class, name of the cursor method)
+_TABLES = {
+    TEXTILE_KEY: (Textile, "get_textile_cursor"),
+    ENSEMBLE_KEY: (Ensemble, "get_ensemble_cursor"),
+    MEDIA_KEY: (MediaObject, "get_media_cursor"),
+    NOTE_KEY: (Note, "get_note_cursor"),
+    }
+
+# joins the text items of an object; does not occur in typed text
+_SEPARATOR = "\0"
+
+#-------------------------------------------------------------------------
+#
+# TextCache
+#
+#-------------------------------------------------------------------------
+class TextCache(object):
+    """
+    The text data of objects by handle, as a tuple of items and as one
+    case-folded string.
+
+    An entry is only used while the object has the change time the entry
+    was made for. The database sets the change time on every commit.
+    Objects without a handle are not kept.
+    """
+
+    def __init__(self):
+        # handle -> [change, texts, case-folded text or None]
+        self.__entries = {}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __entry(self, obj):
+        handle = obj.handle
+        entry = self.__entries.get(handle)
+        if entry is None or entry[0] != obj.change:
+            entry = [obj.change, tuple(obj.iter_text_data()), None]
+            if handle:
+                self.__entries[handle] = entry
+        return entry
+
+    def get(self, obj):
+        """
+        Return the tuple of text items of an object.
+        """
+        return self.__entry(obj)[1]
+
+    def get_folded(self, obj):
+        """
+        Return the text items of an object joined in one case-folded
+        string.
+        """
+        entry = self.__entry(obj)
+        if entry[2] is None:
+            entry[2] = _SEPARATOR.join(entry[1]).casefold()
+        return entry[2]
+
+    def discard(self, handle):
+        """
+        Remove the text of an object.
+        """
+        self.__entries.pop(handle, None)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        self.__entries.clear()
+
+# database -> TextCache
+_CACHES = weakref.WeakKeyDictionary()
+
+def get_text_cache(db):
+    """
+    Return the text cache shared by all matchers on a database.
+    """
+    try:
+        return _CACHES[db]
+    except KeyError:
+        cache = _CACHES[db] = TextCache()
+        return cache
+
+#-------------------------------------------------------------------------
+#
+# TextMatcher
+#
+#-------------------------------------------------------------------------
+class TextMatcher(object):
+    """
+    Match a text or a regular expression against the text data of objects.
+
+    The pattern is prepared once. A text is found anywhere in a text item,
+    ignoring case unless asked otherwise; a regular expression is searched
+    for in each text item.
+    """
+
+    def __init__(self, pattern, case_sensitive=False, use_regex=False,
+                 cache=None):
+        """
+        :param pattern: the text or regular expression to look for
+        :type pattern: str
+        :param case_sensitive: if True, the case must match
+        :type case_sensitive: bool
+        :param use_regex: if True, pattern is a regular expression
+        :type use_regex: bool
+        :param cache: the cache of object texts to use, a new one if None;
+                      see :func:`get_text_cache`
+        :type cache: TextCache
+        :raises re.error: for an invalid regular expression
+        """
+        self.pattern = pattern
+        self.cache = TextCache() if cache is None else cache
+        # the strategies for an object and for a single text
+        if use_regex:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            self.__search = re.compile(pattern, flags).search
+            self.__match = self.__match_regex
+            self.__match_text = self.__match_text_regex
+        elif case_sensitive:
+            self.__match = self.__match_exact
+            self.__match_text = self.__match_text_exact
+        else:
+            self.__folded = pattern.casefold()
+            self.__match = self.__match_folded
+            self.__match_text = self.__match_text_folded
+
+    def match(self, obj):
+        """
+        Return True if any text data of the object or its child objects
+        matches.
+        """
+        return self.__match(obj)
+
+    def match_text(self, text):
+        """
+        Return True if a single text matches.
+        """
+        return self.__match_text(text)
+
+    def __match_regex(self, obj):
+        search = self.__search
+        for item in self.cache.get(obj):
+            if search(item):
+                return True
+        return False
+
+    def __match_exact(self, obj):
+        pattern = self.pattern
+        for item in self.cache.get(obj):
+            if pattern in item:
+                return True
+        return False
+
+    def __match_folded(self, obj):
+        return self.__folded in self.cache.get_folded(obj)
+
+    def __match_text_regex(self, text):
+        return self.__search(str(text)) is not None
+
+    def __match_text_exact(self, text):
+        return self.pattern in str(text)
+
+    def __match_text_folded(self, text):
+        return self.__folded in str(text).casefold()
+
+    def find_handles(self, db, obj_key):
+        """
+        Return the handles of the objects of a table that match, in one
+        pass over the table. The text data is only decoded for records that
+        are not in the cache for their change time.
+
+        :param db: the database
+        :param obj_key: the xxx_KEY constant of the table
+        :type obj_key: int
+        :returns: the handles of the matching objects
+        :rtype: list of str
+        """
+        (cls, cursor_name) = _TABLES[obj_key]
+        view = cls.view
+        match = self.__match
+        handles = []
+        with getattr(db, cursor_name)() as cursor:
+            for (handle, data) in cursor:
+                if isinstance(handle, bytes):
+                    handle = handle.decode("utf-8")
+                # a view only decodes what is read: for an object in the
+                # cache, that is the handle and the change time
+                if match(view(data)):
+                    handles.append(handle)
+        return handles
@@ -33,6 +33,7 @@ _ = glocale.translation.gettext
 #
 #-------------------------------------------------------------------------
 from . import Rule
+from ...db.dbconst import NOTE_KEY
 
 #-------------------------------------------------------------------------
 # Objects having notes that contain a substring or match a regular expression
@@ -47,9 +48,18 @@ class HasNoteRegexBase(Rule):
     category    = _('General filters')
     allow_regex = True
 
+    def prepare(self, db):
+        # the notes that may contain the text, if the database can tell
+        self.handles = self.find_text_candidates(db, NOTE_KEY, 0)
+
+    def reset(self):
+        self.handles = None
+
     def apply(self, db, textile):
         for handle in textile.get_note_list():
-            note = db.get_note_from_handle(handle)
+            if self.handles is not None and handle not in self.handles:
+                continue
+            note = db.get_note_from_handle(handle, view=True)
             if self.match_substring(0, note.get()):
                 return True
         return False
@@ -0,0 +1,78 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# Copyright (C) 2010    Nick Hall
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+"""
+Rule that checks for an object with a text anywhere in its text data.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+import re
+from ...const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+
+#-------------------------------------------------------------------------
+#
+# GRAMPS modules
+#
+#-------------------------------------------------------------------------
+from . import Rule
+from .._textmatcher import TextMatcher, get_text_cache
+
+#-------------------------------------------------------------------------
+#
+# HasText
+#
+#-------------------------------------------------------------------------
+class HasTextBase(Rule):
+    """
+    Rule that checks for an object with a text anywhere in its text data,
+    including the text of its child objects.
+    """
+
+    labels      = [ _('Text:') ]
+    name        = 'Objects containing <text>'
+    description = ("Matches objects whose text data contains a substring "
+                   "or matches a regular expression")
+    category    = _('General filters')
+    allow_regex = True
+
+    def prepare(self, db):
+        """
+        Prepare the rule. The text matcher is built once and shares the
+        text cache of the database with the other text rules.
+        """
+        try:
+            self.matcher = TextMatcher(self.list[0], use_regex=self.use_regex,
+                                       cache=get_text_cache(db))
+        except re.error:
+            # an invalid regular expression matches everything, as in Rule
+            self.matcher = TextMatcher('', cache=get_text_cache(db))
+
+    def reset(self):
+        self.matcher = None
+
+    def apply(self, db, obj):
+        """
+        Apply the rule.  Return True for a match.
+        """
+        return self.matcher.match(obj)
@@ -84,7 +84,7 @@ class Rule(object):
                         try:
                             self.regex[i] = re.compile(
                                 str(self.list[i]),
-                                re.I|re.U|re.L)
+                                re.I|re.U)
                         except re.error:
                             self.regex[i] = re.compile('')
                 self.match_substring = self.match_regex
@@ -95,6 +95,25 @@ class Rule(object):
         """prepare so the rule can be executed efficiently"""
         pass
 
+    def find_text_candidates(self, dbase, obj_key, param_index):
+        """
+        Return the set of handles of the objects of type obj_key that may
+        contain the text of the rule value param_index, looked up in the
+        full-text index of the database, so the other objects can be
+        skipped without being read.
+
+        Return None if all objects must be checked: for regular
+        expressions, an empty value or a database without the index.
+        """
+        if self.use_regex or not self.list[param_index]:
+            return None
+        try:
+            handles = dbase.find_handles_containing_text(
+                obj_key, self.list[param_index])
+        except NotImplementedError:
+            return None
+        return None if handles is None else set(handles)
+
     def requestreset(self):
         """
         Request that the reset method of the rule is executed if possible
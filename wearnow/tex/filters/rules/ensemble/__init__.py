@@ -42,6 +42,7 @@ from ._matchesfilter import MatchesFilter
 from ._childhasidof import ChildHasIdOf
 #from ._changedsince import ChangedSince
 from ._hastag import HasTag
+from ._hastext import HasText
 
 editor_rule_list = [
     AllEnsembles,
@@ -59,4 +60,5 @@ editor_rule_list = [
     ChildHasIdOf,
 #    ChangedSince,
     HasTag,
+    HasText,
 ]
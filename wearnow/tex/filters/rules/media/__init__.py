@@ -28,6 +28,7 @@ from ._mediaprivate import MediaPrivate
 from ._matchesfilter import MatchesFilter
 from ._hasmedia import HasMedia
 from ._hastag import HasTag
+from ._hastext import HasText
 
 editor_rule_list = [
     AllMedia,
@@ -36,4 +37,5 @@ editor_rule_list = [
     MatchesFilter,
     HasMedia,
     HasTag,
+    HasText,
 ]
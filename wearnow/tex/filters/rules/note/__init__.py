@@ -34,6 +34,7 @@ from ._matchesfilter import MatchesFilter
 from ._hasnote import HasNote
 #from ._changedsince import ChangedSince
 from ._hastag import HasTag
+from ._hastext import HasText
 #from ._hastype import HasType
 
 editor_rule_list = [
@@ -47,5 +48,6 @@ editor_rule_list = [
     MatchesFilter,
 #    ChangedSince,
     HasTag,
+    HasText,
 #    HasType,
 ]
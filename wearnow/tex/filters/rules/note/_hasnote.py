@@ -32,6 +32,7 @@ _ = glocale.translation.gettext
 #
 #-------------------------------------------------------------------------
 from ....lib.notetype import NoteType
+from ....db.dbconst import NOTE_KEY
 from .. import Rule
 
 #-------------------------------------------------------------------------
@@ -52,13 +53,19 @@ class HasNote(Rule):
     allow_regex = True
 
     def prepare(self, dbase):
+        self.handles = self.find_text_candidates(dbase, NOTE_KEY, 0)
         if self.list[1]:
             self.ntype = NoteType()
             self.ntype.set_from_xml_str(self.list[1])
         else:
             self.ntype = None
 
+    def reset(self):
+        self.handles = None
+
     def apply(self,db, note):
+        if self.handles is not None and note.handle not in self.handles:
+            return False
         if not self.match_substring(0, note.get()):
             return False
 
@@ -32,6 +32,8 @@ from ._hasnoteregexp import HasNoteRegexp
 from ._hastag import HasTag
 from ._regexpidof import RegExpIdOf
 from ._regexpname import RegExpName
+from ._hasinsulation import HasInsulation
+from ._hastext import HasText
 #-------------------------------------------------------------------------
 #
 # This is used by Custom Filter Editor tool
@@ -45,5 +47,7 @@ editor_rule_list = [
     HasTag,
     RegExpIdOf,
     RegExpName,
+    HasInsulation,
+    HasText,
 ]
 
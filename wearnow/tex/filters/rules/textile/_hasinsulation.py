@@ -0,0 +1,92 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Rule that checks for a textile with a thermal insulation in a range.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+from ....const import WEARNOW_LOCALE as glocale
+_ = glocale.translation.gettext
+
+#-------------------------------------------------------------------------
+#
+# WEARNOW modules
+#
+#-------------------------------------------------------------------------
+from .. import Rule
+from ....lib.attrtype import AttributeType
+
+#-------------------------------------------------------------------------
+#
+# HasInsulation
+#
+#-------------------------------------------------------------------------
+class HasInsulation(Rule):
+    """
+    Rule that checks for a textile with a thermal insulation in a range.
+    """
+
+    labels      = [ _('Minimum:'), _('Maximum:') ]
+    name        = _('Garments with a thermal insulation in a range')
+    description = _("Matches garments with a thermal insulation between "
+                    "the minimum and maximum value. An empty bound is not "
+                    "checked.")
+    category    = _('General filters')
+
+    def prepare(self, db):
+        """
+        Look up the matching handles in the insulation index of the
+        database, if it has one.
+        """
+        self.low = self.__bound(self.list[0])
+        self.high = self.__bound(self.list[1])
+        try:
+            self.handles = set(db.find_textile_handles_in_attribute_range(
+                AttributeType.THERM_INS, self.low, self.high))
+        except NotImplementedError:
+            self.handles = None
+
+    def reset(self):
+        self.handles = None
+
+    def apply(self, db, textile):
+        if self.handles is not None:
+            return textile.get_handle() in self.handles
+        for attr in textile.get_attribute_list():
+            if attr.get_type() != AttributeType.THERM_INS:
+                continue
+            try:
+                value = float(attr.get_value())
+            except ValueError:
+                continue
+            if ((self.low is None or value >= self.low) and
+                    (self.high is None or value <= self.high)):
+                return True
+        return False
+
+    @staticmethod
+    def __bound(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
@@ -32,6 +32,7 @@ _ = glocale.translation.gettext
 # GRAMPS modules
 #
 #-------------------------------------------------------------------------
+from ....db.dbconst import TEXTILE_KEY
 from .. import Rule
 
 #-------------------------------------------------------------------------
@@ -49,7 +50,16 @@ class RegExpName(Rule):
     category    = _('General filters')
     allow_regex = True
 
+    def prepare(self, db):
+        # the textiles that may contain the text, if the database can tell
+        self.handles = self.find_text_candidates(db, TEXTILE_KEY, 0)
+
+    def reset(self):
+        self.handles = None
+
     def apply(self,db,textile):
+        if self.handles is not None and textile.handle not in self.handles:
+            return False
         if self.match_substring(0, textile.description):
             return True
         else:
@@ -0,0 +1,188 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import re
+import unittest
+
+from ...lib import Textile, Ensemble, MediaObject, Note, Attribute, Url
+from .._textmatcher import TextCache, TextMatcher, get_text_cache
+from ..rules.textile import HasText as HasTextTextile
+from ..rules.ensemble import HasText as HasTextEnsemble
+from ..rules.media import HasText as HasTextMedia
+from ..rules.note import HasText as HasTextNote
+
+def make_textile(handle="T1", change=1):
+    """Return a garment with text in its own data and in child objects."""
+    textile = Textile()
+    textile.set_handle(handle)
+    textile.set_wearnow_id("I0001")
+    textile.set_description("Große Wool Coat")
+    textile.change = change
+    attribute = Attribute()
+    attribute.set_type("Material")
+    attribute.set_value("Merino")
+    textile.add_attribute(attribute)
+    url = Url()
+    url.set_path("http://example.com/coat")
+    textile.add_url(url)
+    return textile
+
+class Database(object):
+    """Stands for a database; the text cache is kept per database."""
+
+class TextMatcherTest(unittest.TestCase):
+    """Test the strategies of the text matcher."""
+
+    def setUp(self):
+        self.textile = make_textile()
+
+    def test_folded(self):
+        for (pattern, result) in (("wool coat", True), ("WOOL", True),
+                                  ("grosse", True), ("merino", True),
+                                  ("example.com", True), ("silk", False),
+                                  ("coat merino", False)):
+            self.assertEqual(TextMatcher(pattern).match(self.textile),
+                             result, pattern)
+        matcher = TextMatcher("GROSSE")
+        self.assertTrue(matcher.match_text("große"))
+        self.assertFalse(matcher.match_text("gross"))
+        self.assertTrue(TextMatcher("1").match_text(1))
+
+    def test_exact(self):
+        for (pattern, result) in (("Wool Coat", True), ("wool", False),
+                                  ("Merino", True), ("merino", False),
+                                  ("grosse", False)):
+            matcher = TextMatcher(pattern, case_sensitive=True)
+            self.assertEqual(matcher.match(self.textile), result, pattern)
+        matcher = TextMatcher("Wool", case_sensitive=True)
+        self.assertTrue(matcher.match_text("Wool"))
+        self.assertFalse(matcher.match_text("WOOL"))
+
+    def test_regex(self):
+        for (pattern, case_sensitive, result) in (
+                (r"^I\d+$", False, True), (r"wool\s+coat", False, True),
+                (r"wool\s+coat", True, False), (r"^merino$", False, True),
+                (r"^Merino$", True, True), (r"coat.*merino", False, False),
+                (r"^coat", False, False)):
+            matcher = TextMatcher(pattern, case_sensitive=case_sensitive,
+                                  use_regex=True)
+            self.assertEqual(matcher.match(self.textile), result, pattern)
+        matcher = TextMatcher(r"^w", use_regex=True)
+        self.assertTrue(matcher.match_text("Wool"))
+        self.assertFalse(matcher.match_text("a wool"))
+        self.assertRaises(re.error, TextMatcher, "(", use_regex=True)
+
+    def test_shared_cache(self):
+        cache = TextCache()
+        TextMatcher("wool", cache=cache).match(self.textile)
+        TextMatcher("wool", case_sensitive=True,
+                    cache=cache).match(self.textile)
+        self.assertEqual(len(cache), 1)
+        database = Database()
+        self.assertIs(get_text_cache(database), get_text_cache(database))
+        self.assertIsNot(get_text_cache(database), get_text_cache(Database()))
+
+class TextCacheTest(unittest.TestCase):
+    """Test that cached texts are used for the change time they are for."""
+
+    def test_change(self):
+        cache = TextCache()
+        matcher = TextMatcher("wool", cache=cache)
+        textile = make_textile()
+        self.assertTrue(matcher.match(textile))
+        self.assertIn("Merino", cache.get(textile))
+        # another object for the same version is read from the cache
+        edited = make_textile()
+        edited.set_description("Silk Dress")
+        self.assertTrue(matcher.match(edited))
+        # a committed edit has a later change time
+        edited.change = 2
+        self.assertFalse(matcher.match(edited))
+        self.assertTrue(TextMatcher("silk", cache=cache).match(edited))
+        self.assertIn("Silk Dress", cache.get(edited))
+        self.assertEqual(len(cache), 1)
+
+    def test_no_handle(self):
+        cache = TextCache()
+        textile = make_textile(handle=None)
+        self.assertTrue(TextMatcher("wool", cache=cache).match(textile))
+        self.assertEqual(len(cache), 0)
+
+    def test_discard(self):
+        cache = TextCache()
+        matcher = TextMatcher("wool", cache=cache)
+        matcher.match(make_textile("T1"))
+        matcher.match(make_textile("T2"))
+        cache.discard("T1")
+        cache.discard("T3")
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+class HasTextTest(unittest.TestCase):
+    """Test the HasText rules of all object types."""
+
+    def setUp(self):
+        self.database = Database()
+        ensemble = Ensemble()
+        ensemble.set_handle("E1")
+        ensemble.set_wearnow_id("E0001")
+        media = MediaObject()
+        media.set_handle("M1")
+        media.set_wearnow_id("O0001")
+        media.set_description("Front view")
+        media.set_path("/photos/coat.jpg")
+        note = Note("Dry clean only")
+        note.set_handle("N1")
+        note.set_wearnow_id("N0001")
+        self.objects = ((HasTextTextile, make_textile(), "merino"),
+                        (HasTextEnsemble, ensemble, "e0001"),
+                        (HasTextMedia, media, "coat.jpg"),
+                        (HasTextNote, note, "CLEAN"))
+
+    def apply(self, rule_class, obj, text, use_regex=False):
+        rule = rule_class([text], use_regex=use_regex)
+        rule.requestprepare(self.database)
+        try:
+            return rule.apply(self.database, obj)
+        finally:
+            rule.requestreset()
+
+    def test_text(self):
+        for (rule_class, obj, text) in self.objects:
+            self.assertTrue(self.apply(rule_class, obj, text), text)
+            self.assertFalse(self.apply(rule_class, obj, "silk"), text)
+
+    def test_regex(self):
+        for (rule_class, obj, text) in self.objects:
+            self.assertTrue(self.apply(rule_class, obj, "^.*%s" % text,
+                                       use_regex=True), text)
+            self.assertFalse(self.apply(rule_class, obj, "^silk",
+                                        use_regex=True), text)
+            # an invalid regular expression matches everything
+            self.assertTrue(self.apply(rule_class, obj, "(",
+                                       use_regex=True), text)
+
+def testSuite():
+    suite = unittest.TestSuite()
+    for test_case in (TextMatcherTest, TextCacheTest, HasTextTest):
+        suite.addTest(unittest.makeSuite(test_case, 'test'))
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -40,6 +40,9 @@ class AttributeRootBase(object):
     """
     Base class for attribute-aware objects.
     """
+
+    __slots__ = ()
+
     _CLASS = None
 
     def __init__(self, source=None):
@@ -99,7 +102,7 @@ class AttributeRootBase(object):
         """
         Convert a serialized tuple of data to an object.
         """
-        self.attribute_list = [self._CLASS().unserialize(item) for item in data]
+        self.attribute_list = [self._CLASS.create(item) for item in data]
 
     def add_attribute(self, attribute):
         """
@@ -176,4 +179,5 @@ class AttributeRootBase(object):
                 self.attribute_list.append(addendum)
 
 class AttributeBase(AttributeRootBase):
+    __slots__ = ()
     _CLASS = Attribute
@@ -33,6 +33,8 @@ from .secondaryobj import SecondaryObject
 from .privacybase import PrivacyBase
 from .notebase import NoteBase
 from .attrtype import AttributeType
+from .objview import view_class, view_tuple
+from .bincodec import BOOL, STR
 from .const import IDENTICAL, EQUAL, DIFFERENT
 
 #-------------------------------------------------------------------------
@@ -46,6 +48,8 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
     Used to store descriptive information.
 
     """
+
+    __slots__ = ('private', 'type', 'value')
     
     def __init__(self, source=None):
         """
@@ -57,6 +61,8 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
         self.type = None
         self.value = None
 
+    SCHEMA = (BOOL, AttributeType.SCHEMA, STR)
+
     def serialize(self):
         """
         Convert the object to a serialized tuple of data.
@@ -96,7 +102,7 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
 
         :returns: Returns a serialized object
         """
-        default = Attribute()
+        default = Attribute._struct_default()
         return (PrivacyBase.from_struct(struct.get("private", default.private)),
                 AttributeType.from_struct(struct.get("type", {})), 
                 struct.get("value", default.value))
@@ -107,7 +113,7 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
         """
         (privacy, the_type, self.value) = data
         PrivacyBase.unserialize(self, privacy)
-        self.type.unserialize(the_type)
+        self.type = self.type.create(the_type)
         return self
 
     def get_text_data_list(self):
@@ -189,7 +195,7 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
 
     def set_type(self, val):
         """Set the type (or key) of the Attribute instance."""
-        self.type.set(val)
+        self.type = self.type.get_shared(val)
 
     def get_type(self):
         """Return the type (or key) or the Attribute instance."""
@@ -209,7 +215,9 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
 #
 #-------------------------------------------------------------------------
 class Attribute(AttributeRoot, NoteBase):
-        
+
+    __slots__ = ('note_list',)
+
     def __init__(self, source=None):
         """
         Create a new Attribute object, copying from the source if provided.
@@ -218,12 +226,14 @@ class Attribute(AttributeRoot, NoteBase):
         NoteBase.__init__(self, source)
         
         if source:
-            self.type = AttributeType(source.type)
+            self.type = AttributeType.get_shared(source.type)
             self.value = source.value
         else:
-            self.type = AttributeType()
+            self.type = AttributeType.get_shared()
             self.value = ""
 
+    SCHEMA = (BOOL, [STR], AttributeType.SCHEMA, STR)
+
     def serialize(self):
         """
         Convert the object to a serialized tuple of data.
@@ -277,9 +287,24 @@ class Attribute(AttributeRoot, NoteBase):
         (privacy, note_list, the_type, self.value) = data
         PrivacyBase.unserialize(self, privacy)
         NoteBase.unserialize(self, note_list)
-        self.type.unserialize(the_type)
+        self.type = AttributeType.create(the_type)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create an Attribute from the data of the serialize method, without
+        setting the defaults that unserialize replaces.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only Attribute over the data of the serialize method.
+        """
+        return AttributeView(data)
+
     def get_referenced_handles(self):
         """
         Return the list of (classname, handle) tuples for all directly
@@ -301,3 +326,15 @@ class Attribute(AttributeRoot, NoteBase):
         """
         AttributeRoot.merge(self, acquisition)
         self._merge_note_list(acquisition)
+
+#-------------------------------------------------------------------------
+#
+# AttributeView
+#
+#-------------------------------------------------------------------------
+AttributeView = view_class(Attribute, (
+    ("private", None),
+    ("note_list", tuple),
+    ("type", AttributeType.view),
+    ("value", None),
+    ))
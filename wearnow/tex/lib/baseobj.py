@@ -29,6 +29,9 @@ Base Object class for Gramps
 #-------------------------------------------------------------------------
 import re
 
+# class -> instance with the default values, see _struct_default
+_DEFAULTS = {}
+
 #-------------------------------------------------------------------------
 #
 # Base Object
@@ -42,6 +45,8 @@ class BaseObject(object):
     Its main goal is to provide common capabilites to all objects, such as 
     searching through all available information.
     """
+
+    __slots__ = ()
     
     def serialize(self):
         """
@@ -77,6 +82,18 @@ class BaseObject(object):
         """
         assert False, "Needs to be overridden in the derived class"
 
+    @classmethod
+    def _struct_default(cls):
+        """
+        Return an instance of the class with the default values, shared by
+        all calls of from_struct. It must not be modified.
+        """
+        try:
+            return _DEFAULTS[cls]
+        except KeyError:
+            default = _DEFAULTS[cls] = cls()
+            return default
+
     def from_struct(self, struct):
         """
         Given a struct data representation, return an object of this type.
@@ -106,26 +123,13 @@ class BaseObject(object):
                   child objects matches a given pattern.
         :rtype: bool
         """
-        # Run through its own items
-        patern_upper = pattern.upper()
-        for item in self.get_text_data_list():
-        # Some items are strings, which will fail in item.upper(), and some items are unicode.
-        # Convert all items to unicode and the item.upper().find(patern_upper) will work OK.
-            item = str(item)
-            if not item:
-                continue
-            if case_sensitive:
-                if item.find(pattern) != -1:
-                    return True
-            else:
-                if item.upper().find(patern_upper) != -1:
-                    return True
-
-        # Run through child objects
-        for obj in self.get_text_data_child_list():
-            if obj.matches_string(pattern, case_sensitive):
+        if not case_sensitive:
+            pattern = pattern.casefold()
+        for item in self.iter_text_data():
+            if not case_sensitive:
+                item = item.casefold()
+            if pattern in item:
                 return True
-
         return False
 
     def matches_regexp(self, pattern, case_sensitive=False):
@@ -139,22 +143,29 @@ class BaseObject(object):
                   child objects matches a given regexp.
         :rtype: bool
         """
-
-        # Run through its own items
         if case_sensitive:
-            pattern_obj = re.compile(pattern)
+            match = re.compile(pattern).match
         else:
-            pattern_obj = re.compile(pattern, re.IGNORECASE)
-        for item in self.get_text_data_list():
-            if item and pattern_obj.match(item):
+            match = re.compile(pattern, re.IGNORECASE).match
+        for item in self.iter_text_data():
+            if match(item):
                 return True
+        return False
 
-        # Run through child objects
-        for obj in self.get_text_data_child_list():
-            if obj.matches_regexp(pattern, case_sensitive):
-                return True
+    def iter_text_data(self):
+        """
+        Iterate over the text data of the object and of its child objects,
+        depth first. Items are converted to str, empty ones are skipped.
 
-        return False
+        :returns: Returns an iterator over the text data.
+        :rtype: iterator of str
+        """
+        for item in self.get_text_data_list():
+            item = str(item)
+            if item:
+                yield item
+        for obj in self.get_text_data_child_list():
+            yield from obj.iter_text_data()
 
     def get_text_data_list(self):
         """
@@ -0,0 +1,353 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Binary codec for the tuples returned by serialize().
+
+Every class with a serialized form declares its layout in a SCHEMA class
+attribute next to serialize(). A schema is built from:
+
+    STR         a str or None, stored length-prefixed in UTF-8
+    INT         an int, stored as a signed 64 bit number
+    BOOL        a bool, stored as one byte
+    VALUE       None, a bool, an int, a float or a str, stored with a tag
+    [schema]    a list of values of the schema, stored length-prefixed
+    (a, b, ..)  a tuple with one value per schema
+    Optional(schema)  None or a value of the schema
+
+Consecutive INT and BOOL fields of a tuple are packed with a single
+struct. A length takes one byte below 254, five bytes otherwise. Because
+the layout is known, no type information is written for the fields,
+which keeps the records smaller than a pickle.
+
+:func:`encode` and :func:`decode` work on the serialized data of a class::
+
+    data = encode(Textile, textile.serialize())
+    textile = Textile.create(decode(Textile, data))
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import struct
+
+#-------------------------------------------------------------------------
+#
+# Schema elements
+#
+#-------------------------------------------------------------------------
+STR = "str"
+INT = "int"
+BOOL = "bool"
+VALUE = "value"
+
+class Optional(object):
+    """
+    Schema of a value that may be None.
+    """
+
+    __slots__ = ('schema',)
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def __repr__(self):
+        return "Optional(%r)" % (self.schema,)
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+_FIXED = {INT: "q", BOOL: "?"}
+_LENGTH = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+# first byte of a length: a length below _LONG fits in the byte itself,
+# _LONG is followed by the length in four bytes, _NONE is a None string
+_LONG = 0xfe
+_NONE = 0xff
+# tags of a VALUE
+(_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_INT, _TAG_FLOAT, _TAG_STR) = range(6)
+
+#-------------------------------------------------------------------------
+#
+# Encoders and decoders
+#
+#-------------------------------------------------------------------------
+# An encoder appends the bytes of a value to a bytearray. A decoder reads a
+# value from a buffer at an offset and returns (value, new offset).
+
+def _encode_length(buf, size):
+    if size < _LONG:
+        buf.append(size)
+    else:
+        buf.append(_LONG)
+        buf += _LENGTH.pack(size)
+
+def _decode_length(buf, offset):
+    size = buf[offset]
+    if size == _LONG:
+        return (_LENGTH.unpack_from(buf, offset + 1)[0], offset + 5)
+    return (size, offset + 1)
+
+def _encode_str(buf, value):
+    if value is None:
+        buf.append(_NONE)
+    else:
+        value = value.encode("utf-8")
+        _encode_length(buf, len(value))
+        buf += value
+
+def _decode_str(buf, offset):
+    size = buf[offset]
+    if size == _NONE:
+        return (None, offset + 1)
+    elif size == _LONG:
+        size = _LENGTH.unpack_from(buf, offset + 1)[0]
+        offset += 5
+    else:
+        offset += 1
+    end = offset + size
+    if end > len(buf):
+        raise ValueError("string runs past the end of the data")
+    return (str(buf[offset:end], "utf-8"), end)
+
+def _encode_value(buf, value):
+    if value is None:
+        buf.append(_TAG_NONE)
+    elif value is True or value is False:
+        buf.append(_TAG_TRUE if value else _TAG_FALSE)
+    elif isinstance(value, int):
+        buf.append(_TAG_INT)
+        buf += _INT.pack(value)
+    elif isinstance(value, float):
+        buf.append(_TAG_FLOAT)
+        buf += _FLOAT.pack(value)
+    elif isinstance(value, str):
+        buf.append(_TAG_STR)
+        _encode_str(buf, value)
+    else:
+        raise ValueError("can not encode %r as a value" % (value,))
+
+def _decode_value(buf, offset):
+    tag = buf[offset]
+    offset += 1
+    if tag == _TAG_NONE:
+        return (None, offset)
+    elif tag == _TAG_FALSE:
+        return (False, offset)
+    elif tag == _TAG_TRUE:
+        return (True, offset)
+    elif tag == _TAG_INT:
+        return (_INT.unpack_from(buf, offset)[0], offset + 8)
+    elif tag == _TAG_FLOAT:
+        return (_FLOAT.unpack_from(buf, offset)[0], offset + 8)
+    elif tag == _TAG_STR:
+        return _decode_str(buf, offset)
+    raise ValueError("unknown value tag %d at offset %d" % (tag, offset - 1))
+
+def _fixed_codec(fmt):
+    """
+    Return the codec of a single fixed size field.
+    """
+    packer = struct.Struct("<" + fmt)
+    pack = packer.pack
+    unpack_from = packer.unpack_from
+    size = packer.size
+    def encode(buf, value):
+        buf += pack(value)
+    def decode(buf, offset):
+        return (unpack_from(buf, offset)[0], offset + size)
+    return (encode, decode)
+
+def _list_codec(schema):
+    """
+    Return the codec of a list of values of a schema.
+    """
+    (encode_item, decode_item) = compile_schema(schema)
+    def encode(buf, values):
+        _encode_length(buf, len(values))
+        for value in values:
+            encode_item(buf, value)
+    def decode(buf, offset):
+        (count, offset) = _decode_length(buf, offset)
+        values = []
+        append = values.append
+        for index in range(count):
+            (value, offset) = decode_item(buf, offset)
+            append(value)
+        return (values, offset)
+    return (encode, decode)
+
+def _optional_codec(schema):
+    """
+    Return the codec of a value of a schema or None.
+    """
+    (encode_item, decode_item) = compile_schema(schema)
+    def encode(buf, value):
+        if value is None:
+            buf.append(0)
+        else:
+            buf.append(1)
+            encode_item(buf, value)
+    def decode(buf, offset):
+        if buf[offset] == 0:
+            return (None, offset + 1)
+        return decode_item(buf, offset + 1)
+    return (encode, decode)
+
+def _tuple_codec(schema):
+    """
+    Return the codec of a tuple with one value per schema. Runs of fixed
+    size fields are packed with a single struct.
+    """
+    # steps of (first, last, struct, encoder, decoder); a step covers either
+    # the run of fixed fields first:last, or the single field first
+    steps = []
+    index = 0
+    while index < len(schema):
+        last = index
+        while last < len(schema) and _is_fixed(schema[last]):
+            last += 1
+        if last > index:
+            fmt = "<" + "".join(_FIXED[field] for field in schema[index:last])
+            steps.append((index, last, struct.Struct(fmt), None, None))
+            index = last
+        else:
+            (encode_field, decode_field) = compile_schema(schema[index])
+            steps.append((index, index + 1, None, encode_field, decode_field))
+            index += 1
+    steps = tuple(steps)
+    length = len(schema)
+
+    def encode(buf, values):
+        if len(values) != length:
+            raise ValueError("expected %d fields, got %d: %r" %
+                             (length, len(values), values))
+        for (first, last, packer, encode_field, decode_field) in steps:
+            if packer is None:
+                encode_field(buf, values[first])
+            else:
+                buf += packer.pack(*values[first:last])
+    def decode(buf, offset):
+        values = []
+        for (first, last, packer, encode_field, decode_field) in steps:
+            if packer is None:
+                (value, offset) = decode_field(buf, offset)
+                values.append(value)
+            else:
+                values.extend(packer.unpack_from(buf, offset))
+                offset += packer.size
+        return (tuple(values), offset)
+    return (encode, decode)
+
+def _is_fixed(schema):
+    return isinstance(schema, str) and schema in _FIXED
+
+#-------------------------------------------------------------------------
+#
+# Schemas
+#
+#-------------------------------------------------------------------------
+def compile_schema(schema):
+    """
+    Return an (encoder, decoder) pair for a schema.
+
+    The encoder appends the bytes of a value to a bytearray, the decoder
+    takes a buffer and an offset and returns the value and the offset of
+    the byte after it.
+    """
+    if isinstance(schema, str):
+        if schema == STR:
+            return (_encode_str, _decode_str)
+        elif schema == VALUE:
+            return (_encode_value, _decode_value)
+        elif schema in _FIXED:
+            return _fixed_codec(_FIXED[schema])
+    elif isinstance(schema, list) and len(schema) == 1:
+        return _list_codec(schema[0])
+    elif isinstance(schema, tuple):
+        return _tuple_codec(schema)
+    elif isinstance(schema, Optional):
+        return _optional_codec(schema.schema)
+    raise ValueError("invalid schema element %r" % (schema,))
+
+class BinaryCodec(object):
+    """
+    Encode and decode the values of a schema.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        (self.__encode, self.__decode) = compile_schema(schema)
+
+    def encode(self, data):
+        """
+        Return the bytes of a value.
+        """
+        buf = bytearray()
+        self.__encode(buf, data)
+        return bytes(buf)
+
+    def decode(self, data):
+        """
+        Return the value held in bytes created by :meth:`encode`.
+        """
+        try:
+            (value, offset) = self.__decode(data, 0)
+        except (struct.error, IndexError, UnicodeDecodeError) as msg:
+            raise ValueError("invalid encoded data: %s" % msg)
+        if offset != len(data):
+            raise ValueError("%d bytes of trailing data" %
+                             (len(data) - offset))
+        return value
+
+# class -> BinaryCodec
+_CODECS = {}
+
+def get_codec(cls):
+    """
+    Return the codec of the serialized data of a class, made from its
+    SCHEMA attribute.
+    """
+    try:
+        return _CODECS[cls]
+    except KeyError:
+        codec = _CODECS[cls] = BinaryCodec(cls.SCHEMA)
+        return codec
+
+def encode(cls, data):
+    """
+    Return the bytes of serialized data of a class.
+
+    :param cls: the class that serialized the data, eg Textile
+    :type cls: class with a SCHEMA attribute
+    :param data: the data as returned by serialize()
+    :type data: tuple
+    """
+    return get_codec(cls).encode(data)
+
+def decode(cls, data):
+    """
+    Return the serialized data of a class held in bytes created by
+    :func:`encode`, as unserialize() accepts it.
+    """
+    return get_codec(cls).decode(data)
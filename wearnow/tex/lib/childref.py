@@ -31,6 +31,8 @@ Child Reference class for WearNow.
 #-------------------------------------------------------------------------
 from .secondaryobj import SecondaryObject
 from .refbase import RefBase
+from .objview import view_class
+from .bincodec import STR
 from .const import IDENTICAL, EQUAL, DIFFERENT
 from .handle import Handle
 
@@ -48,9 +50,13 @@ class ChildRef(SecondaryObject, RefBase):
     Examples would be: godparent, friend, etc.
     """
 
+    __slots__ = ('ref',)
+
     def __init__(self, source=None):
         RefBase.__init__(self, source)
 
+    SCHEMA = (STR,)
+
     def serialize(self):
         """
         Convert the object to a serialized tuple of data.
@@ -88,7 +94,7 @@ class ChildRef(SecondaryObject, RefBase):
 
         :returns: Returns a serialized object
         """
-        default = ChildRef()
+        default = ChildRef._struct_default()
         return (RefBase.from_struct(struct.get("ref", default.ref)), )
 
     def unserialize(self, data):
@@ -99,6 +105,20 @@ class ChildRef(SecondaryObject, RefBase):
         RefBase.unserialize(self, ref)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create a ChildRef from the data of the serialize method.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only ChildRef over the data of the serialize method.
+        """
+        return ChildRefView(data)
+
     def get_text_data_list(self):
         """
         Return the list of all textual attributes of the object.
@@ -178,3 +198,12 @@ class ChildRef(SecondaryObject, RefBase):
         :type acquisition: ChildRef
         """
         pass
+
+#-------------------------------------------------------------------------
+#
+# ChildRefView
+#
+#-------------------------------------------------------------------------
+ChildRefView = view_class(ChildRef, (
+    ("ref", None),
+    ))
@@ -43,6 +43,9 @@ from .notebase import NoteBase
 from .mediabase import MediaBase
 from .tagbase import TagBase
 from .childref import ChildRef
+from .mediaref import MediaRef
+from .objview import view_class, view_tuple
+from .bincodec import BOOL, INT, STR
 from .const import IDENTICAL, EQUAL, DIFFERENT
 from .handle import Handle
 
@@ -69,6 +72,9 @@ class Ensemble(NoteBase, MediaBase, PrimaryObject):
     or the changes will be lost.
     """
 
+    __slots__ = ('handle', 'change', 'private', 'tag_list', 'wearnow_id',
+                 'note_list', 'media_list', 'child_ref_list', 'complete')
+
     def __init__(self):
         """
         Create a new Ensemble instance. 
@@ -82,6 +88,9 @@ class Ensemble(NoteBase, MediaBase, PrimaryObject):
         self.child_ref_list = []
         self.complete = 0
 
+    SCHEMA = (STR, STR, [ChildRef.SCHEMA], [MediaRef.SCHEMA], [STR], INT,
+              [STR], BOOL)
+
     def serialize(self):
         """
         Convert the data held in the event to a Python tuple that
@@ -143,7 +152,7 @@ class Ensemble(NoteBase, MediaBase, PrimaryObject):
 
         :returns: Returns a serialized object
         """
-        default = Ensemble()
+        default = Ensemble._struct_default()
         return (Handle.from_struct(struct.get("handle", default.handle)),
                 struct.get("wearnow_id", default.wearnow_id),
                 [ChildRef.from_struct(cr) for cr in struct.get("child_ref_list", default.child_ref_list)],
@@ -161,13 +170,31 @@ class Ensemble(NoteBase, MediaBase, PrimaryObject):
         (self.handle, self.wearnow_id, child_ref_list, media_list,
           note_list, self.change, tag_list, self.private) = data
 
-        self.child_ref_list = [ChildRef().unserialize(cr)
+        self.child_ref_list = [ChildRef.create(cr)
                                for cr in child_ref_list]
         MediaBase.unserialize(self, media_list)
         NoteBase.unserialize(self, note_list)
         TagBase.unserialize(self, tag_list)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create an Ensemble from the data of the serialize method, without
+        setting the defaults that unserialize replaces.
+        """
+        ensemble = cls.__new__(cls)
+        ensemble.complete = 0
+        return ensemble.unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only Ensemble over the data of the serialize method,
+        which decodes its attributes only when they are first used.
+        """
+        return EnsembleView(data)
+
     def _has_handle_reference(self, classname, handle):
         """
         Return True if the object has reference to a given handle of given 
@@ -394,3 +421,19 @@ class Ensemble(NoteBase, MediaBase, PrimaryObject):
                     break
             else:
                 self.child_ref_list.append(addendum)
+
+#-------------------------------------------------------------------------
+#
+# EnsembleView
+#
+#-------------------------------------------------------------------------
+EnsembleView = view_class(Ensemble, (
+    ("handle", None),
+    ("wearnow_id", None),
+    ("child_ref_list", view_tuple(ChildRef.view)),
+    ("media_list", view_tuple(MediaRef.view)),
+    ("note_list", tuple),
+    ("change", None),
+    ("tag_list", tuple),
+    ("private", None),
+    ), {"complete": 0})
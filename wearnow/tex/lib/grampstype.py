@@ -29,6 +29,8 @@ Base type for all gramps types.
 #
 #-------------------------------------------------------------------------
 from ..const import WEARNOW_LOCALE as glocale
+from .objview import view_class
+from .bincodec import INT, STR
 _ = glocale.translation.gettext
 
 _UNKNOWN = _('Unknown')
@@ -42,7 +44,8 @@ class GrampsTypeMeta(type):
     """
     Metaclass for :class:`~.grampstype.GrampsType`.
     
-    Create the class-specific integer/string maps.
+    Create the class-specific integer/string maps, and the map of the
+    shared instances.
     """
     def __init__(cls, name, bases, namespace):
 
@@ -67,6 +70,9 @@ class GrampsTypeMeta(type):
             cls._S2IMAP = init_map(cls._DATAMAP, 1, 0, cls._BLACKLIST)
             cls._I2EMAP = init_map(cls._DATAMAP, 0, 2, cls._BLACKLIST)
             cls._E2IMAP = init_map(cls._DATAMAP, 2, 0, cls._BLACKLIST)        
+
+        # value -> shared instance, see GrampsType.get_shared
+        cls._SHARED = {}
       
 
 # Python 2 and 3 metaclass children classes
@@ -100,6 +106,11 @@ class GrampsType(GrampsTypeC):
     
     :attribute value: (int) Returns or sets integer value
     :attribute string: (str) Returns or sets string value
+
+    Objects hold the shared instance of a standard value, as returned by
+    :meth:`get_shared` and :meth:`create`, so that loading many objects
+    does not make a type instance for each of them. A shared instance can
+    not be changed; the objects replace their type instead.
     """
     (POS_VALUE, POS_STRING) = list(range(2))
     
@@ -126,7 +137,97 @@ class GrampsType(GrampsTypeC):
         Create a new type, initialize the value from one of several possible 
         states.
         """
-        self.set(value)
+        self.__set(value)
+
+    @classmethod
+    def get_shared(cls, value=None):
+        """
+        Return the instance of a value that is shared by all objects having
+        it. The value is given as to :meth:`set`.
+
+        Only standard values have a shared instance, which can not be
+        changed. For a custom or unknown value, a new instance is returned.
+        """
+        if isinstance(value, int) and not isinstance(value, bool):
+            shared = cls._SHARED.get(value)
+            if shared is not None:
+                return shared
+        new = cls(value)
+        return cls.__share(new)
+
+    @classmethod
+    def from_xml_str(cls, value):
+        """
+        Return the instance of an untranslated string, as set by
+        :meth:`set_from_xml_str`; shared for a standard value.
+        """
+        new = cls()
+        new.set_from_xml_str(value)
+        return cls.__share(new)
+
+    @classmethod
+    def create(cls, data):
+        """
+        Return a type from the data of the serialize method. A standard
+        value gives its shared instance, see :meth:`get_shared`.
+        """
+        shared = cls._SHARED.get(data[0])
+        if shared is not None:
+            return shared
+        new = cls.__new__(cls)
+        new.__value, new.__string = data
+        if new.__value != cls._CUSTOM:
+            new.__string = ''
+        return cls.__share(new)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only type over the data of the serialize method. A
+        standard value gives its shared instance, which can not be changed
+        either.
+        """
+        if data[0] != cls._CUSTOM and data[0] in cls._I2SMAP:
+            return cls.create(data)
+        view = cls.__dict__.get('_VIEW')
+        if view is None:
+            view = cls._VIEW = view_class(cls, (
+                ("_GrampsType__value", None),
+                ("_GrampsType__string", None),
+                ))
+        return view(data)
+
+    @classmethod
+    def __share(cls, new):
+        """
+        Make a new instance the shared instance of its value, if it has a
+        standard value, and return the shared instance.
+        """
+        value = new.__value
+        if value == cls._CUSTOM or value not in cls._I2SMAP:
+            return new
+        return cls._SHARED.setdefault(value, new)
+
+    def is_shared(self):
+        """
+        Return True if this is the shared instance of its value, which can
+        not be changed.
+        """
+        return self._SHARED.get(self.__value) is self
+
+    def __check_changeable(self):
+        if self._SHARED.get(self.__value) is self:
+            raise AttributeError("the shared %s instance %r can not be "
+                                 "changed" % (self.__class__.__name__,
+                                              self.xml_str()))
+
+    def __copy__(self):
+        if self.is_shared():
+            return self
+        return self.__class__((self.__value, self.__string))
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
 
     def __set_tuple(self, value):
         "Set the value/string properties from a tuple."
@@ -159,7 +260,22 @@ class GrampsType(GrampsTypeC):
         else:
             self.__string = ''
 
+    def __change_int(self, value):
+        "Change the value/string properties to an integer."
+        self.__check_changeable()
+        self.__set_int(value)
+
+    def __change_str(self, value):
+        "Change the value/string properties to a string."
+        self.__check_changeable()
+        self.__set_str(value)
+
     def set(self, value):
+        "Set the value/string properties from the passed in value."
+        self.__check_changeable()
+        self.__set(value)
+
+    def __set(self, value):
         "Set the value/string properties from the passed in value."
         if isinstance(value, tuple):
             self.__set_tuple(value)
@@ -178,6 +294,7 @@ class GrampsType(GrampsTypeC):
         This method sets the type instance based on the untranslated string 
         (obtained e.g. from XML).
         """
+        self.__check_changeable()
         if value in self._E2IMAP:
             self.__value = self._E2IMAP[value]
             self.__string = ''
@@ -201,6 +318,9 @@ class GrampsType(GrampsTypeC):
         else:
             return _UNKNOWN
 
+    # layout of serialize(), see bincodec
+    SCHEMA = (INT, STR)
+
     def serialize(self):
         """Convert the object to a serialized tuple of data. """
         return (self.__value, self.__string)
@@ -236,14 +356,14 @@ class GrampsType(GrampsTypeC):
 
         :returns: Returns a serialized object
         """
-        default = cls()
         if struct.get("value", cls._CUSTOM) == cls._CUSTOM:
-            return (struct.get("value", default.value), struct.get("string", ""))
+            return (struct.get("value", cls._DEFAULT), struct.get("string", ""))
         else:
-            return (struct.get("value", default.value), '')
+            return (struct.get("value", cls._DEFAULT), '')
 
     def unserialize(self, data):
         """Convert a serialized tuple of data to an object."""
+        self.__check_changeable()
         self.__value, self.__string = data
         if self.__value != self._CUSTOM:
             self.__string = ''
@@ -335,5 +455,7 @@ class GrampsType(GrampsTypeC):
 ##            else:
 ##                return cmp(self.__value, value.value)
 
-    value = property(__int__, __set_int, None, "Returns or sets integer value")
-    string = property(__str__, __set_str, None, "Returns or sets string value")
+    value = property(__int__, __change_int, None,
+                     "Returns or sets integer value")
+    string = property(__str__, __change_str, None,
+                      "Returns or sets string value")
@@ -40,6 +40,8 @@ class MediaBase(object):
     """
     Base class for storing media references.
     """
+
+    __slots__ = ()
     
     def __init__(self, source=None):
         """
@@ -43,6 +43,8 @@ LOG = logging.getLogger(".citation")
 from .primaryobj import PrimaryObject
 from .tagbase import TagBase
 from .handle import Handle
+from .objview import view_class
+from .bincodec import BOOL, INT, STR
 
 #-------------------------------------------------------------------------
 #
@@ -54,6 +56,9 @@ class MediaObject(PrimaryObject):
     Container for information about an image file, including location,
     description and privacy.
     """
+
+    __slots__ = ('handle', 'change', 'private', 'tag_list', 'wearnow_id',
+                 'path', 'mime', 'desc', 'checksum', 'thumb')
     
     def __init__(self, source=None):
         """
@@ -80,6 +85,8 @@ class MediaObject(PrimaryObject):
             self.checksum = ""
             self.thumb = None
 
+    SCHEMA = (STR, STR, STR, STR, STR, STR, INT, [STR], BOOL)
+
     def serialize(self, no_text_date = False):
         """
         Convert the data held in the event to a Python tuple that
@@ -142,7 +149,7 @@ class MediaObject(PrimaryObject):
 
         :returns: Returns a serialized object
         """
-        default = MediaObject()
+        default = MediaObject._struct_default()
         return (Handle.from_struct(struct.get("handle", default.handle)),
                 struct.get("wearnow_id", default.wearnow_id),
                 struct.get("path", default.path),
@@ -167,6 +174,24 @@ class MediaObject(PrimaryObject):
         TagBase.unserialize(self, tag_list)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create a MediaObject from the data of the serialize method, without
+        setting the defaults that unserialize replaces.
+        """
+        media = cls.__new__(cls)
+        media.thumb = None
+        return media.unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only MediaObject over the data of the serialize method,
+        which decodes its attributes only when they are first used.
+        """
+        return MediaObjectView(data)
+
     def get_text_data_list(self):
         """
         Return the list of all textual attributes of the object.
@@ -275,3 +300,20 @@ class MediaObject(PrimaryObject):
     def get_checksum(self):
         """Return the checksum of the image."""
         return self.checksum
+
+#-------------------------------------------------------------------------
+#
+# MediaObjectView
+#
+#-------------------------------------------------------------------------
+MediaObjectView = view_class(MediaObject, (
+    ("handle", None),
+    ("wearnow_id", None),
+    ("path", None),
+    ("mime", None),
+    ("desc", None),
+    ("checksum", None),
+    ("change", None),
+    ("tag_list", tuple),
+    ("private", None),
+    ), {"thumb": None})
@@ -33,6 +33,8 @@ Media Reference class for WearNow.
 from .secondaryobj import SecondaryObject
 from .privacybase import PrivacyBase
 from .refbase import RefBase
+from .objview import view_class
+from .bincodec import BOOL, INT, STR, Optional
 from .const import IDENTICAL, EQUAL, DIFFERENT
 from .handle import Handle
 
@@ -52,6 +54,8 @@ class MediaRef(SecondaryObject, PrivacyBase, RefBase):
         else:
             self.rect = None
 
+    SCHEMA = (BOOL, STR, Optional((INT, INT, INT, INT)))
+
     def serialize(self):
         """
         Convert the object to a serialized tuple of data.
@@ -92,10 +96,20 @@ class MediaRef(SecondaryObject, PrivacyBase, RefBase):
 
         :returns: Returns a serialized object
         """
-        default = MediaRef()
+        default = MediaRef._struct_default()
         return (PrivacyBase.from_struct(struct.get("private", default.private)),
                 RefBase.from_struct(struct.get("ref", default.ref)),
-                struct.get("rect", default.rect))
+                cls.__rect(struct.get("rect", default.rect)))
+
+    @staticmethod
+    def __rect(rect):
+        """
+        Return the rectangle of a struct as a tuple; it is a list when the
+        struct was read from JSON.
+        """
+        if rect is None:
+            return None
+        return tuple(rect)
 
     def unserialize(self, data):
         """
@@ -106,6 +120,20 @@ class MediaRef(SecondaryObject, PrivacyBase, RefBase):
         RefBase.unserialize(self, ref)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create a MediaRef from the data of the serialize method.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only MediaRef over the data of the serialize method.
+        """
+        return MediaRefView(data)
+
     def get_text_data_child_list(self):
         """
         Return the list of child objects that may carry textual data.
@@ -184,3 +212,14 @@ class MediaRef(SecondaryObject, PrivacyBase, RefBase):
     def get_rectangle(self):
         """Return the subsection of an image."""
         return self.rect
+
+#-------------------------------------------------------------------------
+#
+# MediaRefView
+#
+#-------------------------------------------------------------------------
+MediaRefView = view_class(MediaRef, (
+    ("private", None),
+    ("ref", None),
+    ("rect", None),
+    ))
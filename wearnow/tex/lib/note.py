@@ -34,6 +34,8 @@ from .tagbase import TagBase
 from .notetype import NoteType
 from .styledtext import StyledText
 from .styledtexttagtype import StyledTextTagType
+from .objview import view_class
+from .bincodec import BOOL, INT, STR
 from .handle import Handle
 
 #-------------------------------------------------------------------------
@@ -66,6 +68,10 @@ class Note(BasicPrimaryObject):
                  they have to be updated in case the data structure or the
                  :meth:`serialize` method changes!
     """
+
+    __slots__ = ('handle', 'change', 'private', 'tag_list', 'wearnow_id',
+                 'text', 'format', 'type')
+
     (FLOWED, FORMATTED) = list(range(2))
     
     (POS_HANDLE,
@@ -82,7 +88,10 @@ class Note(BasicPrimaryObject):
         BasicPrimaryObject.__init__(self)
         self.text = StyledText(text)
         self.format = Note.FLOWED
-        self.type = NoteType()
+        self.type = NoteType.get_shared()
+
+    SCHEMA = (STR, STR, StyledText.SCHEMA, INT, NoteType.SCHEMA, INT, [STR],
+              BOOL)
 
     def serialize(self):
         """Convert the object to a serialized tuple of data.
@@ -132,7 +141,7 @@ class Note(BasicPrimaryObject):
 
         :returns: Returns a serialized object
         """
-        default = Note()
+        default = Note._struct_default()
         return (Handle.from_struct(struct.get("handle", default.handle)),
                 struct.get("wearnow_id", default.wearnow_id),
                 StyledText.from_struct(struct.get("text", {})),
@@ -153,11 +162,26 @@ class Note(BasicPrimaryObject):
 
         self.text = StyledText()
         self.text.unserialize(the_text)
-        self.type = NoteType()
-        self.type.unserialize(the_type)
+        self.type = NoteType.create(the_type)
         TagBase.unserialize(self, tag_list)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create a Note from the data of the serialize method, without
+        setting the defaults that unserialize replaces.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only Note over the data of the serialize method,
+        which decodes its attributes only when they are first used.
+        """
+        return NoteView(data)
+
     def get_text_data_list(self):
         """Return the list of all textual attributes of the object.
 
@@ -252,7 +276,7 @@ class Note(BasicPrimaryObject):
         :param the_type: descriptive type of the Note
         :type the_type: str
         """
-        self.type.set(the_type)
+        self.type = NoteType.get_shared(the_type)
 
     def get_type(self):
         """Get descriptive type of the Note.
@@ -284,3 +308,19 @@ class Note(BasicPrimaryObject):
                 else:
                     retval.append(("external", "www", "url", styledtext_tag.value))
         return retval
+
+#-------------------------------------------------------------------------
+#
+# NoteView
+#
+#-------------------------------------------------------------------------
+NoteView = view_class(Note, (
+    ("handle", None),
+    ("wearnow_id", None),
+    ("text", StyledText.view),
+    ("format", None),
+    ("type", NoteType.view),
+    ("change", None),
+    ("tag_list", tuple),
+    ("private", None),
+    ))
@@ -38,6 +38,9 @@ class NoteBase(object):
     Internally, this class maintains a list of Note handles,
     as a note_list attribute of the NoteBase object.
     """
+
+    __slots__ = ()
+
     def __init__(self, source=None):
         """
         Create a new NoteBase, copying from source if not None.
@@ -0,0 +1,125 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Read-only views of objects over their serialized data.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+from types import MemberDescriptorType
+
+#-------------------------------------------------------------------------
+#
+# ObjectView
+#
+#-------------------------------------------------------------------------
+class ObjectView(object):
+    """
+    Base class of the view classes made by :func:`view_class`.
+
+    A view holds the serialized data of an object. It is an instance of the
+    class of the object, so it can be read as one, but attributes are only
+    decoded when they are first read, and they can not be set. Lists are
+    decoded into tuples and the objects in them into views, so nothing read
+    from a view can be changed. A copy of a view is a normal object.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data):
+        self._data = data
+
+    def serialize(self):
+        return self._data
+
+    def __reduce__(self):
+        return (self._VIEWED.create, (self._data,))
+
+    def __copy__(self):
+        return self._VIEWED.create(self._data)
+
+    def __deepcopy__(self, memo):
+        return self._VIEWED.create(self._data)
+
+def view_tuple(view):
+    """
+    Return a decode function making the tuple of the views of the items of
+    a serialized list.
+    """
+    return lambda data: tuple([view(item) for item in data])
+
+def _raw_field(pos):
+    """
+    Return a property reading a serialized value as it is.
+    """
+    return property(lambda self: self._data[pos])
+
+def _decoded_field(slot, pos, decode):
+    """
+    Return a property decoding a serialized value on first use, and keeping
+    the result in slot.
+    """
+    def get(self):
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            value = decode(self._data[pos])
+            slot.__set__(self, value)
+            return value
+    return property(get)
+
+def view_class(cls, fields, extra=None):
+    """
+    Return the view class of cls.
+
+    :param cls: the class of the objects, which has a create class method
+                taking the serialized data
+    :type cls: type
+    :param fields: (attribute name, decode) pairs in the order of the
+                   serialized data. decode returns the attribute value for
+                   the serialized value; if None, that value is used as is.
+                   It must return a value that can not be changed.
+    :type fields: list
+    :param extra: values of attributes that are not serialized
+    :type extra: dict
+    """
+    # the view keeps the class name, which to_struct and others write out
+    namespace = {"_VIEWED": cls, "__qualname__": cls.__name__ + "View"}
+    unslotted = []
+    for (pos, (name, decode)) in enumerate(fields):
+        if decode is None:
+            namespace[name] = _raw_field(pos)
+        elif isinstance(getattr(cls, name, None), MemberDescriptorType):
+            namespace[name] = _decoded_field(getattr(cls, name), pos, decode)
+        else:
+            # cls keeps the attribute in the instance dict, so the view
+            # keeps the decoded value in a slot of its own
+            unslotted.append((name, pos, decode))
+    namespace["__slots__"] = ("_data",) + tuple(
+        "_view" + name for (name, pos, decode) in unslotted)
+    for (name, value) in (extra or {}).items():
+        namespace[name] = property(lambda self, value=value: value)
+    view = type(cls.__name__, (ObjectView, cls), namespace)
+    for (name, pos, decode) in unslotted:
+        setattr(view, name,
+                _decoded_field(getattr(view, "_view" + name), pos, decode))
+    return view
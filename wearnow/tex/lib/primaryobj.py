@@ -50,6 +50,8 @@ class BasicPrimaryObject(TableObject, PrivacyBase, TagBase):
     handle is used as the record number for the database, and the WearNow
     ID is the user visible version.
     """
+
+    __slots__ = ()
     
     def __init__(self, source=None):
         """
@@ -166,6 +168,8 @@ class PrimaryObject(BasicPrimaryObject):
     handle is used as the record number for the database, and the WearNow
     ID is the user visible version.
     """
+
+    __slots__ = ()
     
     def __init__(self, source=None):
         """
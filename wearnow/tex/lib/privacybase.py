@@ -33,6 +33,8 @@ class PrivacyBase(object):
     Base class for privacy-aware objects.
     """
 
+    __slots__ = ()
+
     def __init__(self, source=None):
         """
         Initialize a PrivacyBase. 
@@ -34,6 +34,8 @@ class RefBase(object):
     Any *Ref* classes should derive from this class.
     """
 
+    __slots__ = ()
+
     def __init__(self, source=None):
         if source:
             self.ref = source.ref
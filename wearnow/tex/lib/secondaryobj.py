@@ -39,6 +39,8 @@ class SecondaryObject(BaseObject):
     The SecondaryObject is the base class for all secondary objects in the
     database. 
     """
+
+    __slots__ = ()
     
     def is_equal(self, source):
         return self.serialize() == source.serialize()
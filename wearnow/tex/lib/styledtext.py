@@ -27,6 +27,8 @@
 #
 #-------------------------------------------------------------------------
 from .styledtexttag import StyledTextTag
+from .objview import view_class, view_tuple
+from .bincodec import STR
 
 #-------------------------------------------------------------------------
 #
@@ -267,7 +269,9 @@ class StyledText(object):
         return styledtext_list
 
     # other public methods
-    
+
+    SCHEMA = (STR, [StyledTextTag.SCHEMA])
+
     def serialize(self):
         """
         Convert the object to a serialized tuple of data.
@@ -339,6 +343,20 @@ class StyledText(object):
             stt.unserialize(tag)
             self._tags.append(stt)
         return self
+
+    @classmethod
+    def create(cls, data):
+        """
+        Create a StyledText from the data of the serialize method.
+        """
+        return cls().unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only StyledText over the data of the serialize method.
+        """
+        return StyledTextView(data)
     
     def get_tags(self):
         """
@@ -358,6 +376,16 @@ class StyledText(object):
     tags = property(get_tags)
     string = property(get_string)
 
+#-------------------------------------------------------------------------
+#
+# StyledTextView
+#
+#-------------------------------------------------------------------------
+StyledTextView = view_class(StyledText, (
+    ("_string", None),
+    ("_tags", view_tuple(StyledTextTag.view)),
+    ))
+
 if __name__ == '__main__':
     from .styledtexttagtype import StyledTextTagType
     T1 = StyledTextTag(StyledTextTagType(1), 'v1', [(0, 2), (2, 4), (4, 6)])
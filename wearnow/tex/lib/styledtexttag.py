@@ -27,6 +27,8 @@
 #
 #-------------------------------------------------------------------------
 from .styledtexttagtype import StyledTextTagType
+from .objview import view_class
+from .bincodec import INT, VALUE
 
 #-------------------------------------------------------------------------
 #
@@ -55,7 +57,7 @@ class StyledTextTag(object):
                   that ``name`` parameter can be int, str, unicode, tuple, 
                   or even another :py:class:`.StyledTextTagType` instance.
         """
-        self.name = StyledTextTagType(name)
+        self.name = StyledTextTagType.get_shared(name)
         self.value = value
         if ranges is None:
             self.ranges = []
@@ -63,6 +65,8 @@ class StyledTextTag(object):
             # Current use of StyledTextTag is such that a shallow copy suffices.
             self.ranges = ranges
 
+    SCHEMA = (StyledTextTagType.SCHEMA, VALUE, [(INT, INT)])
+
     def serialize(self):
         """Convert the object to a serialized tuple of data.
        
@@ -104,10 +108,9 @@ class StyledTextTag(object):
 
         :return: Returns a serialized object
         """
-        default = StyledTextTag()
         return (StyledTextTagType.from_struct(struct.get("name", {})),
-                struct.get("value", default.value),
-                struct.get("ranges", default.ranges))
+                struct.get("value", None),
+                [tuple(pair) for pair in struct.get("ranges", [])])
 
     def unserialize(self, data):
         """Convert a serialized tuple of data to an object.
@@ -118,6 +121,30 @@ class StyledTextTag(object):
         """
         (the_name, self.value, self.ranges) = data
         
-        self.name = StyledTextTagType()
-        self.name.unserialize(the_name)
+        self.name = StyledTextTagType.create(the_name)
         return self
+
+    @classmethod
+    def create(cls, data):
+        """
+        Create a StyledTextTag from the data of the serialize method.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only StyledTextTag over the data of the serialize method.
+        """
+        return StyledTextTagView(data)
+
+#-------------------------------------------------------------------------
+#
+# StyledTextTagView
+#
+#-------------------------------------------------------------------------
+StyledTextTagView = view_class(StyledTextTag, (
+    ("name", StyledTextTagType.view),
+    ("value", None),
+    ("ranges", lambda data: tuple([tuple(pair) for pair in data])),
+    ))
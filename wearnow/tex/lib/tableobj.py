@@ -59,6 +59,8 @@ class TableObject(BaseObject):
     
     It is the base class for the BasicPrimaryObject class and Tag class.    
     """
+
+    __slots__ = ()
     
     def __init__(self, source=None):
         """
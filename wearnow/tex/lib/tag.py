@@ -29,6 +29,7 @@ Tag object for Gramps.
 #
 #-------------------------------------------------------------------------
 from .tableobj import TableObject
+from .bincodec import INT, STR
 from .handle import Handle
 
 #-------------------------------------------------------------------------
@@ -61,6 +62,8 @@ class Tag(TableObject):
             self.__color = "#000000000000" # Black
             self.__priority = 0
 
+    SCHEMA = (STR, STR, STR, INT, INT)
+
     def serialize(self):
         """
         Convert the data held in the event to a Python tuple that
@@ -233,7 +236,7 @@ class Tag(TableObject):
 
         :returns: Returns a serialized object
         """
-        default = Tag()
+        default = Tag._struct_default()
         return (Handle.from_struct(struct.get("handle", default.handle)),
                 struct.get("name", default.name),
                 struct.get("color", default.color),
@@ -34,6 +34,8 @@ class TagBase(object):
     Base class for tag-aware objects.
     """
 
+    __slots__ = ()
+
     def __init__(self, source=None):
         """
         Initialize a TagBase. 
@@ -0,0 +1,144 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+from .. import (ChildRef, Ensemble, MediaObject, MediaRef, Note, NoteType,
+                StyledText, StyledTextTag, StyledTextTagType, Tag, Textile)
+from ..bincodec import (BinaryCodec, INT, STR, VALUE, Optional, decode,
+                        encode)
+from .create_benchmark import make_record
+
+def make_ensemble():
+    ensemble = Ensemble()
+    ensemble.set_handle("E0001handle")
+    ensemble.set_wearnow_id("E0001")
+    for handle in ("T1", "T2"):
+        ref = ChildRef()
+        ref.set_reference_handle(handle)
+        ensemble.add_child_ref(ref)
+    for rect in (None, (10, 20, 90, 80)):
+        ref = MediaRef()
+        ref.set_reference_handle("M1")
+        ref.set_rectangle(rect)
+        ref.set_privacy(True)
+        ensemble.add_media_reference(ref)
+    ensemble.add_note("N1")
+    ensemble.set_change_time(1400000000)
+    return ensemble
+
+def make_note():
+    tags = [StyledTextTag(StyledTextTagType.BOLD, None, [(0, 4)]),
+            StyledTextTag(StyledTextTagType.FONTCOLOR, "#ff0000",
+                          [(5, 9), (12, 14)]),
+            StyledTextTag(StyledTextTagType.FONTSIZE, 12, [(0, 14)])]
+    note = Note()
+    note.set_handle("N1")
+    note.set_wearnow_id("N0001")
+    note.set_styledtext(StyledText("Wash at 30°C, no dryer", tags))
+    note.set_type(NoteType("Care"))
+    note.set_format(Note.FORMATTED)
+    return note
+
+def make_media():
+    media = MediaObject()
+    media.set_handle("M1")
+    media.set_wearnow_id("O0001")
+    media.set_path("/photos/pullover.jpg")
+    media.set_mime_type("image/jpeg")
+    media.set_description("Front view")
+    media.set_checksum("d41d8cd98f00b204e9800998ecf8427e")
+    media.add_tag("TAG1")
+    return media
+
+def make_tag():
+    tag = Tag()
+    tag.set_handle("TAG1")
+    tag.set_name("Winter")
+    tag.set_priority(3)
+    return tag
+
+class BinaryCodecTest(unittest.TestCase):
+    """Test the binary codec of serialized data."""
+
+    def assertRoundTrip(self, obj):
+        cls = obj.__class__
+        data = obj.serialize()
+        encoded = encode(cls, data)
+        self.assertIsInstance(encoded, bytes)
+        decoded = decode(cls, encoded)
+        self.assertEqual(decoded, data)
+        self.assertEqual(cls().unserialize(decoded).serialize(), data)
+
+    def test_textile(self):
+        for index in (0, 1, 4711):
+            self.assertRoundTrip(Textile.create(make_record(index)))
+
+    def test_empty_textile(self):
+        """A new object has a handle and ID of None."""
+        self.assertRoundTrip(Textile())
+
+    def test_ensemble(self):
+        self.assertRoundTrip(make_ensemble())
+
+    def test_note(self):
+        self.assertRoundTrip(make_note())
+
+    def test_media(self):
+        self.assertRoundTrip(make_media())
+
+    def test_tag(self):
+        self.assertRoundTrip(make_tag())
+
+    def test_smaller_than_pickle(self):
+        import pickle
+        data = make_record(1)
+        self.assertLess(len(encode(Textile, data)),
+                        len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+
+    def test_values(self):
+        codec = BinaryCodec([VALUE])
+        values = [None, True, False, 0, -2**63, 2**63 - 1, 1.5, "",
+                  "été"]
+        self.assertEqual(codec.decode(codec.encode(values)), values)
+        self.assertRaises(ValueError, codec.encode, [object()])
+
+    def test_optional(self):
+        codec = BinaryCodec((Optional((INT, INT)), Optional(STR)))
+        for value in ((None, None), ((1, 2), "x"), ((3, 4), None)):
+            self.assertEqual(codec.decode(codec.encode(value)), value)
+
+    def test_invalid_data(self):
+        encoded = encode(Textile, make_record(1))
+        self.assertRaises(ValueError, decode, Textile, encoded[:-3])
+        self.assertRaises(ValueError, decode, Textile, encoded + b"\0")
+
+    def test_wrong_length(self):
+        data = make_record(1)
+        self.assertRaises(ValueError, encode, Textile, data[:-1])
+
+    def test_invalid_schema(self):
+        self.assertRaises(ValueError, BinaryCodec, ("float",))
+        self.assertRaises(ValueError, BinaryCodec, [STR, STR])
+
+def testSuite():
+    suite = unittest.makeSuite(BinaryCodecTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,92 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark of the binary codec against pickle and the XML writer.
+
+Run with::
+
+    python -m wearnow.tex.lib.test.codec_benchmark [count]
+
+It reports the time per record to encode and decode the serialized data
+of a Textile, and the size of the encoded record. The XML path writes
+the object the way the XML export does; it is left out if the export
+plugin can not be loaded.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import io
+import sys
+import pickle
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from .. import Textile
+from ..bincodec import get_codec
+from .create_benchmark import make_record, bench_time
+
+def xml_writer():
+    """
+    Return a function writing the XML of a serialized Textile, or None if
+    the XML export is not available.
+    """
+    try:
+        from ....plugins.lib.libxmlwriter import WearNowXmlWriter
+    except ImportError as msg:
+        print("XML writer not available: %s" % msg)
+        return None
+    writer = WearNowXmlWriter.__new__(WearNowXmlWriter)
+    def write(data):
+        writer.g = io.StringIO()
+        writer.write_textile(Textile.create(data))
+        return writer.g.getvalue().encode("utf-8")
+    return write
+
+def main(count=20000):
+    records = [make_record(index) for index in range(count)]
+    codec = get_codec(Textile)
+    protocol = pickle.HIGHEST_PROTOCOL
+    paths = [("bincodec", codec.encode, codec.decode),
+             ("pickle", lambda data: pickle.dumps(data, protocol),
+              pickle.loads)]
+    write = xml_writer()
+    if write is not None:
+        paths.append(("XML (write only)", write, None))
+
+    print("Serialized Textile records, %d records" % count)
+    print("%-20s %12s %12s %8s" % ("", "encode us", "decode us", "bytes"))
+    for (name, encode, decode) in paths:
+        encoded = [encode(data) for data in records]
+        size = sum(len(data) for data in encoded) / count
+        encode_time = bench_time(encode, records)
+        if decode is None:
+            decode_text = "-"
+        else:
+            decode_text = "%.2f" % bench_time(decode, encoded)
+        print("%-20s %12.2f %12s %8.0f" % (name, encode_time, decode_text,
+                                           size))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
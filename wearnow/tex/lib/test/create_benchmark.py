@@ -0,0 +1,111 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark of the creation of Textile objects from serialized data.
+
+Run with::
+
+    python -m wearnow.tex.lib.test.create_benchmark [count]
+
+It reports the time per object of Textile.create() and of the generic
+construction through __init__ followed by unserialize(), and the memory
+held by the created objects.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+import timeit
+import tracemalloc
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from .. import (Attribute, AttributeType, Textile, TextileType, Url,
+                UrlType)
+from ...utils.id import create_id
+
+def make_record(index):
+    """
+    Return the serialized data of a garment as the RFID scanner and the
+    editors create it: typed, with measured values, a note and a url.
+    """
+    textile = Textile()
+    textile.set_handle(create_id())
+    textile.set_wearnow_id("I%04d" % index)
+    textile.set_description("Wool pullover, size M, %d" % index)
+    textile.set_type(TextileType(TextileType.PULLOVER))
+    for (attr_type, value) in ((AttributeType.RFID_ID, "E2%010d" % index),
+                               (AttributeType.THERM_INS, "0.%02d" % (index % 100)),
+                               (AttributeType.MOIST_VAP_RESIST, "4.5"),
+                               ("Material", "wool")):
+        attr = Attribute()
+        attr.set_type(attr_type)
+        attr.set_value(value)
+        textile.add_attribute(attr)
+    url = Url()
+    url.set_path("http://example.com/garment/%d" % index)
+    url.set_type(UrlType(UrlType.WEB_HOME))
+    textile.add_url(url)
+    textile.add_note(create_id())
+    textile.add_tag(create_id())
+    return textile.serialize()
+
+def legacy_create(data):
+    """
+    Create a Textile the generic way: set all defaults, then replace them.
+    """
+    return Textile().unserialize(data)
+
+def bench_time(func, records, repeat=5):
+    """
+    Return the best time per object, in microseconds, of func on records.
+    """
+    timer = timeit.Timer(lambda: [func(data) for data in records])
+    return min(timer.repeat(repeat, 1)) / len(records) * 1e6
+
+def bench_memory(func, records):
+    """
+    Return the memory, in bytes per object, held by the objects func
+    creates from records.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [func(data) for data in records]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / len(records)
+
+def main(count=20000):
+    records = [make_record(index) for index in range(count)]
+    print("Textile objects from %d serialized records" % count)
+    print("%-30s %10s %12s" % ("", "us/object", "bytes/object"))
+    for (name, func) in (("Textile.create()", Textile.create),
+                         ("Textile().unserialize()", legacy_create)):
+        print("%-30s %10.2f %12.0f" % (name, bench_time(func, records),
+                                       bench_memory(func, records)))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,70 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import copy
+import unittest
+
+from .. import Attribute, AttributeType, Note, NoteType, Textile
+from .create_benchmark import make_record
+
+class SharedTypeTest(unittest.TestCase):
+    """Test the shared instances of standard type values."""
+
+    def test_shared(self):
+        first = NoteType.create((NoteType.GENERAL, ''))
+        self.assertIs(NoteType.get_shared(NoteType.GENERAL), first)
+        self.assertIs(NoteType.get_shared(first), first)
+        self.assertIs(NoteType.from_xml_str(first.xml_str()), first)
+        self.assertTrue(first.is_shared())
+        self.assertIsNot(NoteType(NoteType.GENERAL), first)
+
+    def test_custom(self):
+        custom = NoteType.create((NoteType.CUSTOM, 'Care'))
+        self.assertFalse(custom.is_shared())
+        self.assertIsNot(NoteType.get_shared('Care'), custom)
+        self.assertEqual(NoteType.get_shared('Care'), custom)
+
+    def test_immutable(self):
+        shared = AttributeType.get_shared(AttributeType.RFID_ID)
+        self.assertRaises(AttributeError, shared.set, AttributeType.CUSTOM)
+        self.assertRaises(AttributeError, setattr, shared, 'value', 1)
+        self.assertRaises(AttributeError, shared.unserialize, (1, ''))
+        self.assertEqual(shared, AttributeType.RFID_ID)
+        self.assertIs(copy.deepcopy(shared), shared)
+        changeable = copy.copy(AttributeType())
+        changeable.set(AttributeType.RFID_ID)
+        self.assertEqual(changeable, shared)
+
+    def test_objects(self):
+        notes = [Note.create(Note("text %d" % index).serialize())
+                 for index in range(3)]
+        self.assertIs(notes[0].type, notes[2].type)
+        notes[0].set_type(NoteType.CUSTOM)
+        self.assertEqual(notes[2].type, Note().type)
+        attr = Attribute()
+        attr.set_type("Material")
+        self.assertEqual(Attribute.create(attr.serialize()).type, "Material")
+        textiles = [Textile.create(make_record(index)) for index in (1, 2)]
+        self.assertIs(textiles[0].type, textiles[1].type)
+
+def testSuite():
+    suite = unittest.makeSuite(SharedTypeTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,115 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import copy
+import json
+import unittest
+
+from .. import Textile, Ensemble, Note
+from .create_benchmark import make_record
+from .bincodec_test import make_ensemble, make_media, make_note
+
+class StructTest(unittest.TestCase):
+    """Test to_struct() and from_struct() of the primary objects."""
+
+    def test_json_round_trip(self):
+        for obj in (Textile.create(make_record(1)), make_ensemble(),
+                    make_note(), make_media()):
+            struct = json.loads(json.dumps(obj.to_struct()))
+            self.assertEqual(obj.__class__.from_struct(struct),
+                             obj.serialize())
+
+    def test_struct_not_shared(self):
+        textile = Textile.create(make_record(1))
+        first = textile.to_struct()
+        self.assertEqual(textile.to_struct(), first)
+        self.assertIsNot(textile.to_struct()["attribute_list"],
+                         first["attribute_list"])
+
+    def test_struct_aliasing(self):
+        for obj in (Textile.create(make_record(1)), make_ensemble(),
+                    make_note()):
+            first = obj.to_struct()
+            expected = obj.__class__.from_struct(first)
+            # change the nested values of the struct returned before
+            for value in first.values():
+                if isinstance(value, list):
+                    if value and isinstance(value[0], dict):
+                        value[0].clear()
+                    value.append("changed")
+                elif isinstance(value, dict):
+                    value.clear()
+            self.assertEqual(obj.__class__.from_struct(obj.to_struct()),
+                             expected)
+
+    def test_struct_follows_changes(self):
+        textile = Textile.create(make_record(1))
+        textile.to_struct()
+        textile.set_description("changed")
+        self.assertEqual(textile.to_struct()["description"], "changed")
+        # a change to a secondary object
+        textile.get_attribute_list()[0].set_value("changed")
+        self.assertEqual(textile.to_struct()["attribute_list"][0]["value"],
+                         "changed")
+
+    def test_view(self):
+        data = make_record(1)
+        self.assertEqual(Textile.view(data).to_struct(),
+                         Textile.create(data).to_struct())
+
+    def test_view_read_only(self):
+        data = make_record(1)
+        view = Textile.view(data)
+        attribute = view.get_attribute_list()[3]
+        self.assertRaises(AttributeError, view.set_description, "changed")
+        self.assertRaises(AttributeError, view.add_tag, "TAG")
+        self.assertRaises(AttributeError, attribute.set_value, "changed")
+        self.assertRaises(AttributeError, attribute.get_type().set, "Fibre")
+        self.assertRaises(AttributeError, view.get_url_list()[0].set_path,
+                          "changed")
+        self.assertRaises(AttributeError, view.add_note, "N2")
+        ensemble = Ensemble.view(make_ensemble().serialize())
+        self.assertRaises(AttributeError,
+                          ensemble.get_child_ref_list()[0].set_reference_handle,
+                          "T3")
+        self.assertRaises(AttributeError,
+                          ensemble.get_media_list()[1].set_rectangle, None)
+        note = Note.view(make_note().serialize())
+        tag = note.get_styledtext().get_tags()[1]
+        self.assertRaises(AttributeError, setattr, tag, "value", "#000000")
+        self.assertEqual(tag.ranges, ((5, 9), (12, 14)))
+        self.assertRaises(AttributeError, note.get_type().set, "Label")
+        self.assertEqual(view.serialize(), data)
+        self.assertEqual(Textile.view(data).to_struct(),
+                         Textile.create(data).to_struct())
+
+    def test_view_copy(self):
+        data = make_record(1)
+        view = Textile.view(data)
+        for textile in (copy.copy(view), copy.deepcopy(view)):
+            self.assertIs(textile.__class__, Textile)
+            textile.get_attribute_list()[3].set_value("cotton")
+            textile.add_tag("TAG")
+        self.assertEqual(view.serialize(), data)
+
+def testSuite():
+    suite = unittest.makeSuite(StructTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -38,7 +38,11 @@ from .urlbase import UrlBase
 from .tagbase import TagBase
 from .attrtype import AttributeType
 from .attribute import Attribute
+from .mediaref import MediaRef
+from .url import Url
 from .textiletype import TextileType
+from .objview import view_class, view_tuple
+from .bincodec import BOOL, INT, STR
 from .const import IDENTICAL, EQUAL, DIFFERENT
 from ..const import WEARNOW_LOCALE as glocale
 _ = glocale.translation.gettext
@@ -66,6 +70,10 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
     or the changes will be lost.
 
     """
+
+    __slots__ = ('handle', 'change', 'private', 'tag_list', 'wearnow_id',
+                 'note_list', 'media_list', 'attribute_list', 'urls',
+                 'description', 'type')
     
     def __init__(self, data=None):
         """
@@ -80,7 +88,7 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
         AttributeBase.__init__(self)
         UrlBase.__init__(self)
         self.description = ""
-        self.type = TextileType()
+        self.type = TextileType.get_shared()
         if data:
             self.unserialize(data)
 
@@ -89,7 +97,10 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
 
     def __ne__(self, other):
         return not self == other
-        
+
+    SCHEMA = (STR, STR, STR, [MediaRef.SCHEMA], [Attribute.SCHEMA],
+              [Url.SCHEMA], [STR], INT, [STR], BOOL, TextileType.SCHEMA)
+
     def serialize(self):
         """
         Convert the data held in the Textile to a Python tuple that
@@ -164,7 +175,7 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
 
         :returns: Returns a serialized object
         """
-        default = Textile()
+        default = Textile._struct_default()
         return (
             Handle.from_struct(struct.get("handle", default.handle)),
             struct.get("wearnow_id", default.wearnow_id),
@@ -206,9 +217,26 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
         UrlBase.unserialize(self, urls)
         NoteBase.unserialize(self, note_list)
         TagBase.unserialize(self, tag_list)
-        self.type = TextileType()
-        self.type.unserialize(the_type)
+        self.type = TextileType.create(the_type)
         return self
+
+    @classmethod
+    def create(cls, data):
+        """
+        Create a Textile from the data of the serialize method.
+
+        unserialize sets all attributes, so the defaults set by __init__
+        are skipped.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only Textile over the data of the serialize method,
+        which decodes its attributes only when they are first used.
+        """
+        return TextileView(data)
             
     def set_type(self, the_type):
         """Set descriptive type of the Note.
@@ -216,7 +244,7 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
         :param the_type: descriptive type of the Note
         :type the_type: str
         """
-        self.type.set(the_type)
+        self.type = TextileType.get_shared(the_type)
 
     def get_type(self):
         """Get descriptive type of the Note.
@@ -269,10 +297,7 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
         :returns: Returns the list of child objects that may carry textual data.
         :rtype: list
         """
-        return ([self.media_list +
-                 self.attribute_list +
-                 self.urls]
-                ) 
+        return self.media_list + self.attribute_list + self.urls
 
     def get_note_child_list(self):
         """
@@ -330,3 +355,22 @@ class Textile(NoteBase, AttributeBase, MediaBase, UrlBase, PrimaryObject):
         self._merge_url_list(acquisition)
         self._merge_note_list(acquisition)
         self._merge_tag_list(acquisition)
+
+#-------------------------------------------------------------------------
+#
+# TextileView
+#
+#-------------------------------------------------------------------------
+TextileView = view_class(Textile, (
+    ("handle", None),
+    ("wearnow_id", None),
+    ("description", None),
+    ("media_list", view_tuple(MediaRef.view)),
+    ("attribute_list", view_tuple(Attribute.view)),
+    ("urls", view_tuple(Url.view)),
+    ("note_list", tuple),
+    ("change", None),
+    ("tag_list", tuple),
+    ("private", None),
+    ("type", TextileType.view),
+    ))
@@ -39,6 +39,8 @@ from urllib.parse import urlparse
 from .secondaryobj import SecondaryObject
 from .privacybase import PrivacyBase
 from .urltype import UrlType
+from .objview import view_class
+from .bincodec import BOOL, STR
 from .const import IDENTICAL, EQUAL, DIFFERENT
 
 #-------------------------------------------------------------------------
@@ -52,17 +54,21 @@ class Url(SecondaryObject, PrivacyBase):
     allowing WearNow to store information about internet resources.
     """
 
+    __slots__ = ('private', 'path', 'desc', 'type')
+
     def __init__(self, source=None):
         """Create a new URL instance, copying from the source if present."""
         PrivacyBase.__init__(self, source)
         if source:
             self.path = source.path
             self.desc = source.desc
-            self.type = UrlType(source.type)
+            self.type = UrlType.get_shared(source.type)
         else:
             self.path = ""
             self.desc = ""
-            self.type = UrlType()
+            self.type = UrlType.get_shared()
+
+    SCHEMA = (BOOL, STR, STR, UrlType.SCHEMA)
 
     def serialize(self):
         return (self.private, self.path, self.desc, self.type.serialize())
@@ -100,7 +106,7 @@ class Url(SecondaryObject, PrivacyBase):
 
         :returns: Returns a serialized object
         """
-        default = Url()
+        default = Url._struct_default()
         return (struct.get("private", default.private), 
                 struct.get("path", default.path), 
                 struct.get("desc", default.desc), 
@@ -108,9 +114,24 @@ class Url(SecondaryObject, PrivacyBase):
         
     def unserialize(self, data):
         (self.private, self.path, self.desc, type_value) = data
-        self.type.unserialize(type_value)
+        self.type = UrlType.create(type_value)
         return self
 
+    @classmethod
+    def create(cls, data):
+        """
+        Create a Url from the data of the serialize method, without
+        setting the defaults that unserialize replaces.
+        """
+        return cls.__new__(cls).unserialize(data)
+
+    @classmethod
+    def view(cls, data):
+        """
+        Return a read-only Url over the data of the serialize method.
+        """
+        return UrlView(data)
+
     def get_text_data_list(self):
         """
         Return the list of all textual attributes of the object.
@@ -170,7 +191,7 @@ class Url(SecondaryObject, PrivacyBase):
         :param the_type: descriptive type of the Url
         :type the_type: str
         """
-        self.type.set(the_type)
+        self.type = UrlType.get_shared(the_type)
 
     def get_type(self):
         """
@@ -214,3 +235,15 @@ class Url(SecondaryObject, PrivacyBase):
             return "http://" + self.path
         else:
             return self.path
+
+#-------------------------------------------------------------------------
+#
+# UrlView
+#
+#-------------------------------------------------------------------------
+UrlView = view_class(Url, (
+    ("private", None),
+    ("path", None),
+    ("desc", None),
+    ("type", UrlType.view),
+    ))
@@ -40,6 +40,8 @@ class UrlBase(object):
     Base class for url-aware objects.
     """
 
+    __slots__ = ()
+
     def __init__(self, source=None):
         """
         Initialize an UrlBase. 
@@ -93,7 +95,7 @@ class UrlBase(object):
         """
         Convert a serialized tuple of data to an object.
         """
-        self.urls = [Url().unserialize(item) for item in data]
+        self.urls = [Url.create(item) for item in data]
 
     def get_url_list(self):
         """
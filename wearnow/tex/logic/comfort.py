@@ -8,7 +8,7 @@
 # the Free Software Foundation; either version 2 of the License, or
 # (at your option) any later version.
 #
-# This program is distributed in the hope that it will be useful, 
+# This program is distributed in the hope that it will be useful,
 # but WITHOUT ANY WARRANTY; without even the implied warranty of
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
@@ -18,44 +18,360 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
-from __future__ import print_function
-""" 
-   Logic to determine comfort related values
 """
+Logic to determine comfort related values: the comfort of an ensemble,
+and the ensembles of a wardrobe that are most comfortable for a climate
+and an activity.
 
-def compute_comfort(db, ensemble_handle):
-    insulation = []
-    en = db.get_ensemble_from_handle(ensemble_handle)
-    for childref in en.get_child_ref_list():
-        gar = db.get_textile_from_handle(childref.ref)
-        insulation += [3.]
-        
-    __compute_ensemble_comfort(insulation)
-    
-def __compute_ensemble_comfort(insulation, user, activity, climate):
-    """ We compute from list of insulation, ... what comfort will be
-    """
-    #TODO
-    result = 0.
-    result = user['Weight'] * climate['T'] / insulation[0]
-    return result
-    
-if __name__ == "__main__": 
-    #test to determine if our comfort function works
-    user = {
-        'name'      : "Ahmed Mahmood",
-        'Weight'    : 68,               # kg
-        }
-    climate = {
-        'T'         : 21,   # degrees Celcius
-        'v_air'     : 6,    # m/s
-        }
-    activity = {
-        'type'      : 'SPORT'
-        }
-    #ensemble data: [trouser, pullover]
-    insulation = [1.3, 2.3]  # unit ???
-    #compute
-    result = __compute_ensemble_comfort(insulation, user, activity, climate)
-    #finished
-    print ('The resulting comfort is', result)
+An ensemble is put together from garments by slot: a slot is filled by
+one garment of some textile types, see SLOTS, and LAYOUTS gives the slots
+an ensemble is made of. The comfort of an ensemble follows from the sum
+of the insulation of its garments, as in :func:`.pmv.calc_comfort`.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import heapq
+from bisect import bisect_left
+from operator import itemgetter
+
+#-------------------------------------------------------------------------
+#
+# WearNow modules
+#
+#-------------------------------------------------------------------------
+from ..lib.textiletype import TextileType
+from ..lib.attrtype import AttributeType
+from . import pmv
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# slot -> textile types of the garments that can fill it
+SLOTS = {
+    "top": (TextileType.TSHIRT_SHORTSLEEVE, TextileType.TSHIRT_LONGSLEEVE),
+    "pullover": (TextileType.PULLOVER,),
+    "bottom": (TextileType.TROUSERS, TextileType.TROUSERS_SHORT),
+    "dress": (TextileType.DRESS,),
+    }
+
+# ways to dress: (slots that must be filled, slots that may be filled)
+LAYOUTS = (
+    (("top", "bottom"), ("pullover",)),
+    (("dress",), ("pullover",)),
+    )
+
+# precision of the insulation bounds found by bisection
+_TOLERANCE = 1e-7
+# the bounds of the search are narrowed when the worst PMV of the best
+# ensembles found drops below this fraction of the limit they were made for
+_NARROW = 0.8
+
+#-------------------------------------------------------------------------
+#
+# Garment
+#
+#-------------------------------------------------------------------------
+class Garment(object):
+    """
+    What the ranking needs to know of a textile.
+    """
+
+    __slots__ = ("handle", "type", "insulation")
+
+    def __init__(self, handle, type_, insulation):
+        self.handle = handle
+        self.type = type_
+        self.insulation = insulation
+
+def get_wardrobe(db, handles=None):
+    """
+    Return the garments of the textiles of the database, or of the given
+    textile handles.
+
+    The insulation is the last THERM_INS attribute of a textile. Textiles
+    without one can not be ranked and are left out.
+    """
+    if handles is None:
+        handles = db.get_textile_handles()
+    garments = []
+    for handle in handles:
+        values = db.get_textile_attribute_values(handle,
+                                                 AttributeType.THERM_INS)
+        if not values:
+            continue
+        try:
+            insulation = float(values[-1])
+        except ValueError:
+            continue
+        textile = db.get_textile_from_handle(handle, view=True)
+        garments.append(Garment(textile.get_handle(),
+                                int(textile.get_type()), insulation))
+    return garments
+
+#-------------------------------------------------------------------------
+#
+# ComfortModel
+#
+#-------------------------------------------------------------------------
+class ComfortModel(object):
+    """
+    The comfort of a total clothing insulation, for one climate and one
+    activity.
+    """
+
+    def __init__(self, ta, RH, M, va=0.1):
+        """
+        :param ta: air temperature in degrees C
+        :param RH: relative humidity in %
+        :param M: metabolic rate in W/m2
+        :param va: relative air velocity in m/s
+        """
+        self.ta = ta
+        self.M = M
+        self.va = va
+        self.pa = pmv.partial_pressure(ta, RH)
+        # insulation -> (pmv, hc)
+        self.__cache = {}
+
+    def __solve(self, Icl):
+        try:
+            return self.__cache[Icl]
+        except KeyError:
+            result = self.__cache[Icl] = self.__compute(Icl)
+            return result
+
+    def __compute(self, Icl):
+        fcl = pmv.calc_fcl(Icl)
+        tcl = pmv.calc_tcl(self.ta, Icl, fcl, self.M, self.va)
+        hc = pmv.calc_hc(self.va, tcl, self.ta)
+        return (pmv.calc_pmv(self.M, self.pa, fcl, tcl, self.ta, hc, Icl),
+                hc)
+
+    def pmv(self, Icl):
+        """
+        Return the predicted mean vote for the insulation Icl.
+        """
+        return self.__solve(Icl)[0]
+
+    def comfort(self, Icl):
+        """
+        Return the predicted mean vote, the predicted percentage of
+        dissatisfied and the skin wettedness for the insulation Icl.
+        """
+        (value, hc) = self.__solve(Icl)
+        return (value, pmv.calc_ppd(value),
+                pmv.calc_wetability(pmv.calc_Re(hc, Icl), self.M, self.pa))
+
+    def insulation_bounds(self, limit, low, high):
+        """
+        Return the part (low, high) of the insulations from low to high for
+        which the PMV is between -limit and limit.
+
+        The PMV rises with the insulation, so the bounds are found by
+        bisection.
+        """
+        if self.pmv(low) < -limit:
+            low = self.__bisect(-limit, low, high)
+        if self.pmv(high) > limit:
+            high = self.__bisect(limit, low, high)
+        return (low - _TOLERANCE, high + _TOLERANCE)
+
+    def __bisect(self, value, low, high):
+        # the insulation between low and high with the PMV value
+        while high - low > _TOLERANCE:
+            middle = (low + high) / 2
+            if self.__compute(middle)[0] < value:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+#-------------------------------------------------------------------------
+#
+# Ranking
+#
+#-------------------------------------------------------------------------
+class RankedEnsemble(object):
+    """
+    An ensemble found by :func:`rank_ensembles`, with its comfort.
+    """
+
+    __slots__ = ("handles", "insulation", "pmv", "ppd", "wettedness")
+
+    def __init__(self, handles, insulation, comfort):
+        self.handles = handles
+        self.insulation = insulation
+        (self.pmv, self.ppd, self.wettedness) = comfort
+
+class _Search(object):
+    """
+    Branch and bound search of the ensembles with the PMV closest to 0.
+
+    The slots are filled one by one. The garments of a slot are tried
+    starting from the one that brings the total insulation closest to the
+    target, the insulation with a PMV of 0, so good ensembles are found
+    early. Once count ensembles are found, the worst of them gives bounds
+    on the total insulation of a better ensemble. A garment is only tried
+    if the slots still to fill can bring the total within these bounds,
+    so most combinations are never looked at.
+    """
+
+    def __init__(self, model, count, low, high):
+        self.model = model
+        self.count = count
+        self.target = sum(model.insulation_bounds(0., low, high)) / 2
+        # the insulation range of the ensembles still worth looking at,
+        # and the PMV limit it was computed for
+        self.bounds = (low, high)
+        self.limit = float("inf")
+        # (-|pmv|, handles, insulation); the worst ensemble first
+        self.best = []
+
+    def search(self, slots):
+        """
+        Look at the ensembles with one garment of every slot, a slot being
+        a list of (insulation, handle) sorted by insulation.
+        """
+        # insulation the slots from a given one on add at least and at most
+        lows = [0.]
+        highs = [0.]
+        for options in reversed(slots):
+            lows.insert(0, lows[0] + options[0][0])
+            highs.insert(0, highs[0] + options[-1][0])
+        keys = [[option[0] for option in options] for options in slots]
+        self.__search(slots, keys, lows, highs, 0, 0., ())
+
+    def __search(self, slots, keys, lows, highs, depth, total, handles):
+        if depth == len(slots):
+            self.__add(total, handles)
+            return
+        (rest_low, rest_high) = (lows[depth + 1], highs[depth + 1])
+        pivot = bisect_left(keys[depth], self.target - total
+                            - (rest_low + rest_high) / 2)
+        for index in self.__order(keys[depth], pivot, total, rest_low,
+                                  rest_high):
+            (insulation, handle) = slots[depth][index]
+            if handle is not None:
+                next_handles = handles + (handle,)
+            else:
+                next_handles = handles
+            self.__search(slots, keys, lows, highs, depth + 1,
+                          total + insulation, next_handles)
+
+    def __order(self, keys, pivot, total, rest_low, rest_high):
+        """
+        Yield the indexes of the options of a slot from pivot outwards, up
+        and down in turn, leaving out those that can not make an ensemble
+        within the bounds. The bounds narrow while searching.
+        """
+        (up, down) = (pivot, pivot - 1)
+        size = len(keys)
+        while up < size or down >= 0:
+            if up < size:
+                if total + keys[up] + rest_low > self.bounds[1]:
+                    up = size
+                elif total + keys[up] + rest_high < self.bounds[0]:
+                    up += 1
+                else:
+                    yield up
+                    up += 1
+            if down >= 0:
+                if total + keys[down] + rest_high < self.bounds[0]:
+                    down = -1
+                elif total + keys[down] + rest_low > self.bounds[1]:
+                    down -= 1
+                else:
+                    yield down
+                    down -= 1
+
+    def __add(self, total, handles):
+        score = abs(self.model.pmv(total))
+        item = (-score, handles, total)
+        if len(self.best) < self.count:
+            heapq.heappush(self.best, item)
+        elif item > self.best[0]:
+            heapq.heapreplace(self.best, item)
+        else:
+            return
+        worst = -self.best[0][0]
+        # narrowing the bounds takes a bisection, so it is only done when
+        # it gains something; wider bounds only cost more ensembles
+        if len(self.best) == self.count and worst < self.limit * _NARROW:
+            self.limit = worst
+            self.bounds = self.model.insulation_bounds(worst, *self.bounds)
+
+def rank_ensembles(garments, model, count=5, slots=SLOTS, layouts=LAYOUTS):
+    """
+    Return the count ensembles of the garments with the PMV closest to 0,
+    the most comfortable first.
+
+    :param garments: the garments to choose from, see :func:`get_wardrobe`
+    :type garments: list of :class:`Garment`
+    :param model: the climate and activity
+    :type model: :class:`ComfortModel`
+    :param count: the number of ensembles to return
+    :type count: int
+    :param slots: slot -> textile types that can fill it
+    :type slots: dict
+    :param layouts: (required slots, optional slots) pairs, the ways to
+                    put an ensemble together
+    :type layouts: sequence
+    :rtype: list of :class:`RankedEnsemble`
+    """
+    if count <= 0:
+        return []
+    by_type = {}
+    for garment in garments:
+        by_type.setdefault(garment.type, []).append(
+            (garment.insulation, garment.handle))
+    by_slot = {}
+    for (slot, types) in slots.items():
+        by_slot[slot] = sorted(option for type_ in types
+                               for option in by_type.get(type_, []))
+    searches = []
+    for (required, optional) in layouts:
+        if not all(by_slot.get(slot) for slot in required):
+            continue
+        # an optional slot may stay empty
+        searches.append([by_slot[slot] for slot in required] +
+                        [sorted([(0., None)] + by_slot.get(slot, []),
+                                key=itemgetter(0))
+                         for slot in optional])
+    if not searches:
+        return []
+    low = min(sum(options[0][0] for options in slots_)
+              for slots_ in searches)
+    high = max(sum(options[-1][0] for options in slots_)
+               for slots_ in searches)
+    search = _Search(model, count, low, high)
+    for slots_ in searches:
+        search.search(slots_)
+    ranked = sorted((-score, total, handles)
+                    for (score, handles, total) in search.best)
+    return [RankedEnsemble(handles, total, model.comfort(total))
+            for (score, total, handles) in ranked]
+
+def compute_comfort(db, ensemble_handle, model):
+    """
+    Return the PMV, PPD and skin wettedness of an ensemble of the
+    database; garments without a valid insulation count as 0, as in
+    :func:`get_wardrobe`.
+    """
+    insulation = 0.
+    ensemble = db.get_ensemble_from_handle(ensemble_handle, view=True)
+    for childref in ensemble.get_child_ref_list():
+        values = db.get_textile_attribute_values(childref.ref,
+                                                 AttributeType.THERM_INS)
+        if not values:
+            continue
+        try:
+            insulation += float(values[-1])
+        except ValueError:
+            continue
+    return model.comfort(insulation)
@@ -81,7 +81,6 @@ def sat_pressure (ta):
 
 def partial_pressure(ta, RH=(50)):
     pa=10*RH*sat_pressure(ta)
-    print (pa)
     return pa
     
 #print ('test par pres 25=',partial_pressure(25))
@@ -89,7 +88,6 @@ def partial_pressure(ta, RH=(50)):
 
 
 def calc_pmv (M,pa,fcl,tcl,ta,hc,Icl):
-    print ('input pmv:', M,pa,fcl,tcl,ta,hc,Icl)
     hl2 = 0.42* (M-58.15)
     if M < 58.15:
         hl2 = 0
@@ -172,8 +170,11 @@ def calc_tcl_previous(ta,Icl):
     
 #print ('start tcl', calc_tcl_previous(ta,Icl))
     
-def calc_tcl(ta,Icl,fcl,M):
-    
+def calc_tcl(ta,Icl,fcl,M,vr=0.1):
+    """
+    Iterate the clothing temperature, see pmvarray.calc_tcl for many
+    values at once. vr is the relative air velocity in m/s.
+    """
     # hc for forced convection
     def calc_hcf (vr=0.1): 
         hcf=12.1*math.sqrt(vr)
@@ -196,8 +197,8 @@ def calc_tcl(ta,Icl,fcl,M):
         XF=(XF+XN)/2
         HCN=2.38*abs(100*XF-kelvin(ta))**0.25
       
-        if calc_hcf(vr=0.1)>HCN:
-            HC=calc_hcf(vr=0.1)
+        if calc_hcf(vr)>HCN:
+            HC=calc_hcf(vr)
         else:
             HC=HCN
         
@@ -212,8 +213,7 @@ def calc_tcl(ta,Icl,fcl,M):
         if it > 150:
             #too long to converge
             cond = False
-        print ('calc', it, tcl,XN, XF, conv)
-        
+
     return tcl
        
         
@@ -253,6 +253,10 @@ def calc_comfort(appdata):
 
 #Wetting comfort as an additional criterion
 
+def calc_ppd(pmv):
+    # predicted percentage of dissatisfied
+    return 100-95*math.exp(-0.03353*pmv**4-0.2179*pmv**2)
+
 def calc_wetability (Re,M,pa): #Re value here is for the vapor resistance of ensemble
     
     w=(0.42*(M-58)*Re/(5770-7.2*M-pa))+0.06
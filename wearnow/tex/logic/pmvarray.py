@@ -0,0 +1,194 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+PMV, PPD and skin wettedness of many cases at once, with NumPy.
+
+The functions follow those of :mod:`.pmv` term by term, but take arrays:
+one row per ensemble, climate or activity to compare. Arguments are
+broadcast against each other, so a single climate can be given as
+scalars with an array of clothing insulations. The clothing temperature
+is iterated for all rows together; a row stops changing once it has
+converged.
+
+Units are those of :mod:`.pmv`: insulation Icl in m2K/W, metabolic rate M
+in W/m2, air temperature ta in degrees C, relative humidity RH in % and
+air velocity va in m/s.
+
+NumPy is needed by this module only.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import numpy as np
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+CONV_POINT = 0.00015    # convergence of the clothing temperature / 100
+MAX_ITERATIONS = 151    # iterations after which a row is left as it is
+DEFAULT_VA = 0.1        # relative air velocity of pmv.calc_Vr
+
+def _floats(*values):
+    """
+    Return the values as float arrays of one broadcast shape.
+    """
+    return np.broadcast_arrays(*[np.asarray(value, dtype=float)
+                                 for value in values])
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def sat_pressure(ta):
+    """
+    Return the saturated vapour pressure in kPa at air temperature ta.
+    """
+    return np.exp(16.6536 - 4030.183 / (np.asarray(ta, dtype=float) + 235))
+
+def partial_pressure(ta, RH=50):
+    """
+    Return the partial vapour pressure in Pa.
+    """
+    return 10 * np.asarray(RH, dtype=float) * sat_pressure(ta)
+
+def calc_fcl(Icl):
+    """
+    Return the clothing area factor.
+    """
+    Icl = np.asarray(Icl, dtype=float)
+    return np.where(Icl <= 0.078, 1 + 1.290 * Icl, 1.05 + 0.645 * Icl)
+
+def calc_hc(Vr, tcl, ta):
+    """
+    Return the convective heat transfer coefficient in W/m2K.
+    """
+    Vr, tcl, ta = _floats(Vr, tcl, ta)
+    root = np.sqrt(Vr)
+    return np.where(12.1 < root, 2.38 * np.abs(tcl - ta) ** 0.25,
+                    12.1 * root)
+
+def calc_Re(hc, Icl):
+    """
+    Return the estimated vapour resistance of the clothing.
+    """
+    return 60 * (1 / np.asarray(hc, dtype=float)
+                 + 0.344 * np.asarray(Icl, dtype=float))
+
+def calc_tcl(ta, Icl, fcl, M, vr=DEFAULT_VA):
+    """
+    Iterate the clothing temperature of all rows together.
+
+    Every iteration only computes the rows that have not converged yet,
+    so a few slow rows do not make the others do more work.
+
+    :returns: the clothing temperatures in degrees C, and a boolean array
+              that is False for the rows that did not converge within
+              MAX_ITERATIONS
+    :rtype: tuple of two arrays
+    """
+    ta, Icl, fcl, M, vr = _floats(ta, Icl, fcl, M, vr)
+    shape = ta.shape
+    ta, Icl, fcl, M, vr = [values.ravel()
+                           for values in (ta, Icl, fcl, M, vr)]
+    taa = ta + 273.15
+    hcf = 12.1 * np.sqrt(vr)
+    p1 = Icl * fcl
+    p2 = p1 * 3.96
+    p3 = p1 * 100
+    p4 = p1 * taa
+    p5 = 308.7 * 0.028 * M + p2 * (taa / 100) * 4
+    xn = (taa + (35.5 - ta) / (3.5 * Icl + 0.1)) / 100
+    xf = xn.copy()
+    converged = np.zeros(xn.shape, dtype=bool)
+    # indexes of the rows still iterating
+    rows = np.arange(xn.size)
+    for _ in range(MAX_ITERATIONS):
+        if not rows.size:
+            break
+        xf_rows = (xf[rows] + xn[rows]) / 2
+        hc = np.maximum(hcf[rows],
+                        2.38 * np.abs(100 * xf_rows - taa[rows]) ** 0.25)
+        xn_rows = ((p5[rows] + p4[rows] * hc - p2[rows] * xf_rows ** 4)
+                   / (100 + p3[rows] * hc))
+        xf[rows] = xf_rows
+        xn[rows] = xn_rows
+        done = np.abs(xn_rows - xf_rows) <= CONV_POINT
+        converged[rows[done]] = True
+        rows = rows[~done]
+    tcl = 100 * xn - 273
+    return tcl.reshape(shape), converged.reshape(shape)
+
+def calc_pmv(M, pa, fcl, tcl, ta, hc, Icl):
+    """
+    Return the predicted mean vote.
+    """
+    M, pa, fcl, tcl, ta, hc = _floats(M, pa, fcl, tcl, ta, hc)
+    hl2 = np.where(M < 58.15, 0., 0.42 * (M - 58.15))
+    return ((0.303 * np.exp(-0.036 * M) + 0.028)
+            * (M - 3.05e-3 * (5733 - 6.99 * M - pa) - hl2
+               - 1.7e-5 * M * (5867 - pa) - 0.0014 * M * (34 - ta)
+               - 3.96e-8 * fcl * ((tcl + 273) ** 4 - (ta + 273) ** 4)
+               - fcl * hc * (tcl - ta)))
+
+def calc_ppd(pmv):
+    """
+    Return the predicted percentage of dissatisfied for a PMV.
+    """
+    pmv = np.asarray(pmv, dtype=float)
+    return 100 - 95 * np.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
+
+def calc_wetability(Re, M, pa):
+    """
+    Return the skin wettedness for the vapour resistance Re of the
+    clothing.
+    """
+    Re, M, pa = _floats(Re, M, pa)
+    return 0.42 * (M - 58) * Re / (5770 - 7.2 * M - pa) + 0.06
+
+def calc_comfort(Icl, M, ta, RH, va=DEFAULT_VA, Re=None):
+    """
+    Return the PMV, PPD and skin wettedness of every row, as
+    pmv.calc_comfort does for one ensemble.
+
+    :param Icl: total clothing insulation in m2K/W
+    :param M: metabolic rate in W/m2
+    :param ta: air temperature in degrees C
+    :param RH: relative humidity in %
+    :param va: relative air velocity in m/s
+    :param Re: vapour resistance of the clothing; if None, it is estimated
+               from the insulation with calc_Re
+    :returns: the arrays pmv, ppd and wettedness, of the broadcast shape
+              of the arguments
+    :rtype: tuple
+    """
+    Icl, M, ta, RH, va = _floats(Icl, M, ta, RH, va)
+    fcl = calc_fcl(Icl)
+    tcl = calc_tcl(ta, Icl, fcl, M, va)[0]
+    hc = calc_hc(va, tcl, ta)
+    pa = partial_pressure(ta, RH)
+    pmv = calc_pmv(M, pa, fcl, tcl, ta, hc, Icl)
+    if Re is None:
+        Re = calc_Re(hc, Icl)
+    return pmv, calc_ppd(pmv), calc_wetability(Re, M, pa)
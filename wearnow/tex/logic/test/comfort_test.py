@@ -0,0 +1,128 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+import itertools
+import random
+
+from ...lib import Ensemble, ChildRef
+from ...lib.textiletype import TextileType
+from ..comfort import (Garment, ComfortModel, rank_ensembles, compute_comfort,
+                       SLOTS, LAYOUTS)
+
+TYPES = (TextileType.TSHIRT_SHORTSLEEVE, TextileType.TSHIRT_LONGSLEEVE,
+         TextileType.PULLOVER, TextileType.TROUSERS,
+         TextileType.TROUSERS_SHORT, TextileType.DRESS, TextileType.CUSTOM)
+
+def all_scores(garments, model):
+    """Return the sorted |PMV| of all ensembles, looking at every one."""
+    by_slot = dict((slot, [garment for garment in garments
+                           if garment.type in types])
+                   for (slot, types) in SLOTS.items())
+    scores = []
+    for (required, optional) in LAYOUTS:
+        choices = ([by_slot[slot] for slot in required] +
+                   [[None] + by_slot[slot] for slot in optional])
+        for ensemble in itertools.product(*choices):
+            scores.append(abs(model.pmv(sum(garment.insulation
+                                            for garment in ensemble
+                                            if garment is not None))))
+    return sorted(scores)
+
+class RankEnsemblesTest(unittest.TestCase):
+    """Test the ranking of ensembles against looking at all of them."""
+
+    def setUp(self):
+        rand = random.Random(7)
+        self.garments = [Garment("G%03d" % index, rand.choice(TYPES),
+                                 round(rand.uniform(0.01, 0.25), 3))
+                         for index in range(40)]
+
+    def test_best(self):
+        for (ta, RH, M) in ((20, 50, 70), (5, 60, 116), (28, 40, 58)):
+            model = ComfortModel(ta, RH, M)
+            ranked = rank_ensembles(self.garments, model, 6)
+            expected = all_scores(self.garments, model)[:6]
+            self.assertEqual(len(ranked), 6)
+            for (ensemble, score) in zip(ranked, expected):
+                self.assertAlmostEqual(abs(ensemble.pmv), score)
+
+    def test_ensembles(self):
+        types = dict((garment.handle, garment.type)
+                     for garment in self.garments)
+        model = ComfortModel(15, 50, 70)
+        for ensemble in rank_ensembles(self.garments, model, 10):
+            slots = sorted(slot for handle in ensemble.handles
+                           for (slot, slot_types) in SLOTS.items()
+                           if types[handle] in slot_types)
+            self.assertIn(slots, (["bottom", "top"],
+                                  ["bottom", "pullover", "top"],
+                                  ["dress"], ["dress", "pullover"]))
+            self.assertEqual(model.comfort(ensemble.insulation)[0],
+                             ensemble.pmv)
+
+    def test_empty(self):
+        model = ComfortModel(20, 50, 70)
+        self.assertEqual(rank_ensembles([], model), [])
+        self.assertEqual(rank_ensembles(self.garments, model, 0), [])
+
+class Wardrobe(object):
+    """
+    Stands for a database with one ensemble, holding garments with the
+    given THERM_INS attribute values.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def get_ensemble_from_handle(self, handle, view=False):
+        ensemble = Ensemble()
+        for textile_handle in sorted(self.values):
+            childref = ChildRef()
+            childref.set_reference_handle(textile_handle)
+            ensemble.add_child_ref(childref)
+        return ensemble
+
+    def get_textile_attribute_values(self, handle, attr_type):
+        return self.values[handle]
+
+class ComputeComfortTest(unittest.TestCase):
+    """Test the comfort of an ensemble of the database."""
+
+    def test_insulation(self):
+        model = ComfortModel(20, 50, 70)
+        wardrobe = Wardrobe({"T1": ["0.1"], "T2": ["0.05", "0.2"], "T3": []})
+        self.assertEqual(compute_comfort(wardrobe, "E1", model),
+                         model.comfort(0.1 + 0.2))
+
+    def test_invalid_insulation(self):
+        # garments whose insulation is not a number are left out
+        model = ComfortModel(20, 50, 70)
+        wardrobe = Wardrobe({"T1": ["0.1"], "T2": ["warm"],
+                             "T3": ["0.2", ""]})
+        self.assertEqual(compute_comfort(wardrobe, "E1", model),
+                         model.comfort(0.1))
+
+def testSuite():
+    suite = unittest.TestSuite()
+    for test_case in (RankEnsemblesTest, ComputeComfortTest):
+        suite.addTest(unittest.makeSuite(test_case, 'test'))
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -0,0 +1,82 @@
+#
+# WearNow - a GTK+/GNOME based program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+
+try:
+    import numpy as np
+    from .. import pmvarray
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+from .. import pmv
+
+def scalar_comfort(Icl, M, ta, RH, va):
+    """Return PMV, PPD and wettedness computed with the scalar functions."""
+    fcl = pmv.calc_fcl(Icl)
+    tcl = pmv.calc_tcl(ta, Icl, fcl, M, va)
+    hc = pmv.calc_hc(va, tcl, ta)
+    pa = pmv.partial_pressure(ta, RH)
+    result = pmv.calc_pmv(M, pa, fcl, tcl, ta, hc, Icl)
+    return (result, pmv.calc_ppd(result),
+            pmv.calc_wetability(pmv.calc_Re(hc, Icl), M, pa))
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy is not installed")
+class PmvArrayTest(unittest.TestCase):
+    """Test the array PMV functions against the scalar ones."""
+
+    def setUp(self):
+        self.cases = [(Icl, M, ta, RH, va)
+                      for Icl in (0.0, 0.05, 0.155, 0.3)
+                      for M in (46.0, 69.84, 116.0)
+                      for ta in (10.0, 19.0, 28.0)
+                      for RH in (30.0, 70.0)
+                      for va in (0.1, 0.3)]
+
+    def test_comfort(self):
+        columns = [np.array(column) for column in zip(*self.cases)]
+        results = pmvarray.calc_comfort(*columns)
+        for (row, case) in enumerate(self.cases):
+            expected = scalar_comfort(*case)
+            for (values, value) in zip(results, expected):
+                self.assertAlmostEqual(values[row], value, places=9,
+                                       msg=str(case))
+
+    def test_broadcast(self):
+        Icl = np.array([0.05, 0.155, 0.3])
+        (pmv_values, ppd, wet) = pmvarray.calc_comfort(Icl, 69.84, 19, 40)
+        self.assertEqual(pmv_values.shape, (3,))
+        for (row, value) in enumerate(Icl):
+            self.assertAlmostEqual(
+                pmv_values[row], scalar_comfort(value, 69.84, 19, 40, 0.1)[0])
+        # more clothing is warmer
+        self.assertTrue((np.diff(pmv_values) > 0).all())
+        self.assertTrue((ppd >= 5).all())
+
+    def test_converged(self):
+        (tcl, converged) = pmvarray.calc_tcl([19, 25], 0.155, 1.15,
+                                             69.84)
+        self.assertTrue(converged.all())
+        self.assertAlmostEqual(tcl[0], pmv.calc_tcl(19, 0.155, 1.15, 69.84))
+
+def testSuite():
+    suite = unittest.makeSuite(PmvArrayTest, 'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner().run(testSuite())
@@ -39,7 +39,7 @@ LOG = logging.getLogger(".citation")
 # WEARNOW libraries
 #
 #-------------------------------------------------------------------------
-from ..lib import (MediaRef, Attribute,
+from ..lib import (MediaRef, Attribute, Url,
                    Textile, MediaObject,
                    Ensemble, ChildRef, Note, Tag)
 from .proxybase import ProxyDbBase
@@ -56,42 +56,42 @@ class PrivateProxyDb(ProxyDbBase):
         """
         ProxyDbBase.__init__(self, db)
 
-    def get_textile_from_handle(self, handle):
+    def get_textile_from_handle(self, handle, view=False):
         """
         Finds a Textile in the database from the passed WEARNOW ID.
         If no such Textile exists, None is returned.
         """
-        textile = self.db.get_textile_from_handle(handle)
+        textile = self.db.get_textile_from_handle(handle, view=view)
         if textile and not textile.get_privacy():
             return sanitize_textile(self.db, textile)
         return None
 
-    def get_object_from_handle(self, handle):
+    def get_object_from_handle(self, handle, view=False):
         """
         Finds an Object in the database from the passed WEARNOW ID.
         If no such Object exists, None is returned.
         """
-        media = self.db.get_object_from_handle(handle)
+        media = self.db.get_object_from_handle(handle, view=view)
         if media and not media.get_privacy():
             return sanitize_media(self.db, media)
         return None
 
-    def get_ensemble_from_handle(self, handle):
+    def get_ensemble_from_handle(self, handle, view=False):
         """
         Finds a Ensemble in the database from the passed WEARNOW ID.
         If no such Ensemble exists, None is returned.
         """
-        ensemble = self.db.get_ensemble_from_handle(handle)
+        ensemble = self.db.get_ensemble_from_handle(handle, view=view)
         if ensemble and not ensemble.get_privacy():
             return sanitize_ensemble(self.db, ensemble)
         return None
 
-    def get_note_from_handle(self, handle):
+    def get_note_from_handle(self, handle, view=False):
         """
         Finds a Note in the database from the passed WEARNOW ID.
         If no such Note exists, None is returned.
         """
-        note = self.db.get_note_from_handle(handle)
+        note = self.db.get_note_from_handle(handle, view=view)
         if note and not note.get_privacy():
             return note
         return None
@@ -335,7 +335,7 @@ def copy_urls(db, original_obj, clean_obj):
     """         
     for url in original_obj.get_url_list():
         if url and not url.get_privacy():
-            clean_obj.add_url(url)
+            clean_obj.add_url(Url(url))
         
 def sanitize_media_ref(db, media_ref):
     """
@@ -378,7 +378,7 @@ def sanitize_textile(db, textile):
     new_textile.set_wearnow_id(textile.get_wearnow_id())
     new_textile.set_handle(textile.get_handle())
     new_textile.set_change_time(textile.get_change_time())
-    new_textile.set_tag_list(textile.get_tag_list())
+    new_textile.set_tag_list(list(textile.get_tag_list()))
     
     copy_attributes(db, textile, new_textile)
     copy_urls(db, textile, new_textile)
@@ -409,7 +409,7 @@ def sanitize_media(db, media):
     new_media.set_wearnow_id(media.get_wearnow_id())
     new_media.set_handle(media.get_handle())
     new_media.set_change_time(media.get_change_time())
-    new_media.set_tag_list(media.get_tag_list())
+    new_media.set_tag_list(list(media.get_tag_list()))
 
     return new_media
 
@@ -432,12 +432,10 @@ def sanitize_ensemble(db, ensemble):
     new_ensemble.set_wearnow_id(ensemble.get_wearnow_id())
     new_ensemble.set_handle(ensemble.get_handle())
     new_ensemble.set_change_time(ensemble.get_change_time())
-    new_ensemble.set_tag_list(ensemble.get_tag_list())
+    new_ensemble.set_tag_list(list(ensemble.get_tag_list()))
     
     # Copy child references.
     for child_ref in ensemble.get_child_ref_list():
-        if child_ref and child_ref.get_privacy():
-            continue
         child_handle = child_ref.get_reference_handle()
         child = db.get_textile_from_handle(child_handle)
         if child and child.get_privacy():
@@ -35,15 +35,19 @@ import types
 # WEARNOW libraries
 #
 #-------------------------------------------------------------------------
-from ..db.base import DbReadBase, DbWriteBase
+from ..db.base import DbReadBase, DbWriteBase, field_getter
+from ..db.dbconst import (TEXTILE_KEY, ENSEMBLE_KEY, MEDIA_KEY, NOTE_KEY,
+                          TAG_KEY)
 
 class ProxyCursor(object):
     """
-    A cursor for moving through proxied data.
+    A cursor for moving through proxied data. If a getter is given, it is
+    applied to the data of each record.
     """
-    def __init__(self, get_raw, get_handles):
+    def __init__(self, get_raw, get_handles, getter=None):
         self.get_raw = get_raw
         self.get_handles = get_handles
+        self.getter = getter
 
     def __enter__(self):
         """
@@ -55,6 +59,11 @@ class ProxyCursor(object):
         pass
         
     def __iter__(self):
+        if self.getter is not None:
+            for handle in self.get_handles():
+                data = self.get_raw(handle)
+                yield handle, (None if data is None else self.getter(data))
+            return
         for handle in self.get_handles():
             yield handle, self.get_raw(handle)
 
@@ -137,25 +146,34 @@ class ProxyDbBase(DbReadBase):
     include_tag = \
         None
         
-    def get_textile_cursor(self):
+    @staticmethod
+    def __getter(key, fields):
+        return None if fields is None else field_getter(key, fields)
+
+    def get_textile_cursor(self, fields=None):
         return ProxyCursor(self.get_raw_textile_data, 
-                           self.get_textile_handles)
+                           self.get_textile_handles,
+                           self.__getter(TEXTILE_KEY, fields))
 
-    def get_ensemble_cursor(self):
+    def get_ensemble_cursor(self, fields=None):
         return ProxyCursor(self.get_raw_ensemble_data,
-                           self.get_ensemble_handles)
+                           self.get_ensemble_handles,
+                           self.__getter(ENSEMBLE_KEY, fields))
 
-    def get_media_cursor(self):
+    def get_media_cursor(self, fields=None):
         return ProxyCursor(self.get_raw_object_data,
-                           self.get_media_object_handles)
+                           self.get_media_object_handles,
+                           self.__getter(MEDIA_KEY, fields))
 
-    def get_note_cursor(self):
+    def get_note_cursor(self, fields=None):
         return ProxyCursor(self.get_raw_note_data,
-                           self.get_note_handles)
+                           self.get_note_handles,
+                           self.__getter(NOTE_KEY, fields))
 
-    def get_tag_cursor(self):
+    def get_tag_cursor(self, fields=None):
         return ProxyCursor(self.get_raw_tag_data,
-                           self.get_tag_handles)
+                           self.get_tag_handles,
+                           self.__getter(TAG_KEY, fields))
 
     def get_textile_handles(self, sort_handles=False):
         """
@@ -320,37 +338,39 @@ class ProxyDbBase(DbReadBase):
         # Default behaviour: lookup attribute in parent object
         return getattr(self.db, name)
 
-    def get_textile_from_handle(self, handle):
+    def get_textile_from_handle(self, handle, view=False):
         """
         Finds a Textile in the database from the passed wearnow handle.
         If no such Textile exists, None is returned.
         """
         return self.gfilter(self.include_textile,
-                            self.db.get_textile_from_handle(handle))
+                            self.db.get_textile_from_handle(
+                                handle, view=view))
 
-    def get_ensemble_from_handle(self, handle):
+    def get_ensemble_from_handle(self, handle, view=False):
         """
         Finds a Ensemble in the database from the passed wearnow handle.
         If no such Ensemble exists, None is returned.
         """
         return self.gfilter(self.include_ensemble,
-                            self.db.get_ensemble_from_handle(handle)) 
+                            self.db.get_ensemble_from_handle(
+                                handle, view=view)) 
 
-    def get_object_from_handle(self, handle):
+    def get_object_from_handle(self, handle, view=False):
         """
         Finds an Object in the database from the passed wearnow handle.
         If no such Object exists, None is returned.
         """
         return self.gfilter(self.include_media_object,
-                    self.db.get_object_from_handle(handle))
+                    self.db.get_object_from_handle(handle, view=view))
 
-    def get_note_from_handle(self, handle):
+    def get_note_from_handle(self, handle, view=False):
         """
         Finds a Note in the database from the passed wearnow handle.
         If no such Note exists, None is returned.
         """
         return self.gfilter(self.include_note,
-                            self.db.get_note_from_handle(handle))
+                            self.db.get_note_from_handle(handle, view=view))
         
     def get_tag_from_handle(self, handle):
         """
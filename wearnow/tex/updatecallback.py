@@ -32,7 +32,6 @@ other WearNow baggage.
 #
 #-------------------------------------------------------------------------
 import time
-import collections
 import logging
 _LOG = logging.getLogger(".gen")
 #-------------------------------------------------------------------------
@@ -53,7 +52,7 @@ class UpdateCallback(object):
         :param interval: number of seconds at most between the updates
         :type interval: int
         """
-        if isinstance(callback, collections.Callable): # callback is really callable
+        if callable(callback):
             self.update = self.update_real
             self.callback = callback
             self.interval = interval